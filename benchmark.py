@@ -1,7 +1,13 @@
+import argparse
 import pandas as pd
 import sys
+from lead_quality_system.config import Config
 from lead_quality_system.scorer import LeadScorer
 from lead_quality_system.models import Lead
+from lead_quality_system.services.cache import LookupCache
+from lead_quality_system.services.google_maps import GooglePlacesVerifier
+from lead_quality_system.services import profiling
+from lead_quality_system.services.lead_store import LeadStore
 from dotenv import load_dotenv
 
 # Load env vars
@@ -12,6 +18,41 @@ def normalize_url(url):
     if not url: return ""
     return url.lower().replace("https://", "").replace("http://", "").replace("www.", "").strip("/")
 
+def places_usage_summary(leads: int) -> dict:
+    """Google Places calls, bytes and list-price cost for the run, totalled and per lead."""
+    usage = GooglePlacesVerifier.usage()
+    calls = sum(u["calls"] for u in usage.values())
+    nbytes = sum(u["bytes"] for u in usage.values())
+    cost = sum(u["cost_usd"] for u in usage.values())
+    return {
+        "by_sku": usage,
+        "calls": calls,
+        "bytes": nbytes,
+        "cost_usd": round(cost, 4),
+        "calls_per_lead": round(calls / leads, 3) if leads else 0.0,
+        "bytes_per_lead": round(nbytes / leads, 1) if leads else 0.0,
+        "cost_per_1000_leads": round(cost / leads * 1000, 2) if leads else 0.0,
+    }
+
+def print_places_usage(summary: dict):
+    print("Google Places usage:")
+    for sku, u in summary["by_sku"].items():
+        print(f"  {sku:<26} calls={u['calls']:<5} cache_hits={u['cache_hits']:<5} bytes={u['bytes']:<9} ${u['cost_usd']:.4f}")
+    print(f"  Per lead: {summary['calls_per_lead']} calls, {summary['bytes_per_lead']:.0f} bytes, "
+          f"${summary['cost_per_1000_leads']:.2f} per 1000 leads")
+
+def print_lookup_caches(stats: dict):
+    """Hits per outcome for every provider lookup cache, and what each kind saved at list price."""
+    print("Lookup caches (hits: found / not found / error):")
+    for name, s in stats.items():
+        if not s["lookups"]:
+            continue
+        hits = " / ".join(str(s[k]["hits"]) for k in ("found", "not_found", "error"))
+        saved = sum(s[k]["saved_usd"] for k in ("found", "not_found", "error"))
+        print(f"  {name:<22} lookups={s['lookups']:<5} hits={hits:<12} hit_rate={s['hit_rate']:<6} "
+              f"saved ${saved:.4f} (not found ${s['not_found']['saved_usd']:.4f}, error ${s['error']['saved_usd']:.4f}, "
+              f"{s['short_circuited']} short-circuited)")
+
 def run_benchmark(csv_path="leads_golden_test.csv"):
     print(f"Loading benchmark file: {csv_path}...")
     try:
@@ -25,10 +66,15 @@ def run_benchmark(csv_path="leads_golden_test.csv"):
         print(f"❌ Error: Missing columns. Found: {list(df.columns)}")
         return
 
+    # Count this run's provider usage only, starting from cold caches
+    GooglePlacesVerifier.reset_usage(clear_caches=True)
+    LookupCache.clear_all()
+
     print(f"🚀 Starting Benchmark on {len(df)} leads...\n")
     
     correct_count = 0
     results_data = []
+    scored_leads = []
     
     # Iterate through rows
     for idx, row in df.iterrows():
@@ -44,8 +90,12 @@ def run_benchmark(csv_path="leads_golden_test.csv"):
         
         print(f"[{idx+1}/{len(df)}] Checking: {lead.business_name}...", end=" ", flush=True)
         
+        if (idx + 1) % Config.PROFILE_CHUNK_ROWS == 0:
+            profiling.chunk(f"{idx + 1} leads done")
+
         try:
             result = LeadScorer.enrich_and_score(lead)
+            scored_leads.append((lead, result))
             found_raw = result.website
             found_norm = normalize_url(found_raw)
             
@@ -92,8 +142,13 @@ def run_benchmark(csv_path="leads_golden_test.csv"):
             })
 
     # Save Report
-    report_df = pd.DataFrame(results_data)
-    report_df.to_csv("benchmark_results.csv", index=False)
+    with profiling.stage(profiling.RESULT_ASSEMBLY):
+        report_df = pd.DataFrame(results_data)
+    with profiling.stage(profiling.CSV_WRITE):
+        report_df.to_csv("benchmark_results.csv", index=False)
+        lead_store = LeadStore.default()
+        if lead_store is not None:
+            print(f"Upserted {lead_store.put_many(scored_leads)} leads into {lead_store.path}")
 
     # Final Summary
     total_count = len(df)
@@ -106,7 +161,46 @@ def run_benchmark(csv_path="leads_golden_test.csv"):
     print(f"Correct:     {correct_count}")
     print(f"Accuracy:    {accuracy:.1f}%")
     print(f"Detailed Report saved to: benchmark_results.csv")
+    places = places_usage_summary(total_count)
+    print_places_usage(places)
+    lookup_caches = LookupCache.stats_all()
+    print_lookup_caches(lookup_caches)
+    print("="*40)
+    return {"accuracy": accuracy, "places": places, "lookup_caches": lookup_caches}
+
+def compare_places_tiers(csv_path="leads_golden_test.csv"):
+    """Run the file with the full Places field mask, then tiered, and report the reduction."""
+    runs = {}
+    for tiered in (False, True):
+        Config.GOOGLE_PLACES_TIERED = tiered
+        runs[tiered] = run_benchmark(csv_path)
+        if runs[tiered] is None:
+            return
+
+    before, after = runs[False]["places"], runs[True]["places"]
+    def reduction(key):
+        return f"{(1 - after[key] / before[key]) * 100:.1f}%" if before[key] else "n/a"
+
+    print("\n" + "="*40)
+    print("GOOGLE PLACES: FULL MASK vs TIERED")
+    print("="*40)
+    print(f"Accuracy:            {runs[False]['accuracy']:.1f}% -> {runs[True]['accuracy']:.1f}%")
+    print(f"Bytes per lead:      {before['bytes_per_lead']:.0f} -> {after['bytes_per_lead']:.0f} ({reduction('bytes_per_lead')} less)")
+    print(f"Cost per 1000 leads: ${before['cost_per_1000_leads']:.2f} -> ${after['cost_per_1000_leads']:.2f} ({reduction('cost_per_1000_leads')} less)")
     print("="*40)
 
 if __name__ == "__main__":
-    run_benchmark()
+    parser = argparse.ArgumentParser(description="Check website discovery accuracy against a golden file.")
+    parser.add_argument("csv_path", nargs="?", default="leads_golden_test.csv")
+    parser.add_argument("--compare-places-tiers", action="store_true",
+                        help="run twice (full Places field mask, then tiered) and report cost/bytes per lead")
+    parser.add_argument("--profile", action="store_true",
+                        help="write a CPU/stage/memory report and flamegraph stacks under PROFILE_DIR")
+    args = parser.parse_args()
+    with profiling.profiled("benchmark", enabled=args.profile or None) as session:
+        if args.compare_places_tiers:
+            compare_places_tiers(args.csv_path)
+        else:
+            run_benchmark(args.csv_path)
+    if session is not None and session.output_dir:
+        print(f"Profile saved to: {session.output_dir}")
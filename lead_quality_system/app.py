@@ -3,6 +3,11 @@ import pandas as pd
 from lead_quality_system.models import Lead
 from lead_quality_system.scorer import LeadScorer
 from lead_quality_system.services.csv_processor import BatchProcessor
+from lead_quality_system.services.scheduler import JobPriority, JobScheduler
+from lead_quality_system.services.planner import BatchPlanner
+from lead_quality_system.services.evidence_store import EvidenceStore
+from lead_quality_system.services.lead_store import LeadStore
+from lead_quality_system.services.result_store import ResultFilter, ResultStore
 from lead_quality_system.config import Config
 
 st.set_page_config(page_title="Lead Validation System", layout="wide")
@@ -17,12 +22,17 @@ def main():
     if not Config.YELP_API_KEY:
         st.sidebar.warning("⚠️ Yelp API Key Missing")
 
-    mode = st.sidebar.radio("Select Mode", ["Single Lead Validation", "Batch CSV Processing"])
+    modes = ["Single Lead Validation", "Batch CSV Processing"]
+    if Config.LEAD_STORE_PATH:
+        modes.append("Lead Store Search")
+    mode = st.sidebar.radio("Select Mode", modes)
 
     if mode == "Single Lead Validation":
         render_single_mode()
-    else:
+    elif mode == "Batch CSV Processing":
         render_batch_mode()
+    else:
+        render_lead_search()
 
 def render_single_mode():
     st.header("Validate Single Lead")
@@ -51,7 +61,12 @@ def render_single_mode():
                     lead = Lead(business_name, phone, zip_code, email)
                     with st.spinner("Validating lead against Google & Yelp..."):
                         # Save result to session state
-                        st.session_state.validation_result = LeadScorer.enrich_and_score(lead)
+                        st.session_state.validation_result = JobScheduler.default().run(
+                            LeadScorer.enrich_and_score, lead, priority=JobPriority.INTERACTIVE
+                        )
+                        lead_store = LeadStore.default()
+                        if lead_store is not None:
+                            lead_store.put(lead, st.session_state.validation_result)
 
     # --- Right Column: Result Card ---
     with col_result:
@@ -103,28 +118,170 @@ def render_batch_mode():
     st.write("Upload a CSV with columns: `business_name`, `phone`, `zip_code`, `email`")
     
     uploaded_file = st.file_uploader("Choose a CSV file", type="csv")
+
+    active_jobs = JobScheduler.default().jobs()
+    if active_jobs:
+        with st.expander(f"Active Jobs ({len(active_jobs)})"):
+            st.dataframe(pd.DataFrame(active_jobs)[["name", "priority", "completed", "total", "rows_per_s", "eta_s"]])
     
     if uploaded_file is not None:
+        budget = st.number_input("Budget cap (USD, 0 = no cap)", min_value=0.0, value=0.0, step=5.0)
+        # Every widget interaction reruns the script; only re-read and re-plan for a new upload or budget
+        plan_key = (getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size), budget)
+        cached = st.session_state.get("batch_plan")
+        if cached and cached[0] == plan_key:
+            plan = cached[1]
+        else:
+            try:
+                input_df = BatchProcessor.load_csv(uploaded_file)
+                # Shared store: opening one per rerun would leak a connection each time
+                plan = BatchPlanner.plan(input_df, EvidenceStore.default(), budget=budget or None)
+            except Exception as e:
+                st.error(f"Error reading CSV: {e}")
+                return
+            finally:
+                uploaded_file.seek(0)
+            st.session_state.batch_plan = (plan_key, plan)
+
+        with st.expander("Dry-Run Estimate", expanded=True):
+            col_rows, col_cached, col_cost, col_time = st.columns(4)
+            col_rows.metric("Leads to Process", f"{plan.planned_rows}/{plan.rows}")
+            col_cached.metric("Cached / Junk Phone / Duplicate", f"{plan.cached_rows} / {plan.rejected_rows} / {plan.duplicate_rows}")
+            col_cost.metric("Est. Cost", f"${plan.total_cost_usd:,.2f}")
+            col_time.metric("Est. Time", f"{plan.est_seconds / 60:.1f} min")
+            st.dataframe(plan.summary())
+            if plan.deferred_rows:
+                st.warning(f"{plan.deferred_rows} lower-value leads exceed the budget and will be deferred.")
+
+        priority = st.radio(
+            "Priority", ["Urgent", "Normal", "Bulk"], index=1, horizontal=True,
+            help="Urgent jobs get most of the shared workers while they run; Bulk jobs yield to everything else."
+        )
         if st.button("Process Batch"):
+            progress_bar = st.progress(0.0, text="Queued...")
+
+            def show_progress(p):
+                progress_bar.progress(
+                    p["completed"] / p["total"] if p["total"] else 1.0,
+                    text=f"{p['completed']}/{p['total']} businesses ({p['rows_per_s']}/s)"
+                )
+
             with st.spinner("Processing leads in parallel..."):
+                output = ResultStore.create(uploaded_file.name)
                 try:
-                    result_df = BatchProcessor.process_csv(uploaded_file)
-                    st.success("Processing Complete!")
-                    
-                    st.dataframe(result_df)
-                    
-                    # CSV Download
-                    csv = result_df.to_csv(index=False).encode('utf-8')
-                    st.download_button(
-                        "Download Verified Results",
-                        csv,
-                        "verified_leads.csv",
-                        "text/csv",
-                        key='download-csv'
+                    result_df = BatchProcessor.process_csv(
+                        uploaded_file,
+                        priority={"Urgent": JobPriority.INTERACTIVE, "Normal": JobPriority.NORMAL, "Bulk": JobPriority.BULK}[priority],
+                        name=uploaded_file.name,
+                        on_progress=show_progress,
+                        budget=budget or None,
+                        output=output,
                     )
-                    
+                    output.close()
+                    # The previous job's results and exports are no longer reachable from the UI
+                    if st.session_state.get("batch_results"):
+                        ResultStore.remove(st.session_state.batch_results)
+                    # Only the on-disk store is kept across reruns, not the frame
+                    st.session_state.batch_results = output.path
+                    st.session_state.batch_metrics = result_df.attrs.get("batch_metrics")
+                    st.session_state.batch_export = None
+                    # The run stored new evidence, so the dry-run estimate is out of date
+                    st.session_state.batch_plan = None
+                    del result_df
+                    st.success("Processing Complete!")
                 except Exception as e:
+                    output.close()
+                    ResultStore.remove(output.path)
                     st.error(f"Error processing CSV: {e}")
 
+    if st.session_state.get("batch_results"):
+        render_batch_results(st.session_state.batch_results, st.session_state.get("batch_metrics"))
+
+def _discard_export(path: str):
+    """Download callback: the export has been handed to the browser, so drop it from disk."""
+    ResultStore.discard_exports(path)
+    st.session_state.batch_export = None
+
+def render_batch_results(path: str, metrics: dict = None):
+    st.subheader("Results")
+    store = ResultStore(path)
+    try:
+        col_tier, col_score, col_source = st.columns([2, 2, 1])
+        tiers = col_tier.multiselect("Tier", store.tiers())
+        min_score, max_score = col_score.slider("Score", 0, 100, (0, 100))
+        source = col_source.selectbox("Source", ["Any"] + store.sources())
+        filters = ResultFilter(tuple(tiers), min_score, max_score, None if source == "Any" else source)
+
+        total = store.count(filters)
+        col_size, col_page = st.columns(2)
+        page_size = col_size.selectbox("Rows per page", [50, 100, 500, 1000], index=1)
+        pages = max((total - 1) // page_size + 1, 1)
+        page = col_page.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1) - 1
+        st.dataframe(store.page(filters, page, page_size))
+        first = page * page_size
+        st.caption(f"Rows {min(first + 1, total)}–{min(first + page_size, total)} of {total}")
+
+        if metrics:
+            with st.expander("Batch Metrics"):
+                st.write(f"{metrics['rows']} rows ({metrics['clusters']} distinct businesses) in {metrics['elapsed_s']}s")
+                for provider, stats in metrics["concurrency"].items():
+                    st.caption(
+                        f"**{provider}**: limit {stats['limit']}, {stats['successes']} ok, "
+                        f"{stats['errors']} errors ({stats['throttled']} throttled), "
+                        f"avg latency {stats['ewma_latency_ms']} ms"
+                    )
+                    history = pd.DataFrame(stats["history"], columns=["elapsed_s", "limit"])
+                    st.line_chart(history, x="elapsed_s", y="limit")
+                for name, stats in metrics.get("lookup_caches", {}).items():
+                    if stats["lookups"]:
+                        st.caption(
+                            f"**{name} cache**: {stats['lookups']} lookups, hit rate {stats['hit_rate']} "
+                            f"({stats['found']['hits']} found, {stats['not_found']['hits']} not found, "
+                            f"{stats['error']['hits']} error, {stats.get('short_circuited', 0)} while the circuit was open); "
+                            f"not-found hits saved ${stats['not_found']['saved_usd']:.2f}"
+                        )
+
+        # Download: exported from the job's store in chunks, with the current filters
+        formats = {"CSV (gzip)": ("csv.gz", "application/gzip")}
+        if store.parquet_available():
+            formats["Parquet"] = ("parquet", "application/octet-stream")
+        col_format, col_prepare = st.columns([2, 1])
+        label = col_format.radio("Download format", list(formats), horizontal=True)
+        fmt, mime = formats[label]
+        if col_prepare.button("Prepare Download"):
+            with st.spinner(f"Exporting {total} rows..."):
+                st.session_state.batch_export = (store.export(fmt, filters), fmt, mime)
+        export = st.session_state.get("batch_export")
+        if export:
+            export_path, export_fmt, export_mime = export
+            with open(export_path, "rb") as f:
+                st.download_button(
+                    "Download Verified Results",
+                    f,
+                    f"verified_leads.{export_fmt}",
+                    export_mime,
+                    key='download-results',
+                    on_click=_discard_export,
+                    args=(path,),
+                )
+    finally:
+        store.close()
+
+def render_lead_search():
+    st.header("Lead Store Search")
+    lead_store = LeadStore.default()
+    st.caption(f"{len(lead_store)} scored leads in `{lead_store.path}`")
+
+    col_tier, col_zip, col_phone, col_score = st.columns(4)
+    tiers = col_tier.multiselect("Tier", ["High", "Medium", "Low"])
+    zip_code = col_zip.text_input("Zip Code")
+    phone = col_phone.text_input("Phone")
+    min_score = col_score.number_input("Min Score", min_value=0, max_value=100, value=0)
+    filters = dict(tiers=tiers, zip_code=zip_code or None, phone=phone or None, min_score=min_score or None)
+
+    total = lead_store.count(**filters)
+    st.dataframe(lead_store.query(**filters, limit=1000))
+    st.caption(f"Showing {min(total, 1000)} of {total} matching leads, highest score first")
+
 if __name__ == "__main__":
     main()
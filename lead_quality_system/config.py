@@ -16,6 +16,96 @@ class Config:
     GOOGLE_SEARCH_CX = os.getenv("GOOGLE_SEARCH_CX")
     YELP_API_KEY = os.getenv("YELP_API_KEY")
     MOCK_MODE = os.getenv("MOCK_MODE", "false").lower() == "true"
+    # Optional SQLite file where raw provider evidence is persisted for offline re-scoring
+    EVIDENCE_STORE_PATH = os.getenv("EVIDENCE_STORE_PATH")
+    # Stored evidence younger than this is reused by batch runs instead of re-querying providers;
+    # 0 (default) always re-queries, so stale evidence is never reused unless asked for
+    EVIDENCE_MAX_AGE_DAYS = float(os.getenv("EVIDENCE_MAX_AGE_DAYS", "0"))
+    # Optional SQLite file where every scored lead is upserted (batch, single lead, benchmark),
+    # indexed by phone, zip, tier and score; written in transactions of LEAD_STORE_BATCH_ROWS
+    LEAD_STORE_PATH = os.getenv("LEAD_STORE_PATH")
+    LEAD_STORE_BATCH_ROWS = int(os.getenv("LEAD_STORE_BATCH_ROWS", "5000"))
+    # Seconds before a provider API call is abandoned; a timeout counts as congestion and
+    # halves that endpoint's concurrency limit
+    HTTP_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", "10"))
+    # Adaptive per-provider concurrency (AIMD); worker threads are shared by all jobs
+    CONCURRENCY_INITIAL = int(os.getenv("CONCURRENCY_INITIAL", "5"))
+    CONCURRENCY_MAX = int(os.getenv("CONCURRENCY_MAX", "32"))
+    SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "32"))
+    # Leads whose phone fails local NANP validation get no provider calls at all
+    SKIP_INVALID_PHONE_LEADS = os.getenv("SKIP_INVALID_PHONE_LEADS", "true").lower() == "true"
+    # Optional list of assigned NPA-NXX exchanges (one per line, e.g. "415-555")
+    NANP_EXCHANGE_PATH = os.getenv("NANP_EXCHANGE_PATH")
+    # Cluster rows of an upload that are the same business (phone / email domain / name + zip)
+    # and enrich each cluster once; CLUSTER_NAME_SIM is the name-only match threshold
+    CLUSTER_LEADS = os.getenv("CLUSTER_LEADS", "true").lower() == "true"
+    CLUSTER_NAME_SIM = float(os.getenv("CLUSTER_NAME_SIM", "0.85"))
+    CLUSTER_MAX_BLOCK = int(os.getenv("CLUSTER_MAX_BLOCK", "200"))
+    # Zip centroid index (defaults to the bundled data/zip_centroids.bin) and the radius
+    # of the location bias circle sent with name + zip searches
+    ZIP_INDEX_PATH = os.getenv("ZIP_INDEX_PATH")
+    LOCATION_BIAS_RADIUS_KM = float(os.getenv("LOCATION_BIAS_RADIUS_KM", "40"))
+    # Extra directory/aggregator blocklists (os.pathsep-separated) and optional full public suffix list
+    DIRECTORY_BLOCKLIST_PATH = os.getenv("DIRECTORY_BLOCKLIST_PATH")
+    PUBLIC_SUFFIX_PATH = os.getenv("PUBLIC_SUFFIX_PATH")
+    # Minimum name-to-domain affinity (0..1) for a search result to count as the official site
+    MIN_DOMAIN_AFFINITY = float(os.getenv("MIN_DOMAIN_AFFINITY", "0"))
+    # Extra email domain lists (os.pathsep-separated, "<domain> <free|isp|disposable>" per line)
+    EMAIL_DOMAIN_LIST_PATH = os.getenv("EMAIL_DOMAIN_LIST_PATH")
+    # Fetch the site at a business email's domain; when it mentions the business, Google Search is skipped.
+    # Only applies when VERIFY_WEBSITES is on, since it is a website fetch like the others
+    CHECK_EMAIL_DOMAIN_SITE = os.getenv("CHECK_EMAIL_DOMAIN_SITE", "true").lower() == "true"
+    # Optional liveness/ownership check of candidate websites (async fetcher, no API cost)
+    VERIFY_WEBSITES = os.getenv("VERIFY_WEBSITES", "false").lower() == "true"
+    VERIFY_MAX_CONCURRENCY = int(os.getenv("VERIFY_MAX_CONCURRENCY", "200"))
+    VERIFY_TIMEOUT = float(os.getenv("VERIFY_TIMEOUT", "4"))
+    # Checks still waiting for a fetch slot after this many seconds are left unchecked (no penalty)
+    VERIFY_QUEUE_TIMEOUT = float(os.getenv("VERIFY_QUEUE_TIMEOUT", "30"))
+    VERIFY_MAX_KB = int(os.getenv("VERIFY_MAX_KB", "64"))
+    # Profiling mode: per-thread cProfile, named stage timings, stack samples and tracemalloc
+    # snapshots every PROFILE_CHUNK_ROWS completed tasks, written under PROFILE_DIR per run
+    PROFILE = os.getenv("PROFILE", "false").lower() == "true"
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_SAMPLE_HZ = int(os.getenv("PROFILE_SAMPLE_HZ", "100"))
+    PROFILE_CHUNK_ROWS = int(os.getenv("PROFILE_CHUNK_ROWS", "500"))
+    # Batch results from the UI are kept on disk (one SQLite file per job) for paging and export
+    RESULTS_DIR = os.getenv("RESULTS_DIR", "results")
+    # Coordinator/worker mode (python -m lead_quality_system.distribute): sqlite:///file.db for
+    # one machine, redis://host:6379/0 across nodes (needs the redis package). Chunks are
+    # leased for QUEUE_LEASE_S seconds and re-delivered up to QUEUE_MAX_ATTEMPTS times.
+    WORK_QUEUE_URL = os.getenv("WORK_QUEUE_URL", "sqlite:///work_queue.db")
+    QUEUE_CHUNK_ROWS = int(os.getenv("QUEUE_CHUNK_ROWS", "200"))
+    QUEUE_LEASE_S = float(os.getenv("QUEUE_LEASE_S", "300"))
+    QUEUE_MAX_ATTEMPTS = int(os.getenv("QUEUE_MAX_ATTEMPTS", "3"))
+    QUEUE_POLL_S = float(os.getenv("QUEUE_POLL_S", "2"))
+    # Tiered Google Places lookups: a cheap search mask, then Place Details only for accepted
+    # name matches. Each tier has its own in-process cache (TTL in seconds).
+    GOOGLE_PLACES_TIERED = os.getenv("GOOGLE_PLACES_TIERED", "true").lower() == "true"
+    GOOGLE_PLACES_SEARCH_CACHE_TTL = float(os.getenv("GOOGLE_PLACES_SEARCH_CACHE_TTL", "86400"))
+    GOOGLE_PLACES_DETAILS_CACHE_TTL = float(os.getenv("GOOGLE_PLACES_DETAILS_CACHE_TTL", "604800"))
+    GOOGLE_PLACES_CACHE_SIZE = int(os.getenv("GOOGLE_PLACES_CACHE_SIZE", "50000"))
+    # Yelp and Google Custom Search lookups get the same in-process cache (TTL in seconds)
+    LOOKUP_CACHE_TTL = float(os.getenv("LOOKUP_CACHE_TTL", "86400"))
+    LOOKUP_CACHE_SIZE = int(os.getenv("LOOKUP_CACHE_SIZE", "50000"))
+    # Every provider cache also remembers confirmed misses (the call succeeded, nothing matched)
+    # and failed calls, each with its own shorter TTL, so unlisted businesses and outages are
+    # not re-queried for every repeat lead. 0 disables that kind of entry.
+    NOT_FOUND_CACHE_TTL = float(os.getenv("NOT_FOUND_CACHE_TTL", "21600"))
+    ERROR_CACHE_TTL = float(os.getenv("ERROR_CACHE_TTL", "60"))
+    # Error entries are per key, so during an outage new leads would still call the provider:
+    # after this many consecutive failed calls a lookup cache stops calling for ERROR_CACHE_TTL
+    # seconds and answers every uncached key as a failure. 0 disables the breaker
+    CIRCUIT_BREAKER_ERRORS = int(os.getenv("CIRCUIT_BREAKER_ERRORS", "5"))
+    # List prices (USD per 1000 calls) and daily quotas (0 = unlimited).
+    # Places: Text Search Pro (tiered search mask), Text Search Enterprise (full mask), Place Details Enterprise
+    GOOGLE_PLACES_COST_PER_1000 = float(os.getenv("GOOGLE_PLACES_COST_PER_1000", "32"))
+    GOOGLE_PLACES_FULL_COST_PER_1000 = float(os.getenv("GOOGLE_PLACES_FULL_COST_PER_1000", "35"))
+    GOOGLE_PLACES_DETAILS_COST_PER_1000 = float(os.getenv("GOOGLE_PLACES_DETAILS_COST_PER_1000", "20"))
+    YELP_COST_PER_1000 = float(os.getenv("YELP_COST_PER_1000", "0"))
+    GOOGLE_SEARCH_COST_PER_1000 = float(os.getenv("GOOGLE_SEARCH_COST_PER_1000", "5"))
+    GOOGLE_PLACES_DAILY_QUOTA = int(os.getenv("GOOGLE_PLACES_DAILY_QUOTA", "0"))
+    YELP_DAILY_QUOTA = int(os.getenv("YELP_DAILY_QUOTA", "5000"))
+    GOOGLE_SEARCH_DAILY_QUOTA = int(os.getenv("GOOGLE_SEARCH_DAILY_QUOTA", "10000"))
 
     @classmethod
     def validate(cls):
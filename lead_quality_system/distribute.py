@@ -0,0 +1,95 @@
+import argparse
+import logging
+import multiprocessing
+from lead_quality_system.config import Config
+from lead_quality_system.services.distributed import Coordinator, Worker
+from lead_quality_system.services.lead_store import LeadStore
+from lead_quality_system.services.work_queue import LEASED, PENDING, WorkQueue
+
+def _print_status(status: dict):
+    print(f"{status['job_id']} {status['name']}: {status['rows']} rows, {status['chunks']} chunks "
+          f"(pending {status['pending']}, leased {status['leased']}, done {status['done']}, failed {status['failed']})")
+
+def _run_worker(url: str, job_id: str):
+    logging.basicConfig(level=logging.INFO)
+    Worker(WorkQueue.from_url(url)).run(until_job=job_id)
+
+def _collect(queue: WorkQueue, job_id: str, output: str):
+    df = Coordinator.collect(queue, job_id)
+    df.to_csv(output, index=False)
+    store = LeadStore.default()
+    if store is not None:
+        print(f"Upserted {store.put_frame(df)} leads into {store.path}")
+    print(df["quality_tier"].value_counts().to_string())
+    print(f"Results saved to: {output}")
+
+def main():
+    """
+    Coordinator/worker mode over a shared work queue.
+    Examples:
+      python -m lead_quality_system.distribute submit leads.csv
+      python -m lead_quality_system.distribute worker              (on each node)
+      python -m lead_quality_system.distribute collect <job_id> --wait --output results.csv
+      python -m lead_quality_system.distribute run leads.csv --workers 4 --output results.csv
+    """
+    parser = argparse.ArgumentParser(description="Distribute batch enrichment across worker processes")
+    parser.add_argument("--queue", default=Config.WORK_QUEUE_URL, help="sqlite:///path.db or redis://host:port/db")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Split a CSV into chunks on the queue")
+    submit.add_argument("csv_path")
+    submit.add_argument("--name")
+    submit.add_argument("--chunk-rows", type=int, default=Config.QUEUE_CHUNK_ROWS)
+
+    worker = commands.add_parser("worker", help="Process chunks until stopped")
+    worker.add_argument("--idle-timeout", type=float, help="Exit after this many seconds with nothing to do")
+    worker.add_argument("--max-chunks", type=int)
+
+    status = commands.add_parser("status", help="Chunk counts per job")
+    status.add_argument("job_id", nargs="?")
+
+    collect = commands.add_parser("collect", help="Merge a job's results into a CSV")
+    collect.add_argument("job_id")
+    collect.add_argument("--output", default="distributed_results.csv")
+    collect.add_argument("--wait", action="store_true", help="Wait for outstanding chunks first")
+
+    run = commands.add_parser("run", help="Submit, process with local worker processes, and collect")
+    run.add_argument("csv_path")
+    run.add_argument("--workers", type=int, default=2)
+    run.add_argument("--chunk-rows", type=int, default=Config.QUEUE_CHUNK_ROWS)
+    run.add_argument("--output", default="distributed_results.csv")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    queue = WorkQueue.from_url(args.queue)
+
+    if args.command == "submit":
+        print(Coordinator.submit(args.csv_path, queue, name=args.name or args.csv_path, chunk_rows=args.chunk_rows))
+    elif args.command == "worker":
+        completed = Worker(queue).run(max_chunks=args.max_chunks, idle_timeout=args.idle_timeout)
+        print(f"Completed {completed} chunks")
+    elif args.command == "status":
+        for job_id in [args.job_id] if args.job_id else queue.jobs():
+            _print_status(queue.status(job_id))
+    elif args.command == "collect":
+        if args.wait:
+            Coordinator.wait(queue, args.job_id, on_progress=_print_status)
+        _collect(queue, args.job_id, args.output)
+    elif args.command == "run":
+        job_id = Coordinator.submit(args.csv_path, queue, name=args.csv_path, chunk_rows=args.chunk_rows)
+        # Fresh interpreters: workers must not inherit this process's threads or connections
+        context = multiprocessing.get_context("spawn")
+        processes = [context.Process(target=_run_worker, args=(args.queue, job_id)) for _ in range(args.workers)]
+        for process in processes:
+            process.start()
+        # Workers stay up until the job is finished; if they all die first, collect what there is
+        while True:
+            status = Coordinator.wait(queue, job_id, on_progress=_print_status, timeout=Config.QUEUE_LEASE_S)
+            if status[PENDING] + status[LEASED] == 0 or not any(p.is_alive() for p in processes):
+                break
+        for process in processes:
+            process.join()
+        _collect(queue, job_id, args.output)
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import sys
 from lead_quality_system.models import Lead
 from lead_quality_system.scorer import LeadScorer
+from lead_quality_system.services.lead_store import LeadStore
 
 def main():
     if len(sys.argv) < 4:
@@ -16,6 +17,9 @@ def main():
     
     lead = Lead(name, phone, zip_code, email)
     result = LeadScorer.enrich_and_score(lead)
+    lead_store = LeadStore.default()
+    if lead_store is not None:
+        lead_store.put(lead, result)
     
     print("-" * 30)
     print(f"Score: {result.score} ({result.quality_tier})")
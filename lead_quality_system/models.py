@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 @dataclass
 class Lead:
@@ -16,3 +16,24 @@ class EnrichmentResult:
     website: Optional[str] = None
     match_reasons: List[str] = field(default_factory=list)
     sources: List[str] = field(default_factory=list)
+
+@dataclass
+class LeadEvidence:
+    """
+    Raw provider payloads collected for a lead, before any points are assigned.
+    A payload of None means the lookup ran and found nothing; lookups that
+    never ran are listed in neither the payloads nor `attempted`. Lookups whose
+    call failed are listed in `failed` instead, and the evidence is partial.
+    """
+    lead: Lead
+    phone_check: Optional[dict] = None  # PhoneCheck fields plus zip_state / state_mismatch
+    google_phone: Optional[dict] = None
+    google_text: Optional[dict] = None
+    yelp_phone: Optional[dict] = None
+    yelp_term: Optional[dict] = None
+    search_website: Optional[str] = None
+    email_website: Optional[str] = None  # site at the email's domain, when it was checked
+    website_checks: Dict[str, dict] = field(default_factory=dict)  # url -> SiteCheck fields
+    attempted: List[str] = field(default_factory=list)
+    failed: List[str] = field(default_factory=list)
+    fetched_at: float = 0.0
@@ -0,0 +1,24 @@
+import hashlib
+import re
+
+# Trailing extension: "x12", "ext. 12", "extension 12", "#12"
+EXTENSION_PATTERN = re.compile(r"\s*(?:x|ext\.?|extension|#)\s*\d+\s*$", re.I)
+
+def strip_extension(phone: str) -> str:
+    return EXTENSION_PATTERN.sub("", phone or "")
+
+def phone_digits(phone: str) -> str:
+    """Digits only, without any extension and with a leading US country code stripped."""
+    digits = "".join(filter(str.isdigit, strip_extension(phone)))
+    if len(digits) == 11 and digits.startswith("1"):
+        digits = digits[1:]
+    return digits
+
+def compact_name(name: str) -> str:
+    """Lowercase alphanumerics only, so 'C A L A F I A Home' == 'Calafia Home'."""
+    return re.sub(r"[^a-z0-9]", "", (name or "").lower())
+
+def lead_key(lead) -> str:
+    """Stable identity for a lead: normalized phone, name and zip."""
+    raw = "|".join([phone_digits(lead.phone), compact_name(lead.business_name), (lead.zip_code or "").strip()[:5]])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
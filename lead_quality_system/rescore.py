@@ -0,0 +1,48 @@
+import argparse
+import dataclasses
+import pandas as pd
+from lead_quality_system.rules import ScoringRules, score_frame, compare_rules
+from lead_quality_system.services.evidence_store import EvidenceStore
+
+def main():
+    """
+    Re-score stored evidence offline, optionally A/B against the default rules.
+    Example: python -m lead_quality_system.rescore evidence.db --threshold 0.7 --high 80 --compare
+    """
+    parser = argparse.ArgumentParser(description="Re-score stored lead evidence without API calls")
+    parser.add_argument("store", help="Path to the evidence SQLite file")
+    parser.add_argument("--threshold", type=float, help="Name similarity threshold")
+    parser.add_argument("--high", type=int, help="High tier cutoff")
+    parser.add_argument("--medium", type=int, help="Medium tier cutoff")
+    for field in ("google_phone", "google_name", "yelp_phone", "yelp_name", "website", "business_email"):
+        parser.add_argument(f"--{field.replace('_', '-')}", type=int, dest=field, help=f"Weight for {field}")
+    parser.add_argument("--compare", action="store_true", help="Print a tier crosstab against the default rules")
+    parser.add_argument("--output", help="Write per-lead scores to this CSV")
+    args = parser.parse_args()
+
+    overrides = {
+        "name_similarity_threshold": args.threshold,
+        "high_cutoff": args.high,
+        "medium_cutoff": args.medium,
+    }
+    for field in ("google_phone", "google_name", "yelp_phone", "yelp_name", "website", "business_email"):
+        overrides[field] = getattr(args, field)
+    rules = dataclasses.replace(ScoringRules(), **{k: v for k, v in overrides.items() if v is not None})
+
+    store = EvidenceStore(args.store)
+    features = store.features()
+    print(f"Loaded evidence for {len(features)} leads")
+
+    scored = score_frame(features, rules)
+    print(scored["quality_tier"].value_counts().to_string())
+
+    if args.compare:
+        print("\nDefault rules (rows) vs candidate rules (columns):")
+        print(compare_rules(features, ScoringRules(), rules).to_string())
+
+    if args.output:
+        pd.concat([features, scored], axis=1).to_csv(args.output)
+        print(f"Scores saved to: {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+import difflib
+from dataclasses import dataclass
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+from .models import LeadEvidence
+from .services.domains import registrable_domain
+from .services.email_domains import BUSINESS, EmailDomainIndex, email_domain
+from .services.geo import ZipIndex, haversine_km, zip_from_address
+
+# Always treated as non-business on top of EmailDomainIndex (data/email_domains.txt)
+FREE_MAIL_DOMAINS = ('gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'icloud.com', 'aol.com')
+
+# Columns produced by extract_features / stored by EvidenceStore
+FEATURE_COLUMNS = [
+    "phone_valid", "phone_state_mismatch",
+    "google_phone_hit", "google_phone_name",
+    "google_text_name", "google_text_sim", "google_text_distance_km", "google_text_website",
+    "yelp_phone_hit", "yelp_term_name", "yelp_term_sim", "yelp_term_distance_km",
+    "search_attempted", "search_website",
+    "google_text_website_live", "google_text_website_owned",
+    "search_website_live", "search_website_owned",
+    "email_domain", "email_website", "email_website_live", "email_website_owned",
+]
+
+@dataclass(frozen=True)
+class ScoringRules:
+    """
+    Weights and cutoffs applied to collected evidence.
+    Defaults are the current production weights, not the original hard-coded
+    scoring: email_website_match (15) and max_match_distance_km (50) change scores.
+    """
+    google_phone: int = 40
+    google_name: int = 30
+    yelp_phone: int = 20
+    yelp_name: int = 10
+    website: int = 20
+    website_unowned: int = 10  # verified live, but mentions neither phone nor name
+    business_email: int = 10
+    email_website_match: int = 15  # email and chosen website share a domain, unless the site came from the email
+    phone_state_mismatch: int = 0  # penalty when the area code's state differs from the zip's
+    name_similarity_threshold: float = 0.5
+    max_match_distance_km: float = 50.0  # name matches farther than this from the lead's zip are rejected
+    high_cutoff: int = 70
+    medium_cutoff: int = 40
+    max_score: int = 100
+    free_mail_domains: tuple = FREE_MAIL_DOMAINS
+
+    def accepts_match(self, similarity: float, distance_km: float = None) -> bool:
+        """Name-based match guardrail; an unknown distance does not count against the match."""
+        if similarity < self.name_similarity_threshold:
+            return False
+        return distance_km is None or pd.isna(distance_km) or distance_km <= self.max_match_distance_km
+
+    def website_points(self, live, owned) -> int:
+        """Points for a website given its verification flags (None = not checked)."""
+        if live is None:
+            return self.website
+        if not live:
+            return 0
+        return self.website if owned else self.website_unowned
+
+    def tier(self, score: int) -> str:
+        if score >= self.high_cutoff:
+            return "High"
+        elif score >= self.medium_cutoff:
+            return "Medium"
+        return "Low"
+
+def name_similarity(a: str, b: str) -> float:
+    if not a or not b:
+        return 0.0
+    return difflib.SequenceMatcher(None, a.lower(), b.lower()).ratio()
+
+def match_distance_km(zip_code: str, payload: dict) -> float:
+    """
+    Distance between the lead's zip centroid and a Google place / Yelp business.
+    Uses the payload's coordinates, else the zip in its address. NaN when unknown.
+    """
+    index = ZipIndex.default()
+    origin = index.lookup(zip_code) if index else None
+    if not origin or not payload:
+        return np.nan
+    point = payload.get('location') if isinstance(payload.get('location'), dict) else None
+    if point and 'latitude' in point:
+        # Google Places
+        return haversine_km(origin.lat, origin.lon, point['latitude'], point['longitude'])
+    coords = payload.get('coordinates') or {}
+    if coords.get('latitude') is not None:
+        # Yelp
+        return haversine_km(origin.lat, origin.lon, coords['latitude'], coords['longitude'])
+    address_zip = zip_from_address(payload.get('formattedAddress')) or (point or {}).get('zip_code')
+    other = index.lookup(address_zip) if address_zip else None
+    return haversine_km(origin.lat, origin.lon, other.lat, other.lon) if other else np.nan
+
+def _check_flags(evidence: LeadEvidence, url: str):
+    check = evidence.website_checks.get(url) if url else None
+    if not check:
+        return None, None
+    return check["live"], check["live"] and (check["phone_found"] or check["name_found"])
+
+def extract_features(evidence: LeadEvidence) -> dict:
+    """
+    Flatten raw payloads into the scalar columns the rules operate on.
+    Pure function of the evidence; no weights or thresholds involved.
+    """
+    lead = evidence.lead
+    g_phone = evidence.google_phone
+    g_text = evidence.google_text
+    y_term = evidence.yelp_term
+
+    g_text_name = g_text.get('displayName', {}).get('text', "") if g_text else None
+    y_term_name = y_term.get('name', "") if y_term else None
+    g_text_website = (g_text.get('websiteUri') or None) if g_text else None
+    g_live, g_owned = _check_flags(evidence, g_text_website)
+    s_live, s_owned = _check_flags(evidence, evidence.search_website)
+    e_live, e_owned = _check_flags(evidence, evidence.email_website)
+
+    phone = evidence.phone_check or {}
+
+    return {
+        "phone_valid": phone.get("valid"),
+        "phone_state_mismatch": phone.get("state_mismatch"),
+        "google_phone_hit": bool(g_phone),
+        "google_phone_name": g_phone.get('displayName', {}).get('text') if g_phone else None,
+        "google_text_name": g_text_name,
+        "google_text_sim": name_similarity(lead.business_name, g_text_name) if g_text else np.nan,
+        "google_text_distance_km": match_distance_km(lead.zip_code, g_text) if g_text else np.nan,
+        "google_text_website": g_text_website,
+        "yelp_phone_hit": bool(evidence.yelp_phone),
+        "yelp_term_name": y_term_name,
+        "yelp_term_sim": name_similarity(lead.business_name, y_term_name) if y_term else np.nan,
+        "yelp_term_distance_km": match_distance_km(lead.zip_code, y_term) if y_term else np.nan,
+        "search_attempted": "search" in evidence.attempted,
+        "search_website": evidence.search_website or None,
+        "google_text_website_live": g_live,
+        "google_text_website_owned": g_owned,
+        "search_website_live": s_live,
+        "search_website_owned": s_owned,
+        "email_domain": email_domain(lead.email),
+        "email_website": evidence.email_website or None,
+        "email_website_live": e_live,
+        "email_website_owned": e_owned,
+    }
+
+def email_site_accepted(live, owned) -> bool:
+    """The lead's email domain serves a live page that mentions the business."""
+    return bool(live) and bool(owned)
+
+def same_site(domain: str, website: str) -> bool:
+    """Email domain and website URL share a registrable domain."""
+    if not domain or not website:
+        return False
+    return registrable_domain(domain) == registrable_domain(website)
+
+def _flag(series: pd.Series) -> pd.Series:
+    """Map stored verification flags (bool / 0-1 / None / NaN) to 1.0, 0.0 or NaN."""
+    return series.astype(float)
+
+def score_frame(features: pd.DataFrame, rules: ScoringRules = ScoringRules()) -> pd.DataFrame:
+    """
+    Vectorized scoring over a frame of FEATURE_COLUMNS.
+    Returns a frame with 'score', 'quality_tier' and 'website' aligned to the input index.
+
+    Leads whose evidence was collected under a looser similarity threshold may lack
+    a website search result (search_attempted False); they simply get no website points.
+    """
+    thr = rules.name_similarity_threshold
+    gp = features["google_phone_hit"].astype(bool)
+    max_km = rules.max_match_distance_km
+    gt = ~gp & (features["google_text_sim"].fillna(0.0) >= thr) & ~(features["google_text_distance_km"].astype(float) > max_km)
+    yp = features["yelp_phone_hit"].astype(bool)
+    yt = ~yp & (features["yelp_term_sim"].fillna(0.0) >= thr) & ~(features["yelp_term_distance_km"].astype(float) > max_km)
+
+    profile_site = gt & features["google_text_website"].notna()
+    search_site = ~profile_site & features["search_website"].notna()
+    email_site = (
+        ~profile_site & ~search_site & features["email_website"].notna()
+        & (_flag(features["email_website_live"]) == 1.0) & (_flag(features["email_website_owned"]) == 1.0)
+    )
+    has_site = profile_site | search_site | email_site
+
+    # Verification flags of whichever website ends up chosen; NaN when unchecked
+    live = _flag(features["google_text_website_live"]).where(profile_site, _flag(features["search_website_live"]))
+    owned = _flag(features["google_text_website_owned"]).where(profile_site, _flag(features["search_website_owned"]))
+    website_points = pd.Series(rules.website, index=features.index)
+    website_points = website_points.mask(live == 0.0, 0).mask((live == 1.0) & (owned != 1.0), rules.website_unowned)
+    website_points = website_points.mask(email_site, rules.website)
+
+    domain = features["email_domain"].fillna("")
+    biz_email = (EmailDomainIndex.default().classify(domain) == BUSINESS) & ~domain.isin(rules.free_mail_domains)
+
+    website = features["google_text_website"].where(profile_site, features["search_website"].where(search_site))
+    website = website.where(has_site & ~email_site, features["email_website"].where(email_site))
+    site_domain = website.dropna().map(registrable_domain)
+    email_match = biz_email & ~email_site & (domain.map(registrable_domain) == site_domain.reindex(features.index))
+
+    mismatch = features["phone_state_mismatch"].astype(float).fillna(0.0) > 0
+
+    score = (
+        gp * rules.google_phone
+        + gt * rules.google_name
+        + yp * rules.yelp_phone
+        + yt * rules.yelp_name
+        + has_site * website_points
+        + biz_email * rules.business_email
+        + email_match * rules.email_website_match
+        - mismatch * rules.phone_state_mismatch
+    ).clip(lower=0, upper=rules.max_score).astype(int)
+
+    tier = np.select(
+        [score >= rules.high_cutoff, score >= rules.medium_cutoff],
+        ["High", "Medium"],
+        default="Low",
+    )
+    return pd.DataFrame({"score": score, "quality_tier": tier, "website": website}, index=features.index)
+
+def compare_rules(features: pd.DataFrame, baseline: ScoringRules, candidate: ScoringRules) -> pd.DataFrame:
+    """
+    A/B two rule sets over the same evidence.
+    Returns a tier crosstab (baseline rows x candidate columns).
+    """
+    a = score_frame(features, baseline)
+    b = score_frame(features, candidate)
+    return pd.crosstab(a["quality_tier"].rename("baseline"), b["quality_tier"].rename("candidate"))
+
+def features_frame(evidence: Iterable[LeadEvidence]) -> pd.DataFrame:
+    return pd.DataFrame([extract_features(e) for e in evidence], columns=FEATURE_COLUMNS)
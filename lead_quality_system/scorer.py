@@ -1,121 +1,235 @@
-from .models import Lead, EnrichmentResult
+from .models import Lead, EnrichmentResult, LeadEvidence
+from .rules import (ScoringRules, email_site_accepted, extract_features, match_distance_km,
+                    name_similarity, same_site)
+from .services.cache import failures
 from .services.google_maps import GooglePlacesVerifier
 from .services.yelp import YelpMatcher
 from .services.search import WebsiteFinder
-import difflib
+from .services.site_verifier import SiteVerifier
+from .services.phone import PhoneValidator
+from .services.geo import ZipIndex
+from .services.profiling import PROVIDER_IO, SIMILARITY, stage
+from .services.domains import registrable_domain
+from .services.email_domains import EmailDomainIndex, email_domain
+from .config import Config
+import time
 
 class LeadScorer:
-    
+    DEFAULT_RULES = ScoringRules()
+
     @staticmethod
     def _calculate_similarity(a: str, b: str) -> float:
-        if not a or not b:
-            return 0.0
-        return difflib.SequenceMatcher(None, a.lower(), b.lower()).ratio()
-    
+        return name_similarity(a, b)
+
     @classmethod
-    def enrich_and_score(cls, lead: Lead) -> EnrichmentResult:
+    def enrich_and_score(cls, lead: Lead, rules: ScoringRules = None) -> EnrichmentResult:
+        rules = rules or cls.DEFAULT_RULES
+        return cls.score_evidence(cls.collect_evidence(lead, rules), rules)
+
+    @staticmethod
+    def check_phone(lead: Lead) -> dict:
+        """Local phone validation result as stored in LeadEvidence.phone_check."""
+        phone_check = PhoneValidator.validate(lead.phone)
+        return {
+            **phone_check.to_dict(),
+            "zip_state": PhoneValidator.zip_state(lead.zip_code),
+            "state_mismatch": PhoneValidator.state_mismatch(phone_check, lead.zip_code),
+        }
+
+    @classmethod
+    def collect_evidence(cls, lead: Lead, rules: ScoringRules = None) -> LeadEvidence:
+        """
+        Run the provider fallback chain and keep the raw payloads.
+        The rules are only consulted to decide whether a fallback call is needed.
+        """
+        rules = rules or cls.DEFAULT_RULES
+        evidence = LeadEvidence(lead=lead, fetched_at=time.time())
+        # Website checks run on the verifier's event loop while the API calls continue
+        verifier = SiteVerifier.default() if Config.VERIFY_WEBSITES and not Config.MOCK_MODE else None
+        checks = {}
+
+        # 0. Local phone validation: junk numbers cost zero API calls
+        evidence.phone_check = cls.check_phone(lead)
+        if not evidence.phone_check["valid"] and Config.SKIP_INVALID_PHONE_LEADS:
+            return evidence
+
+        # The email's own domain is checked for free while the API calls run
+        domain = email_domain(lead.email)
+        if verifier and Config.CHECK_EMAIL_DOMAIN_SITE and EmailDomainIndex.default().is_business(domain):
+            evidence.email_website = f"https://{registrable_domain(domain)}"
+            checks[evidence.email_website] = verifier.submit(evidence.email_website, lead.phone, lead.business_name)
+
+        # Zip centroid biases the name searches toward the lead's location
+        zip_index = ZipIndex.default()
+        place = zip_index.lookup(lead.zip_code) if zip_index else None
+        coordinates = (place.lat, place.lon) if place else None
+
+        # 1. Google Places Search
+        evidence.google_phone = cls._lookup(evidence, "google_phone", GooglePlacesVerifier.search_by_phone, lead.phone)
+        profile_website = None
+        if not evidence.google_phone:
+            # Fallback to Name + Zip
+            evidence.google_text = cls._lookup(evidence, "google_text", GooglePlacesVerifier.search_by_text,
+                                               f"{lead.business_name} {lead.zip_code}", location=coordinates)
+            if evidence.google_text:
+                returned_name = evidence.google_text.get('displayName', {}).get('text', "")
+                similarity = cls._calculate_similarity(lead.business_name, returned_name)
+                if rules.accepts_match(similarity, match_distance_km(lead.zip_code, evidence.google_text)):
+                    # Website/rating are billed at a higher tier: only fetched for accepted matches
+                    with failures() as failed:
+                        evidence.google_text = GooglePlacesVerifier.with_details(evidence.google_text)
+                    if failed:
+                        evidence.failed.append("google_details")
+                    profile_website = evidence.google_text.get('websiteUri')
+                    if verifier and profile_website:
+                        checks[profile_website] = verifier.submit(profile_website, lead.phone, lead.business_name)
+
+        # 2. Yelp Search
+        evidence.yelp_phone = cls._lookup(evidence, "yelp_phone", YelpMatcher.search_by_phone, lead.phone)
+        if not evidence.yelp_phone:
+            evidence.yelp_term = cls._lookup(evidence, "yelp_term", YelpMatcher.search_by_term,
+                                             lead.business_name, lead.zip_code, coordinates=coordinates)
+
+        # 3. Website Discovery (If not found yet)
+        if not profile_website and evidence.email_website:
+            # A live email-domain site that mentions the business makes the paid search unnecessary
+            with stage(PROVIDER_IO):
+                check = checks[evidence.email_website].result()
+            if email_site_accepted(check.live, check.owned):
+                profile_website = evidence.email_website
+        if not profile_website:
+            evidence.search_website = cls._lookup(evidence, "search", WebsiteFinder.find_website, lead.business_name,
+                                                  f"{place.city} {place.state}" if place else "", lead.zip_code)
+            if verifier and evidence.search_website and evidence.search_website not in checks:
+                checks[evidence.search_website] = verifier.submit(evidence.search_website, lead.phone, lead.business_name)
+
+        with stage(PROVIDER_IO):
+            evidence.website_checks = {url: future.result().to_dict() for url, future in checks.items()}
+        return evidence
+
+    @staticmethod
+    def _lookup(evidence: LeadEvidence, name: str, fn, *args, **kwargs):
+        """Run one provider lookup, listing it in evidence.attempted, or in evidence.failed if its call failed."""
+        with failures() as failed:
+            payload = fn(*args, **kwargs)
+        (evidence.failed if failed else evidence.attempted).append(name)
+        return payload
+
+    @staticmethod
+    def _site_check_reasons(live, owned) -> list:
+        if live is None:
+            return []
+        if not live:
+            return ["Website Unreachable (no points awarded)"]
+        if owned:
+            return ["Website Live & Mentions Business Phone/Name"]
+        return ["Website Live but Business Not Mentioned (partial points)"]
+
+    @classmethod
+    def score_evidence(cls, evidence: LeadEvidence, rules: ScoringRules = None) -> EnrichmentResult:
+        """
+        Pure scoring of previously collected evidence. No network calls.
+        Mirrors rules.score_frame, adding the human-readable match reasons.
+        """
+        rules = rules or cls.DEFAULT_RULES
+        with stage(SIMILARITY):
+            return cls._score(evidence, rules)
+
+    @classmethod
+    def _score(cls, evidence: LeadEvidence, rules: ScoringRules) -> EnrichmentResult:
+        f = extract_features(evidence)
+        thr = rules.name_similarity_threshold
         score = 0
         match_reasons = []
         sources = []
         verified_name = None
         website = None
+        email_site = False  # website came from the email's own domain
 
-        # 1. Google Places Search
-        google_place = GooglePlacesVerifier.search_by_phone(lead.phone)
-        if google_place:
-            score += 40
+        # 0. Local phone validation
+        phone = evidence.phone_check or {}
+        if f["phone_valid"] is False:
+            match_reasons.append(f"Phone Rejected Locally: {phone.get('reason')}")
+        if f["phone_state_mismatch"]:
+            score -= rules.phone_state_mismatch
+            match_reasons.append(f"Phone Area Code State ({phone.get('region')}) differs from Zip State ({phone.get('zip_state')})")
+
+        # 1. Google Places
+        if f["google_phone_hit"]:
+            score += rules.google_phone
             match_reasons.append("Phone number matched Google Business Profile")
             sources.append("Google Maps (Phone)")
-            verified_name = google_place.get('displayName', {}).get('text')
-        else:
-            # Fallback to Name + Zip
-            query = f"{lead.business_name} {lead.zip_code}"
-            google_place = GooglePlacesVerifier.search_by_text(query)
-            if google_place:
-                # GUARDRAIL: Verify Name Similarity (min 50% match)
-                returned_name = google_place.get('displayName', {}).get('text', "")
-                similarity = cls._calculate_similarity(lead.business_name, returned_name)
-                
-                if similarity >= 0.5:
-                    score += 30
-                    match_reasons.append(f"Business Name & Location matched Google Profile (Sim: {similarity:.2f})")
-                    sources.append("Google Maps (Name)")
-                    verified_name = verified_name or returned_name
-                    if not website and google_place.get('websiteUri'):
-                        website = google_place['websiteUri']
-                else:
-                    match_reasons.append(f"Rejected Google Match '{returned_name}' (Low Similarity: {similarity:.2f})")
+            verified_name = f["google_phone_name"]
+        elif f["google_text_name"] is not None:
+            # GUARDRAIL: Verify Name Similarity
+            similarity = f["google_text_sim"]
+            distance = f["google_text_distance_km"]
+            if similarity < thr:
+                match_reasons.append(f"Rejected Google Match '{f['google_text_name']}' (Low Similarity: {similarity:.2f})")
+            elif not rules.accepts_match(similarity, distance):
+                match_reasons.append(f"Rejected Google Match '{f['google_text_name']}' (Too Far: {distance:.0f} km)")
+            else:
+                score += rules.google_name
+                match_reasons.append(f"Business Name & Location matched Google Profile (Sim: {similarity:.2f})")
+                sources.append("Google Maps (Name)")
+                verified_name = verified_name or f["google_text_name"]
+                website = f["google_text_website"]
 
-        # 2. Yelp Search
-        yelp_biz = YelpMatcher.search_by_phone(lead.phone)
-        if yelp_biz:
-            score += 20
+        # 2. Yelp
+        if f["yelp_phone_hit"]:
+            score += rules.yelp_phone
             match_reasons.append("Phone number matched verified Yelp Business")
             sources.append("Yelp (Phone)")
-        else:
-            yelp_biz = YelpMatcher.search_by_term(lead.business_name, lead.zip_code)
-            if yelp_biz:
-                # GUARDRAIL: Verify Name Similarity
-                returned_name = yelp_biz.get('name', "")
-                similarity = cls._calculate_similarity(lead.business_name, returned_name)
-                
-                if similarity >= 0.5:
-                    score += 10 # Confidence lower for fuzzy name match
-                    match_reasons.append(f"Location matched Yelp Business (Sim: {similarity:.2f})")
-                    sources.append("Yelp (Name)")
-                    verified_name = verified_name or returned_name
-                else:
-                    match_reasons.append(f"Rejected Yelp Match '{returned_name}' (Low Similarity: {similarity:.2f})")
+        elif f["yelp_term_name"] is not None:
+            similarity = f["yelp_term_sim"]
+            distance = f["yelp_term_distance_km"]
+            if similarity < thr:
+                match_reasons.append(f"Rejected Yelp Match '{f['yelp_term_name']}' (Low Similarity: {similarity:.2f})")
+            elif not rules.accepts_match(similarity, distance):
+                match_reasons.append(f"Rejected Yelp Match '{f['yelp_term_name']}' (Too Far: {distance:.0f} km)")
+            else:
+                score += rules.yelp_name # Confidence lower for fuzzy name match
+                match_reasons.append(f"Location matched Yelp Business (Sim: {similarity:.2f})")
+                sources.append("Yelp (Name)")
+                verified_name = verified_name or f["yelp_term_name"]
 
-        # 3. Website Discovery (If not found yet)
-        if not website:
-            discovered_site = WebsiteFinder.find_website(lead.business_name, "", lead.zip_code)
-            if discovered_site:
-                website = discovered_site
-                score += 20
-                match_reasons.append("Official Website Discovered via Search")
-                sources.append("Google Search")
-        
-        # Award points if website exists (from ANY source)
+        # 3. Website points are additive regardless of source
         if website:
-             # Avoid double counting if we just awarded it above? 
-             # Actually, simpler logic:
-             # Just check if website exists at the end of discovery
-             pass 
-
-        # REFACTORING SCORING TO BE CLEANER:
-        # We already added points for Google/Yelp matches.
-        # Website points should be additive regardless of source.
-        
-        # Let's clean this up:
-        # Note: Previous code added +20 ONLY if found via Search. 
-        # We want +20 if found via Google/Yelp too.
-        
-        if website and "Official Website Discovered via Search" not in match_reasons:
-             score += 20
-             match_reasons.append("Website Verification (via Profile)")
+            score += rules.website_points(f["google_text_website_live"], f["google_text_website_owned"])
+            match_reasons.append("Website Verification (via Profile)")
+            match_reasons.extend(cls._site_check_reasons(f["google_text_website_live"], f["google_text_website_owned"]))
+        elif f["search_website"]:
+            website = f["search_website"]
+            score += rules.website_points(f["search_website_live"], f["search_website_owned"])
+            match_reasons.append("Official Website Discovered via Search")
+            match_reasons.extend(cls._site_check_reasons(f["search_website_live"], f["search_website_owned"]))
+            sources.append("Google Search")
+        elif f["email_website"] and email_site_accepted(f["email_website_live"], f["email_website_owned"]):
+            website, email_site = f["email_website"], True
+            score += rules.website
+            match_reasons.append("Email Domain Serves the Business Website")
+            sources.append("Email Domain")
 
         # 4. Email Check
-        if lead.email:
-            domain = lead.email.split('@')[-1].lower()
-            if domain not in ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'icloud.com', 'aol.com']:
-                score += 10
-                match_reasons.append("Business Email Domain Detected")
-
-        # Cap score at 100
-        score = min(score, 100)
-
-        # Determine Tier
-        if score >= 70:
-            tier = "High"
-        elif score >= 40:
-            tier = "Medium"
-        else:
-            tier = "Low"
+        kind = EmailDomainIndex.default().kind(f["email_domain"])
+        if kind == "business" and f["email_domain"] not in rules.free_mail_domains:
+            score += rules.business_email
+            match_reasons.append("Business Email Domain Detected")
+            # An email-derived site matches the email by construction, so it earns no extra credit
+            if same_site(f["email_domain"], website) and not email_site:
+                score += rules.email_website_match
+                match_reasons.append("Email Domain Matches Website")
+        elif kind == "disposable":
+            match_reasons.append("Disposable Email Address")
+
+        if evidence.failed:
+            match_reasons.append(f"Partial Result: {', '.join(evidence.failed)} lookup failed")
+
+        score = max(0, min(score, rules.max_score))
 
         return EnrichmentResult(
             score=score,
-            quality_tier=tier,
+            quality_tier=rules.tier(score),
             verified_business_name=verified_name,
             website=website,
             match_reasons=match_reasons,
@@ -0,0 +1,193 @@
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable
+
+from ..config import Config
+
+FOUND = "found"
+NOT_FOUND = "not_found"
+ERROR = "error"
+
+_local = threading.local()
+
+@contextmanager
+def failures():
+    """Collect the names of lookups that fail on this thread (fresh or cached errors) inside the block."""
+    failed = []
+    previous = getattr(_local, "failed", None)
+    _local.failed = failed
+    try:
+        yield failed
+    finally:
+        _local.failed = previous
+
+def _note_failure(name: str):
+    failed = getattr(_local, "failed", None)
+    if failed is not None:
+        failed.append(name)
+
+class LookupCache:
+    """
+    Cache for one kind of provider lookup that tells three outcomes apart, each
+    with its own TTL:
+
+    - found: the payload (ttl)
+    - not found: the call succeeded and matched nothing (Config.NOT_FOUND_CACHE_TTL)
+    - error: the call failed, kept briefly so the same key is not retried
+      straight away (Config.ERROR_CACHE_TTL)
+
+    Error entries only cover their own key, so the cache is also a circuit
+    breaker: after `breaker_errors` consecutive failed calls it opens and, for
+    the error TTL, answers every uncached key as a failure without calling
+    (counted as error hits and in "short_circuited"). The first call after that
+    decides: a success closes it, a failure opens it again.
+
+    `lookup` returns the cached or fetched payload (None for either negative) and
+    counts hits per outcome; with `cost_per_call` the stats include what each kind
+    of hit saved. Every instance is registered for `LookupCache.stats_all`.
+    """
+    _instances = []
+
+    def __init__(self, name: str, ttl: float, maxsize: int = 10000, not_found_ttl: float = None,
+                 error_ttl: float = None, cost_per_call: Callable[[], float] = None, breaker_errors: int = None):
+        self.name = name
+        self.ttls = {
+            FOUND: ttl,
+            NOT_FOUND: Config.NOT_FOUND_CACHE_TTL if not_found_ttl is None else not_found_ttl,
+            ERROR: Config.ERROR_CACHE_TTL if error_ttl is None else error_ttl,
+        }
+        self.maxsize = maxsize
+        self.cost_per_call = cost_per_call
+        self._data = OrderedDict()  # key -> (expires, outcome, value)
+        self._lock = threading.Lock()
+        self.breaker_errors = Config.CIRCUIT_BREAKER_ERRORS if breaker_errors is None else breaker_errors
+        self._consecutive_errors = 0
+        self._open_until = 0.0
+        self.hits = dict.fromkeys(self.ttls, 0)
+        self.misses = 0
+        self.short_circuited = 0
+        LookupCache._instances.append(self)
+
+    def _get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits[entry[1]] += 1
+            return entry[1], entry[2]
+
+    def _set(self, key, outcome: str, value=None):
+        ttl = self.ttls[outcome]
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, outcome, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def _short_circuit(self) -> bool:
+        """True (and counted as an error hit) while the breaker is open."""
+        with self._lock:
+            if time.monotonic() >= self._open_until:
+                return False
+            self.misses -= 1  # _get already counted the lookup as a miss
+            self.hits[ERROR] += 1
+            self.short_circuited += 1
+            return True
+
+    def _record_call(self, ok: bool):
+        with self._lock:
+            if ok:
+                self._consecutive_errors = 0
+                return
+            self._consecutive_errors += 1
+            if self.breaker_errors > 0 and self._consecutive_errors >= self.breaker_errors:
+                self._open_until = time.monotonic() + self.ttls[ERROR]
+
+    def lookup(self, key, fetch: Callable[[], Any], on_hit: Callable[[str], None] = None):
+        """
+        Cached outcome for `key`, else `fetch()`: a payload, or None for a confirmed
+        miss. An exception from `fetch` is cached as an error and re-raised; a cached
+        error, or any uncached key while the circuit is open, returns None without a
+        call. Failures of every kind are reported to `failures`.
+        """
+        cached = self._get(key)
+        if cached is None and self._short_circuit():
+            cached = (ERROR, None)
+        if cached is not None:
+            outcome, value = cached
+            if outcome == ERROR:
+                _note_failure(self.name)
+            if on_hit:
+                on_hit(outcome)
+            return value
+        try:
+            value = fetch()
+        except Exception:
+            self._record_call(ok=False)
+            self._set(key, ERROR)
+            _note_failure(self.name)
+            raise
+        self._record_call(ok=True)
+        self._set(key, FOUND if value is not None else NOT_FOUND, value)
+        return value
+
+    @property
+    def circuit_open(self) -> bool:
+        return time.monotonic() < self._open_until
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = dict.fromkeys(self.ttls, 0)
+            self.misses = 0
+            self.short_circuited = 0
+            self._consecutive_errors = 0
+            self._open_until = 0.0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """
+        Entries and hits per outcome, misses, overall hit rate, (with a price) USD saved per
+        outcome, and the circuit breaker's state and short-circuited lookups.
+        """
+        with self._lock:
+            entries = Counter(outcome for _, outcome, _ in self._data.values())
+            hits = dict(self.hits)
+            misses = self.misses
+            short_circuited = self.short_circuited
+        lookups = sum(hits.values()) + misses
+        price = self.cost_per_call() if self.cost_per_call else 0.0
+        return {
+            "lookups": lookups,
+            "misses": misses,
+            "hit_rate": round(sum(hits.values()) / lookups, 3) if lookups else None,
+            "circuit_open": self.circuit_open,
+            "short_circuited": short_circuited,
+            **{outcome: {
+                "entries": entries.get(outcome, 0),
+                "hits": hits[outcome],
+                "hit_rate": round(hits[outcome] / lookups, 3) if lookups else None,
+                "saved_usd": round(hits[outcome] * price, 4),
+            } for outcome in self.ttls},
+        }
+
+    @classmethod
+    def stats_all(cls) -> dict:
+        """`stats` of every lookup cache in the process, by name."""
+        return {cache.name: cache.stats() for cache in cls._instances}
+
+    @classmethod
+    def clear_all(cls):
+        for cache in cls._instances:
+            cache.clear()
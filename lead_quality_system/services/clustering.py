@@ -0,0 +1,155 @@
+import logging
+import re
+import zlib
+from collections import defaultdict
+from typing import NamedTuple
+
+import pandas as pd
+
+from ..config import Config
+from ..normalize import compact_name, phone_digits
+from ..rules import FREE_MAIL_DOMAINS, name_similarity
+from .email_domains import BUSINESS, EmailDomainIndex
+from .profiling import NORMALIZE, SIMILARITY, stage
+
+logger = logging.getLogger(__name__)
+
+# Min-hash signatures per name; two rows in the same zip sharing any one are compared.
+# Each is an independent universal hash (a * crc32(gram) + b) mod p over the name's trigrams.
+_MERSENNE_61 = (1 << 61) - 1
+_NAME_HASHES = (
+    (0x1F3D5B79A2C4E681, 0x0B7E151628AED2A6),
+    (0x13198A2E03707344, 0x0A4093822299F31D),
+    (0x082EFA98EC4E6C89, 0x152A8B3C1D2E3F47),
+)
+NAME_BLOCK_HASHES = len(_NAME_HASHES)
+
+class _Row(NamedTuple):
+    position: int
+    name: str
+    phone: str
+    domain: str
+    zip5: str
+    numbers: tuple  # digit runs in the name: store numbers, street numbers
+
+class _UnionFind:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, a: int, b: int):
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            # Lowest position stays the root so cluster ids follow file order
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+class LeadClusterer:
+    """
+    Groups rows of one upload that describe the same business, so each
+    business is enriched once.
+
+    Rows are only compared within blocks: same normalized phone, same business
+    email domain, or same zip plus a shared min-hash of the compacted name's
+    trigrams ('C A L A F I A Home Design' and 'Calafia Home Design' compact to
+    the same string). Matching pairs are merged with union-find. Without a
+    shared phone, names whose digit runs differ ('Jiffy Lube #12' and '#13')
+    are different businesses however similar the rest of the name is.
+    """
+    PHONE_NAME_SIM = 0.3  # same number: only obviously different businesses stay apart
+    DOMAIN_NAME_SIM = 0.6
+
+    @staticmethod
+    def _trigrams(name: str) -> set:
+        return {name[i:i + 3] for i in range(max(len(name) - 2, 1))}
+
+    @classmethod
+    def _blocking_keys(cls, row: _Row) -> list:
+        keys = []
+        if row.phone:
+            keys.append(f"p:{row.phone}")
+        if row.domain:
+            keys.append(f"e:{row.domain}")
+        if row.name and row.zip5:
+            grams = [(zlib.crc32(g.encode("utf-8")), g) for g in cls._trigrams(row.name)]
+            for seed, (a, b) in enumerate(_NAME_HASHES):
+                gram = min(grams, key=lambda hg: ((a * hg[0] + b) % _MERSENNE_61, hg[1]))[1]
+                keys.append(f"n{seed}:{row.zip5}:{gram}")
+        return keys
+
+    @classmethod
+    def _same_business(cls, a: _Row, b: _Row) -> bool:
+        if not a.name or not b.name:
+            return bool(a.phone) and a.phone == b.phone
+        similarity = name_similarity(a.name, b.name)
+        if a.phone and a.phone == b.phone:
+            return similarity >= cls.PHONE_NAME_SIM
+        if a.numbers != b.numbers:
+            return False
+        if a.domain and a.domain == b.domain:
+            return similarity >= cls.DOMAIN_NAME_SIM
+        return a.zip5 == b.zip5 and similarity >= Config.CLUSTER_NAME_SIM
+
+    @staticmethod
+    def _rows(df: pd.DataFrame) -> list:
+        phones = df["phone"].fillna("").map(phone_digits)
+        domains = df["email"].fillna("").str.split("@").str[-1].str.strip().str.lower()
+        business = EmailDomainIndex.default().classify(domains) == BUSINESS
+        domains = domains.where(df["email"].fillna("").str.contains("@") & business & ~domains.isin(FREE_MAIL_DOMAINS), "")
+        names = df["business_name"].fillna("").map(compact_name)
+        return [
+            _Row(i, name, phone if len(phone) == 10 else "", domain, (zip_code or "").strip()[:5], tuple(re.findall(r"\d+", name)))
+            for i, (name, phone, domain, zip_code) in enumerate(zip(names, phones, domains, df["zip_code"].fillna("")))
+        ]
+
+    @classmethod
+    def cluster(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        `df` must have the BatchProcessor input columns. Returns a frame aligned to
+        df.index with `cluster_id` (1-based, in order of first appearance) and
+        `cluster_representative`: the row that is enriched for the whole cluster,
+        the first member with a 10-digit phone (else the first member).
+        """
+        with stage(NORMALIZE):
+            rows = cls._rows(df)
+            blocks = defaultdict(list)
+            for row in rows:
+                for key in cls._blocking_keys(row):
+                    blocks[key].append(row)
+
+        uf = _UnionFind(len(rows))
+        compared = set()
+        oversized = 0
+        with stage(SIMILARITY):
+            for members in blocks.values():
+                if len(members) > Config.CLUSTER_MAX_BLOCK:
+                    # A shared switchboard number or a one-word name in a dense zip: pairwise would be quadratic
+                    oversized += 1
+                    continue
+                for i, a in enumerate(members):
+                    for b in members[i + 1:]:
+                        pair = (a.position, b.position)
+                        if pair in compared or uf.find(a.position) == uf.find(b.position):
+                            continue
+                        compared.add(pair)
+                        if cls._same_business(a, b):
+                            uf.union(a.position, b.position)
+        if oversized:
+            logger.info(f"Skipped {oversized} blocking keys larger than {Config.CLUSTER_MAX_BLOCK} rows")
+
+        roots = [uf.find(row.position) for row in rows]
+        ids = {}
+        cluster_ids = [ids.setdefault(root, len(ids) + 1) for root in roots]
+        representative = {}
+        for row, cluster_id in zip(rows, cluster_ids):
+            current = representative.get(cluster_id)
+            if current is None or (row.phone and not rows[current].phone):
+                representative[cluster_id] = row.position
+        return pd.DataFrame({
+            "cluster_id": cluster_ids,
+            "cluster_representative": [representative[c] == row.position for row, c in zip(rows, cluster_ids)],
+        }, index=df.index)
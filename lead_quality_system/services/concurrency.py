@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+
+from ..config import Config
+from .profiling import PROVIDER_IO, stage
+
+class AdaptiveLimiter:
+    """
+    AIMD in-flight limit for one provider.
+
+    Every success adds 1/limit (about +1 per round trip at full load). Throttling
+    (429, 5xx, timeouts) halves the limit; latency drifting well above the
+    best latency of the last LATENCY_WINDOW responses shrinks it gently (a
+    windowed baseline, so one unusually fast response can't pin the limit to the
+    floor). Decreases are spaced by roughly one round trip so a burst of failures
+    from the same window only counts once.
+    """
+    LATENCY_WINDOW = 50
+
+    def __init__(self, name: str, initial: int, min_limit: int, max_limit: int,
+                 latency_tolerance: float = 2.0):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_tolerance = latency_tolerance
+        self._limit = float(max(min_limit, min(initial, max_limit)))
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._started = time.monotonic()
+        self._last_decrease = 0.0
+        self._min_latency = None
+        self._recent_latency = deque(maxlen=self.LATENCY_WINDOW)
+        self._ewma_latency = None
+        self.successes = 0
+        self.errors = 0
+        self.throttled = 0
+        self.history = deque([(0.0, int(self._limit))], maxlen=500)
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    def acquire(self):
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency: float, ok: bool, congested: bool = False):
+        with self._cond:
+            self._in_flight -= 1
+            before = int(self._limit)
+            if ok:
+                self.successes += 1
+                self._observe_latency(latency)
+                if self._ewma_latency > self._min_latency * self.latency_tolerance:
+                    self._decrease(0.9)
+                else:
+                    self._limit = min(self.max_limit, self._limit + 1.0 / self._limit)
+            else:
+                self.errors += 1
+                if congested:
+                    self.throttled += 1
+                    self._decrease(0.5)
+            if int(self._limit) != before:
+                self.history.append((round(time.monotonic() - self._started, 3), int(self._limit)))
+            self._cond.notify_all()
+
+    def _observe_latency(self, latency: float):
+        self._recent_latency.append(latency)
+        self._min_latency = min(self._recent_latency)
+        self._ewma_latency = latency if self._ewma_latency is None else 0.8 * self._ewma_latency + 0.2 * latency
+
+    def _decrease(self, factor: float):
+        now = time.monotonic()
+        if now - self._last_decrease < (self._ewma_latency or 1.0):
+            return
+        self._last_decrease = now
+        self._limit = max(float(self.min_limit), self._limit * factor)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "successes": self.successes,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "ewma_latency_ms": round(self._ewma_latency * 1000, 1) if self._ewma_latency else None,
+                "min_latency_ms": round(self._min_latency * 1000, 1) if self._min_latency else None,
+                "history": list(self.history),
+            }
+
+class ConcurrencyController:
+    """
+    Process-wide registry of limiters, one per provider endpoint (endpoints of one
+    provider can have very different latencies). Wrap each outbound call in `track(endpoint)`.
+    """
+    _limiters = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def limiter(cls, provider: str) -> AdaptiveLimiter:
+        with cls._lock:
+            if provider not in cls._limiters:
+                cls._limiters[provider] = AdaptiveLimiter(
+                    provider,
+                    initial=Config.CONCURRENCY_INITIAL,
+                    min_limit=1,
+                    max_limit=Config.CONCURRENCY_MAX,
+                )
+            return cls._limiters[provider]
+
+    @staticmethod
+    def _is_congestion(error: Exception) -> bool:
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code == 429 or error.response.status_code >= 500
+        return isinstance(error, (requests.Timeout, requests.ConnectionError))
+
+    @classmethod
+    @contextmanager
+    def track(cls, provider: str):
+        limiter = cls.limiter(provider)
+        with stage(PROVIDER_IO):
+            limiter.acquire()
+            start = time.monotonic()
+            try:
+                yield
+            except Exception as e:
+                limiter.release(time.monotonic() - start, ok=False, congested=cls._is_congestion(e))
+                raise
+            else:
+                limiter.release(time.monotonic() - start, ok=True)
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        with cls._lock:
+            limiters = dict(cls._limiters)
+        return {name: limiter.snapshot() for name, limiter in limiters.items()}
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._limiters = {}
@@ -1,62 +1,262 @@
 import pandas as pd
-import concurrent.futures
-from typing import List, Dict
-from ..models import Lead, EnrichmentResult
+import time
+from dataclasses import replace
+from typing import Callable, List, Dict
+from ..config import Config
+from ..models import Lead, LeadEvidence, EnrichmentResult
+from ..normalize import phone_digits
 from ..scorer import LeadScorer
+from .cache import LookupCache
+from .clustering import LeadClusterer
+from .concurrency import ConcurrencyController
+from .evidence_store import EvidenceStore
+from .lead_store import LeadStore
+from . import profiling
+from .planner import BatchPlanner
+from .result_store import ResultStore
+from .scheduler import JobPriority, JobScheduler
+
+# Columns every output row has, whether it was scored, failed or deferred
+RESULT_COLUMNS = ["score", "quality_tier", "verified_name", "website", "match_reasons", "sources"]
 
 class BatchProcessor:
     @staticmethod
-    def process_csv(file) -> pd.DataFrame:
+    def load_csv(file) -> pd.DataFrame:
+        """
+        Reads and validates a CSV file-like object.
+        Expected columns: 'business_name', 'phone', 'zip_code', 'email'
+        """
+        # Force all columns to be strings to prevent phone/zip corruption (e.g. dropping leading + or 0)
+        df = pd.read_csv(file, dtype=str)
+        # Normalize column names to lower case
+        df.columns = df.columns.str.lower().str.strip()
+
+        required_cols = {'business_name', 'phone', 'zip_code', 'email'}
+        if not required_cols.issubset(df.columns):
+            missing = required_cols - set(df.columns)
+            raise ValueError(f"Missing required columns: {missing}")
+        return df
+
+    @staticmethod
+    def _row_lead(row) -> Lead:
+        return Lead(
+            business_name=str(row['business_name']),
+            phone=str(row['phone']),
+            zip_code=str(row['zip_code']),
+            email=str(row['email']) if pd.notna(row['email']) else ""
+        )
+
+    @staticmethod
+    def _member_evidence(evidence: LeadEvidence, lead: Lead) -> LeadEvidence:
+        """
+        The cluster's evidence as it applies to one member: its own phone check, and
+        no phone lookups unless the member has the same number they were made for.
+        """
+        member = replace(evidence, lead=lead, phone_check=LeadScorer.check_phone(lead))
+        if phone_digits(lead.phone) != phone_digits(evidence.lead.phone):
+            member = replace(member, google_phone=None, yelp_phone=None,
+                             attempted=[a for a in evidence.attempted if a not in ("google_phone", "yelp_phone")],
+                             failed=[f for f in evidence.failed if f not in ("google_phone", "yelp_phone")])
+        return member
+
+    @classmethod
+    def _enrich(cls, leads: List[Lead], store: EvidenceStore = None) -> List[EnrichmentResult]:
+        """
+        Enrich one cluster: the first lead is the representative and the only one
+        sent to the providers; every member is scored against that evidence.
+        """
+        evidence, fetched = None, False
+        if store is not None and Config.EVIDENCE_MAX_AGE_DAYS > 0:
+            # Only rows with the representative's number hold its phone lookups unstripped
+            phone = phone_digits(leads[0].phone)
+            stored = (store.get(lead, Config.EVIDENCE_MAX_AGE_DAYS) for lead in leads if phone_digits(lead.phone) == phone)
+            evidence = next((e for e in stored if e is not None), None)
+        if evidence is None:
+            evidence, fetched = LeadScorer.collect_evidence(leads[0]), True
+        # Score the shared payloads against each row (its name, phone and email)
+        members = [cls._member_evidence(evidence, lead) for lead in leads]
+        # Partial evidence (a provider call failed) is scored but not kept for reuse
+        if fetched and store is not None and not evidence.failed:
+            store.put_many(members)
+        return [LeadScorer.score_evidence(member) for member in members]
+
+    @staticmethod
+    def _result_row(res: EnrichmentResult) -> dict:
+        return {
+            "score": res.score,
+            "quality_tier": res.quality_tier,
+            "verified_name": res.verified_business_name,
+            "website": res.website,
+            "match_reasons": "; ".join(res.match_reasons),
+            "sources": ", ".join(res.sources)
+        }
+
+    @staticmethod
+    def _error_row(error) -> dict:
+        return {"score": 0, "quality_tier": "Error", "match_reasons": str(error)}
+
+    @classmethod
+    def process_csv(cls, file, evidence_store: EvidenceStore = None,
+                    priority: JobPriority = JobPriority.NORMAL, weight: float = 1.0,
+                    name: str = None, on_progress: Callable[[dict], None] = None,
+                    budget: float = None, profile: bool = None,
+                    output: ResultStore = None, lead_store: LeadStore = None) -> pd.DataFrame:
         """
         Reads a CSV file-like object and processes rows in parallel.
         Expected columns: 'business_name', 'phone', 'zip_code', 'email'
+        Raw evidence is persisted to `evidence_store` (or Config.EVIDENCE_STORE_PATH) when given,
+        and stored evidence younger than Config.EVIDENCE_MAX_AGE_DAYS is reused instead of
+        calling the providers again.
+        Rows run as one job on the process-wide JobScheduler, sharing workers fairly with
+        other jobs by priority and weight; `on_progress` receives the job's progress dict.
+        With a `budget` (USD), BatchPlanner picks the highest-value rows that fit and the
+        rest are returned with quality_tier "Deferred".
+        Rows that are the same business (see LeadClusterer) are enriched once and share the
+        result; the output gets a `cluster_id` column. Job progress counts clusters.
+        In-flight calls per provider are set at runtime by ConcurrencyController. Run metrics,
+        including the per-provider limit history, are attached as `result.attrs["batch_metrics"]`.
+        With `profile` (default Config.PROFILE) the run is profiled (see services.profiling)
+        and the report directory is added to the metrics as "profile_dir".
+        With an `output` ResultStore, rows are written there as their clusters finish (metrics
+        "output") and the returned frame has no rows, only the metrics, so the full result is
+        never held in memory; page and export it from the store instead.
+        Scored rows are upserted into `lead_store` (default LeadStore.default(), if configured).
+        """
+        evidence_store = evidence_store or EvidenceStore.default()
+        lead_store = lead_store or LeadStore.default()
+        stored_leads = 0
+
+        def write(chunk: pd.DataFrame):
+            nonlocal stored_leads
+            if output is not None:
+                output.write(chunk)
+            if lead_store is not None:
+                with profiling.stage(profiling.CSV_WRITE):
+                    stored_leads += lead_store.put_frame(chunk)
+
+        with profiling.profiled(name or "batch", enabled=profile) as session:
+            if output is not None:
+                final_df = cls._run(file, evidence_store, priority, weight, name, on_progress, budget, sink=write)
+                final_df.attrs["batch_metrics"]["output"] = output.path
+            else:
+                final_df = cls._run(file, evidence_store, priority, weight, name, on_progress, budget)
+                write(final_df)
+            if lead_store is not None:
+                final_df.attrs["batch_metrics"]["stored_leads"] = stored_leads
+        if session is not None and session.output_dir:
+            final_df.attrs["batch_metrics"]["profile_dir"] = session.output_dir
+        return final_df
+
+    @staticmethod
+    def _result_frame(df: pd.DataFrame, clusters: pd.DataFrame, processed_data: Dict[int, dict]) -> pd.DataFrame:
+        """Input rows joined with their result columns, for the rows in `processed_data`."""
+        result_df = pd.DataFrame.from_dict(processed_data, orient='index').reindex(columns=RESULT_COLUMNS)
+        final_df = df.loc[df.index.isin(result_df.index)].join(result_df)
+        if clusters is not None:
+            final_df["cluster_id"] = clusters["cluster_id"]
+        return final_df
+
+    @classmethod
+    def _run(cls, file, evidence_store: EvidenceStore, priority: JobPriority, weight: float,
+             name: str, on_progress: Callable[[dict], None], budget: float,
+             sink: Callable[[pd.DataFrame], None] = None) -> pd.DataFrame:
+        """
+        Enrich the CSV. With a `sink`, each batch of finished rows is passed to it as soon as
+        it completes (in completion order, indexed by input row) and the returned frame only
+        carries the metrics.
         """
         try:
-            # Force all columns to be strings to prevent phone/zip corruption (e.g. dropping leading + or 0)
-            df = pd.read_csv(file, dtype=str)
-            # Normalize column names to lower case
-            df.columns = df.columns.str.lower().str.strip()
-            
-            required_cols = {'business_name', 'phone', 'zip_code', 'email'}
-            if not required_cols.issubset(df.columns):
-                missing = required_cols - set(df.columns)
-                raise ValueError(f"Missing required columns: {missing}")
-            
-            results = []
-            
-            with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-                # Prepare futures
-                future_to_row = {}
-                for index, row in df.iterrows():
-                    lead = Lead(
-                        business_name=str(row['business_name']),
-                        phone=str(row['phone']),
-                        zip_code=str(row['zip_code']),
-                        email=str(row['email']) if pd.notna(row['email']) else ""
-                    )
-                    future = executor.submit(LeadScorer.enrich_and_score, lead)
-                    future_to_row[future] = index
-
-                # Collect results
-                processed_data = {} # Map index to result for verified order
-                for future in concurrent.futures.as_completed(future_to_row):
-                    index = future_to_row[future]
-                    try:
-                        res: EnrichmentResult = future.result()
-                        processed_data[index] = {
-                            "score": res.score,
-                            "quality_tier": res.quality_tier,
-                            "verified_name": res.verified_business_name,
-                            "website": res.website,
-                            "match_reasons": "; ".join(res.match_reasons),
-                            "sources": ", ".join(res.sources)
-                        }
-                    except Exception as e:
-                        processed_data[index] = {"score": 0, "quality_tier": "Error", "match_reasons": str(e)}
-
-            # Append results to original DataFrame
-            result_df = pd.DataFrame.from_dict(processed_data, orient='index')
-            final_df = df.join(result_df)
+            with profiling.stage(profiling.NORMALIZE):
+                df = cls.load_csv(file)
+            profiling.chunk("loaded")
+            clusters = LeadClusterer.cluster(df) if Config.CLUSTER_LEADS else None
+
+            plan = None
+            selected = df.index
+            if budget is not None:
+                plan = BatchPlanner.plan(df, evidence_store, budget=budget, clusters=clusters)
+                selected = df.index[plan.row_plan["planned"].to_numpy()]
+
+            # One task per cluster, representative first; without clustering every row is its own task
+            if clusters is None:
+                groups = [[index] for index in selected]
+            else:
+                picked = clusters.loc[selected].sort_values("cluster_representative", ascending=False, kind="stable")
+                groups = [list(g.index) for _, g in picked.groupby("cluster_id", sort=False)]
+
+            started = time.monotonic()
+            with profiling.stage(profiling.NORMALIZE):
+                tasks = [([cls._row_lead(df.loc[index]) for index in group], evidence_store) for group in groups]
+            scheduler = JobScheduler.default()
+            job = scheduler.submit(cls._enrich, tasks, priority=priority, weight=weight, name=name)
+            processed_data = {}
+            collected = set()
+
+            def collect(positions) -> dict:
+                """Result rows of the given finished groups, by input row."""
+                rows = {}
+                for position in positions:
+                    collected.add(position)
+                    if position in job.results:
+                        for index, res in zip(groups[position], job.results[position]):
+                            rows[index] = cls._result_row(res)
+                    else:
+                        for index in groups[position]:
+                            rows[index] = cls._error_row(job.errors.get(position))
+                return rows
+
+            def flush():
+                finished = [p for p in (*list(job.results), *list(job.errors)) if p not in collected]
+                if finished:
+                    with profiling.stage(profiling.RESULT_ASSEMBLY):
+                        chunk = cls._result_frame(df, clusters, collect(finished))
+                    sink(chunk)
+
+            next_chunk = Config.PROFILE_CHUNK_ROWS
+            try:
+                while not job.wait(timeout=0.5):
+                    if on_progress:
+                        on_progress(job.progress())
+                    if sink is not None:
+                        flush()
+                    if job.completed >= next_chunk:
+                        profiling.chunk(f"{job.completed} tasks done")
+                        next_chunk = job.completed + Config.PROFILE_CHUNK_ROWS
+            finally:
+                # Caller gave up (e.g. a Streamlit rerun): don't leave its rows queued
+                if not job.done():
+                    scheduler.cancel(job)
+            if on_progress:
+                on_progress(job.progress())
+            profiling.chunk("enriched")
+
+            # Collect the remaining results, mapped back to the original row order
+            with profiling.stage(profiling.RESULT_ASSEMBLY):
+                processed_data.update(collect(p for p in range(len(groups)) if p not in collected))
+                for index in df.index.difference(selected):
+                    processed_data[index] = {"score": 0, "quality_tier": "Deferred", "match_reasons": "Deferred: over batch budget"}
+
+                if sink is None:
+                    final_df = cls._result_frame(df, clusters, processed_data)
+                else:
+                    if processed_data:
+                        sink(cls._result_frame(df, clusters, processed_data))
+                    final_df = pd.DataFrame()
+            final_df.attrs["batch_metrics"] = {
+                "rows": len(df),
+                "clusters": int(clusters["cluster_id"].nunique()) if clusters is not None else len(df),
+                "elapsed_s": round(time.monotonic() - started, 2),
+                "job": job.progress(),
+                "concurrency": ConcurrencyController.snapshot(),
+                "lookup_caches": LookupCache.stats_all(),
+            }
+            if plan is not None:
+                final_df.attrs["batch_metrics"]["plan"] = {
+                    "budget_usd": plan.budget_usd,
+                    "est_cost_usd": plan.total_cost_usd,
+                    "planned_rows": plan.planned_rows,
+                    "deferred_rows": plan.deferred_rows,
+                }
             return final_df
 
         except Exception as e:
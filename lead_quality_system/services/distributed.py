@@ -0,0 +1,184 @@
+import logging
+import os
+import socket
+import time
+from typing import Callable, Dict
+
+import pandas as pd
+
+from ..config import Config
+from .clustering import LeadClusterer
+from .csv_processor import BatchProcessor
+from .evidence_store import EvidenceStore
+from .scheduler import JobPriority, JobScheduler
+from .work_queue import LEASED, PENDING, Lease, WorkQueue
+
+logger = logging.getLogger(__name__)
+
+class Coordinator:
+    """
+    Splits a batch into chunks of whole clusters on a WorkQueue and merges the
+    workers' results back into one frame in input order.
+    """
+
+    @staticmethod
+    def submit(file, queue: WorkQueue, name: str = None, chunk_rows: int = None) -> str:
+        """Load and cluster the CSV, enqueue it in chunks of about `chunk_rows` rows; returns the job id."""
+        chunk_rows = chunk_rows or Config.QUEUE_CHUNK_ROWS
+        df = BatchProcessor.load_csv(file).reset_index(drop=True)
+        clusters = LeadClusterer.cluster(df) if Config.CLUSTER_LEADS else None
+        records = df.astype(object).where(df.notna(), None).to_dict("records")
+
+        # Same grouping as BatchProcessor: one task per cluster, representative first
+        if clusters is None:
+            groups = [(None, [row]) for row in range(len(df))]
+        else:
+            ordered = clusters.sort_values("cluster_representative", ascending=False, kind="stable")
+            groups = [(int(c), list(g.index)) for c, g in ordered.groupby("cluster_id", sort=False)]
+
+        payloads, current, size = [], [], 0
+        for cluster_id, rows in groups:
+            current.append({"cluster_id": cluster_id, "rows": rows, "leads": [records[r] for r in rows]})
+            size += len(rows)
+            if size >= chunk_rows:
+                payloads.append({"groups": current})
+                current, size = [], 0
+        if current:
+            payloads.append({"groups": current})
+
+        job_id = queue.submit(name or "batch", payloads, len(df))
+        logger.info(f"Submitted job {job_id}: {len(df)} rows, {len(groups)} businesses, {len(payloads)} chunks")
+        return job_id
+
+    @staticmethod
+    def wait(queue: WorkQueue, job_id: str, on_progress: Callable[[dict], None] = None,
+             timeout: float = None) -> dict:
+        """
+        Poll until no chunk is pending or leased (or `timeout`); returns the last status.
+        Chunks whose lease ran out count as pending, so this only returns once some
+        worker has redone them.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            status = queue.status(job_id)
+            if on_progress:
+                on_progress(status)
+            if status[PENDING] + status[LEASED] == 0:
+                return status
+            if deadline is not None and time.monotonic() >= deadline:
+                return status
+            time.sleep(Config.QUEUE_POLL_S)
+
+    @staticmethod
+    def collect(queue: WorkQueue, job_id: str) -> pd.DataFrame:
+        """
+        Input rows joined with their results. Rows of failed chunks get tier "Error";
+        rows whose chunk has not finished yet get "Pending".
+        """
+        records, cluster_ids, missing = {}, {}, {}
+        for _, payload, error in queue.chunks(job_id):
+            for group in payload["groups"]:
+                for row, record in zip(group["rows"], group["leads"]):
+                    records[row] = record
+                    cluster_ids[row] = group["cluster_id"]
+                    missing[row] = error
+        results = queue.results(job_id)
+        status = queue.status(job_id)
+
+        processed_data = {}
+        for row in records:
+            if row in results:
+                processed_data[row] = results[row]
+            elif missing[row] is not None:
+                processed_data[row] = BatchProcessor._error_row(missing[row])
+            else:
+                processed_data[row] = {"score": 0, "quality_tier": "Pending", "match_reasons": "Chunk not finished"}
+
+        rows = sorted(records)
+        df = pd.DataFrame([records[r] for r in rows], index=rows)
+        final_df = df.join(pd.DataFrame.from_dict(processed_data, orient="index"))
+        if any(cluster_ids[r] is not None for r in rows):
+            final_df["cluster_id"] = pd.Series(cluster_ids)
+        final_df.attrs["batch_metrics"] = {
+            "rows": len(final_df),
+            "clusters": int(final_df["cluster_id"].nunique()) if "cluster_id" in final_df else len(final_df),
+            "job": status,
+        }
+        return final_df
+
+class Worker:
+    """
+    Pulls chunks from a WorkQueue and enriches them on this process's JobScheduler,
+    extending the lease while the chunk runs. Provider keys, rate limits and the
+    evidence store are whatever this node's Config says.
+    """
+
+    def __init__(self, queue: WorkQueue, name: str = None, lease_s: float = None,
+                 evidence_store: EvidenceStore = None):
+        self.queue = queue
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_s = lease_s or Config.QUEUE_LEASE_S
+        self.evidence_store = evidence_store or EvidenceStore.default()
+
+    def process(self, lease: Lease) -> Dict[int, dict]:
+        """Results by input row for one claimed chunk."""
+        groups = lease.payload["groups"]
+        tasks = [([BatchProcessor._row_lead(record) for record in g["leads"]], self.evidence_store) for g in groups]
+        scheduler = JobScheduler.default()
+        job = scheduler.submit(BatchProcessor._enrich, tasks, priority=JobPriority.NORMAL,
+                               name=f"{lease.job_id}/{lease.chunk_id}")
+        try:
+            while not job.wait(timeout=self.lease_s / 3):
+                if not self.queue.extend(lease, self.lease_s):
+                    # Someone else may be redoing it; finish anyway, completion is idempotent
+                    logger.warning(f"Lost lease on {lease.job_id}/{lease.chunk_id}")
+        finally:
+            if not job.done():
+                scheduler.cancel(job)
+
+        results = {}
+        for position, group in enumerate(groups):
+            if position in job.results:
+                for row, res in zip(group["rows"], job.results[position]):
+                    results[row] = BatchProcessor._result_row(res)
+            else:
+                for row in group["rows"]:
+                    results[row] = BatchProcessor._error_row(job.errors.get(position))
+        return results
+
+    def run(self, max_chunks: int = None, idle_timeout: float = None, until_job: str = None) -> int:
+        """
+        Claim and process chunks until `max_chunks` are done, the queue has been
+        empty for `idle_timeout` seconds, or job `until_job` has no pending or leased
+        chunk left (forever when all are None). Returns chunks completed.
+        """
+        completed = 0
+        idle_since = time.monotonic()
+        while max_chunks is None or completed < max_chunks:
+            lease = self.queue.claim(self.name, self.lease_s)
+            if lease is None:
+                if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    break
+                if until_job is not None:
+                    # Another worker's lease may still run out and need redoing, so idling isn't enough
+                    status = self.queue.status(until_job)
+                    if status[PENDING] + status[LEASED] == 0:
+                        break
+                time.sleep(Config.QUEUE_POLL_S)
+                continue
+            started = time.monotonic()
+            try:
+                results = self.process(lease)
+            except KeyboardInterrupt:
+                self.queue.fail(lease, "Worker stopped")
+                raise
+            except Exception as e:
+                logger.error(f"Chunk {lease.job_id}/{lease.chunk_id} failed (attempt {lease.attempts}): {e}")
+                self.queue.fail(lease, str(e))
+            else:
+                self.queue.complete(lease, results)
+                completed += 1
+                logger.info(f"{self.name} completed {lease.job_id}/{lease.chunk_id} "
+                            f"({len(results)} rows) in {time.monotonic() - started:.1f}s")
+            idle_since = time.monotonic()
+        return completed
@@ -0,0 +1,167 @@
+import difflib
+import logging
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+from urllib.parse import urlparse
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+DEFAULT_BLOCKLIST_PATH = os.path.join(DATA_DIR, "directory_domains.txt")
+
+# Multi-label public suffixes we are likely to meet. Load a full
+# public_suffix_list.dat through PUBLIC_SUFFIX_PATH for complete coverage.
+DEFAULT_PUBLIC_SUFFIXES = {
+    "co.uk", "org.uk", "ac.uk", "gov.uk", "ltd.uk", "plc.uk", "me.uk",
+    "com.au", "net.au", "org.au", "co.nz", "org.nz", "co.za", "co.in", "co.jp",
+    "com.br", "com.mx", "com.ar", "com.co", "com.sg", "com.hk", "com.tw", "com.cn",
+    "us.com", "uk.com", "eu.com",
+    "ca.us", "ny.us", "tx.us", "fl.us",
+}
+
+# Words that carry no identity when matching a business name to a domain
+NAME_STOPWORDS = {"the", "and", "inc", "llc", "ltd", "co", "corp", "company", "of", "services", "service"}
+
+@dataclass
+class DomainVerdict:
+    url: str
+    host: str
+    domain: str  # registrable domain, e.g. "calafiahomedesign.com"
+    blocked: bool
+    category: Optional[str] = None  # "directory", "social", "aggregator", ...
+    affinity: float = 0.0  # 0..1 resemblance between business name and domain label
+
+def _host(url: str) -> str:
+    if "//" not in url:
+        url = "//" + url
+    host = (urlparse(url).hostname or "").lower().rstrip(".")
+    if host.startswith("www."):
+        host = host[4:]
+    return host
+
+class DomainClassifier:
+    """
+    Registrable-domain extraction plus hashed blocklist lookup.
+
+    Lookups walk the host's label suffixes ("a.b.yelp.com" -> "b.yelp.com" ->
+    "yelp.com" -> "com") against a set, so cost depends on the number of labels
+    rather than the size of the blocklist, and "notyelp.com" never matches "yelp.com".
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, blocklist: dict = None, suffixes: set = None,
+                 wildcard_suffixes: set = None, suffix_exceptions: set = None):
+        self.blocklist = blocklist or {}
+        self.suffixes = suffixes if suffixes is not None else set(DEFAULT_PUBLIC_SUFFIXES)
+        self.wildcard_suffixes = wildcard_suffixes or set()
+        self.suffix_exceptions = suffix_exceptions or set()
+
+    @classmethod
+    def default(cls) -> "DomainClassifier":
+        """Shared instance built from the bundled list plus any configured files."""
+        with cls._default_lock:
+            if cls._default is None:
+                classifier = cls()
+                classifier.load_blocklist(DEFAULT_BLOCKLIST_PATH)
+                for path in filter(None, (Config.DIRECTORY_BLOCKLIST_PATH or "").split(os.pathsep)):
+                    classifier.load_blocklist(path)
+                if Config.PUBLIC_SUFFIX_PATH:
+                    classifier.load_public_suffixes(Config.PUBLIC_SUFFIX_PATH)
+                cls._default = classifier
+            return cls._default
+
+    def load_blocklist(self, path: str, default_category: str = "directory"):
+        """One domain per line, optionally followed by a category. '#' starts a comment."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split("#", 1)[0].split()
+                    if parts:
+                        self.blocklist[parts[0].lower().lstrip(".")] = parts[1] if len(parts) > 1 else default_category
+        except OSError as e:
+            logger.error(f"Could not load domain blocklist {path}: {e}")
+
+    def load_public_suffixes(self, path: str):
+        """Load rules in public_suffix_list.dat format (plain, '*.' wildcard and '!' exception rules)."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    rule = line.strip().split(" ", 1)[0].lower()
+                    if not rule or rule.startswith("//"):
+                        continue
+                    if rule.startswith("!"):
+                        self.suffix_exceptions.add(rule[1:])
+                    elif rule.startswith("*."):
+                        self.wildcard_suffixes.add(rule[2:])
+                    else:
+                        self.suffixes.add(rule)
+        except OSError as e:
+            logger.error(f"Could not load public suffix list {path}: {e}")
+
+    def _suffix_length(self, labels: List[str]) -> int:
+        """Number of trailing labels forming the public suffix (at least 1)."""
+        # Longest candidate first, so the longest matching rule wins
+        for i in range(len(labels)):
+            candidate = ".".join(labels[i:])
+            if candidate in self.suffix_exceptions:
+                return len(labels) - i - 1
+            if candidate in self.suffixes or ".".join(labels[i + 1:]) in self.wildcard_suffixes:
+                return len(labels) - i
+        return 1
+
+    def registrable_domain(self, host: str) -> str:
+        labels = [l for l in host.split(".") if l]
+        if len(labels) < 2:
+            return host
+        keep = min(len(labels), self._suffix_length(labels) + 1)
+        return ".".join(labels[-keep:])
+
+    def _blocked_category(self, host: str) -> Optional[str]:
+        labels = host.split(".")
+        for i in range(len(labels) - 1):
+            category = self.blocklist.get(".".join(labels[i:]))
+            if category:
+                return category
+        return None
+
+    @staticmethod
+    def name_affinity(business_name: str, domain: str) -> float:
+        """
+        How much the domain's label looks like the business name:
+        the better of whole-string similarity and share of name tokens found in the label.
+        """
+        label = domain.split(".")[0].replace("-", "")
+        tokens = [t for t in re.findall(r"[a-z0-9]+", (business_name or "").lower()) if t not in NAME_STOPWORDS]
+        if not label or not tokens:
+            return 0.0
+        # Letter-spaced names ("C A L A F I A") collapse into one token
+        compact = "".join(tokens)
+        ratio = difflib.SequenceMatcher(None, compact, label).ratio()
+        words = [t for t in tokens if len(t) >= 3] or tokens
+        coverage = sum(len(t) for t in words if t in label) / sum(len(t) for t in words)
+        return round(max(ratio, coverage), 3)
+
+    def classify(self, urls: Iterable[str], business_name: str = None) -> List[DomainVerdict]:
+        """Classify a page of candidate URLs in one call; repeated domains are resolved once."""
+        seen = {}
+        verdicts = []
+        for url in urls:
+            host = _host(url or "")
+            if host not in seen:
+                domain = self.registrable_domain(host)
+                category = self._blocked_category(host) if host else "invalid"
+                affinity = self.name_affinity(business_name, domain) if business_name and not category else 0.0
+                seen[host] = (domain, category, affinity)
+            domain, category, affinity = seen[host]
+            verdicts.append(DomainVerdict(url, host, domain, category is not None, category, affinity))
+        return verdicts
+
+def registrable_domain(url_or_host: str) -> str:
+    """Registrable domain of a URL or bare host using the default classifier."""
+    return DomainClassifier.default().registrable_domain(_host(url_or_host or ""))
@@ -0,0 +1,81 @@
+import logging
+import os
+import threading
+from typing import Optional
+
+import pandas as pd
+
+from ..config import Config
+from .domains import registrable_domain
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+DEFAULT_EMAIL_DOMAINS_PATH = os.path.join(DATA_DIR, "email_domains.txt")
+
+BUSINESS = "business"
+# Kinds that say nothing about the business behind the address
+NON_BUSINESS_KINDS = ("free", "isp", "disposable")
+
+def email_domain(email: str) -> str:
+    """Lowercased part after the last '@' ('' when there is no '@')."""
+    email = (email or "").strip().lower()
+    return email.rsplit("@", 1)[-1] if "@" in email else ""
+
+class EmailDomainIndex:
+    """
+    Hashed domain -> kind lookup (free, isp, disposable); unlisted domains are business.
+
+    A domain is looked up as given and then by its registrable domain, so
+    "mail.comcast.net" resolves like "comcast.net". `classify` does the same over
+    a whole column at once with hashed Series.map passes.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, kinds: dict = None):
+        self.kinds = kinds or {}
+
+    @classmethod
+    def default(cls) -> "EmailDomainIndex":
+        """Shared index built from the bundled list plus any configured files."""
+        with cls._default_lock:
+            if cls._default is None:
+                index = cls()
+                index.load(DEFAULT_EMAIL_DOMAINS_PATH)
+                for path in filter(None, (Config.EMAIL_DOMAIN_LIST_PATH or "").split(os.pathsep)):
+                    index.load(path)
+                cls._default = index
+            return cls._default
+
+    def load(self, path: str, default_kind: str = "free"):
+        """One domain per line, optionally followed by its kind. '#' starts a comment."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split("#", 1)[0].split()
+                    if parts:
+                        self.kinds[parts[0].lower()] = parts[1] if len(parts) > 1 else default_kind
+        except OSError as e:
+            logger.error(f"Could not load email domain list {path}: {e}")
+
+    def kind(self, domain: str) -> Optional[str]:
+        """free / isp / disposable / business, or None for an empty domain."""
+        domain = (domain or "").lower()
+        if not domain:
+            return None
+        return self.kinds.get(domain) or self.kinds.get(registrable_domain(domain)) or BUSINESS
+
+    def is_business(self, domain: str) -> bool:
+        return self.kind(domain) == BUSINESS
+
+    def classify(self, domains: pd.Series) -> pd.Series:
+        """Vectorized `kind` over a Series of email domains (NaN / '' -> None)."""
+        domains = domains.fillna("").astype(str).str.lower()
+        kinds = domains.map(self.kinds)
+        # Only subdomain-style leftovers need the registrable-domain pass
+        retry = kinds.isna() & (domains.str.count(r"\.") > 1)
+        if retry.any():
+            kinds[retry] = domains[retry].map(registrable_domain).map(self.kinds)
+        kinds = kinds.fillna(BUSINESS)
+        return kinds.where(domains != "", None)
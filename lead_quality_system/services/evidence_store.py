@@ -0,0 +1,171 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import asdict
+from typing import Iterable, Iterator, Optional
+
+import pandas as pd
+
+from ..config import Config
+from ..models import Lead, LeadEvidence
+from ..normalize import lead_key
+from ..rules import FEATURE_COLUMNS, extract_features
+
+class EvidenceStore:
+    """
+    SQLite-backed store of raw provider evidence, one row per lead identity.
+
+    Each row keeps the zlib-compressed JSON payloads (for audit / feature
+    re-extraction) next to the flattened feature columns, so re-scoring with
+    new rules is a single column scan plus rules.score_frame, with no API traffic.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS evidence (
+                lead_key TEXT PRIMARY KEY,
+                fetched_at REAL,
+                {", ".join(f"{c} {self._sql_type(c)}" for c in FEATURE_COLUMNS)},
+                payload BLOB
+            )
+        """)
+        # Stores created before a feature column existed get it added (NULL = unknown)
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(evidence)")}
+        for column in FEATURE_COLUMNS:
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE evidence ADD COLUMN {column} {self._sql_type(column)}")
+        self._conn.commit()
+
+    @classmethod
+    def default(cls) -> Optional["EvidenceStore"]:
+        """Shared store at Config.EVIDENCE_STORE_PATH, or None when it is not configured."""
+        if not Config.EVIDENCE_STORE_PATH:
+            return None
+        with cls._default_lock:
+            if cls._default is None or cls._default.path != Config.EVIDENCE_STORE_PATH:
+                cls._default = cls(Config.EVIDENCE_STORE_PATH)
+            return cls._default
+
+    @staticmethod
+    def _sql_type(column: str) -> str:
+        if column.endswith(("_hit", "_live", "_owned", "_valid", "_mismatch")) or column == "search_attempted":
+            return "INTEGER"
+        if column.endswith(("_sim", "_km")):
+            return "REAL"
+        return "TEXT"
+
+    @staticmethod
+    def _encode(evidence: LeadEvidence) -> bytes:
+        return zlib.compress(json.dumps(asdict(evidence), separators=(",", ":")).encode("utf-8"))
+
+    @staticmethod
+    def _decode(blob: bytes) -> LeadEvidence:
+        data = json.loads(zlib.decompress(blob).decode("utf-8"))
+        data["lead"] = Lead(**data["lead"])
+        return LeadEvidence(**data)
+
+    def put_many(self, evidence: Iterable[LeadEvidence]):
+        rows = []
+        for e in evidence:
+            features = extract_features(e)
+            values = [None if c.endswith(("_sim", "_km")) and pd.isna(features[c]) else features[c] for c in FEATURE_COLUMNS]
+            rows.append((lead_key(e.lead), e.fetched_at, *values, self._encode(e)))
+        if not rows:
+            return
+        placeholders = ", ".join("?" * (len(FEATURE_COLUMNS) + 3))
+        with self._lock:
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO evidence (lead_key, fetched_at, {', '.join(FEATURE_COLUMNS)}, payload) VALUES ({placeholders})",
+                rows,
+            )
+            self._conn.commit()
+
+    def put(self, evidence: LeadEvidence):
+        self.put_many([evidence])
+
+    def get(self, lead: Lead, max_age_days: float = None) -> Optional[LeadEvidence]:
+        """Stored evidence for the lead, or None if missing or older than max_age_days."""
+        min_fetched = time.time() - max_age_days * 86400 if max_age_days else 0
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM evidence WHERE lead_key = ? AND fetched_at >= ?", (lead_key(lead), min_fetched)
+            ).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def fresh_keys(self, keys: Iterable[str], max_age_days: float = None) -> set:
+        """Subset of the given lead keys that already have (fresh enough) evidence."""
+        keys = list(dict.fromkeys(keys))
+        min_fetched = time.time() - max_age_days * 86400 if max_age_days else 0
+        found = set()
+        with self._lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                sql = f"SELECT lead_key FROM evidence WHERE fetched_at >= ? AND lead_key IN ({', '.join('?' * len(chunk))})"
+                found.update(r[0] for r in self._conn.execute(sql, [min_fetched, *chunk]))
+        return found
+
+    def iter_evidence(self) -> Iterator[LeadEvidence]:
+        # Separate read connection: WAL lets it stream while writers continue
+        conn = sqlite3.connect(self.path)
+        try:
+            for (blob,) in conn.execute("SELECT payload FROM evidence"):
+                yield self._decode(blob)
+        finally:
+            conn.close()
+
+    def features(self, chunksize: int = None):
+        """
+        Feature columns for every stored lead, indexed by lead_key.
+        With chunksize, returns an iterator of frames instead.
+        """
+        sql = f"SELECT lead_key, {', '.join(FEATURE_COLUMNS)} FROM evidence"
+        if chunksize:
+            return self._iter_features(sql, chunksize)
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, index_col="lead_key")
+
+    def _iter_features(self, sql: str, chunksize: int) -> Iterator[pd.DataFrame]:
+        conn = sqlite3.connect(self.path)
+        try:
+            yield from pd.read_sql_query(sql, conn, index_col="lead_key", chunksize=chunksize)
+        finally:
+            conn.close()
+
+    def hit_counts(self, similarity_threshold: float, max_distance_km: float) -> dict:
+        """
+        Provider hit counts over all stored leads, aggregated in SQL (see PlannerPriors):
+        rows, google_phone_hits, google_phone_misses, google_text_accepted (misses whose text
+        match clears the thresholds), google_text_website (... and has a website), yelp_phone_hits.
+        """
+        accepted = "COALESCE(google_text_sim, 0) >= ? AND COALESCE(google_text_distance_km > ?, 0) = 0"
+        sql = f"""
+            SELECT COUNT(*),
+                   SUM(COALESCE(google_phone_hit, 0) != 0),
+                   SUM(COALESCE(google_phone_hit, 0) = 0),
+                   SUM(COALESCE(google_phone_hit, 0) = 0 AND {accepted}),
+                   SUM(COALESCE(google_phone_hit, 0) = 0 AND {accepted} AND google_text_website IS NOT NULL),
+                   SUM(COALESCE(yelp_phone_hit, 0) != 0)
+            FROM evidence
+        """
+        params = [similarity_threshold, max_distance_km] * 2
+        with self._lock:
+            row = self._conn.execute(sql, params).fetchone()
+        names = ("rows", "google_phone_hits", "google_phone_misses", "google_text_accepted",
+                 "google_text_website", "yelp_phone_hits")
+        return dict(zip(names, (int(v or 0) for v in row)))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM evidence").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
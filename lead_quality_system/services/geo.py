@@ -0,0 +1,152 @@
+import csv
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+DEFAULT_INDEX_PATH = os.path.join(DATA_DIR, "zip_centroids.bin")
+
+MAGIC = b"ZIPIDX1\0"
+HEADER = struct.Struct("<8sII")  # magic, record count, string table offset
+RECORD = struct.Struct("<Iff I2s2x")  # zip, lat, lon, city offset, state
+
+ZIP_PATTERN = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+
+@dataclass
+class ZipInfo:
+    zip_code: str
+    lat: float
+    lon: float
+    city: str
+    state: str
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 6371.0 * 2 * math.asin(math.sqrt(a))
+
+def normalize_zip(zip_code: str) -> Optional[int]:
+    digits = "".join(filter(str.isdigit, (zip_code or "").split("-")[0]))
+    if not 3 <= len(digits) <= 5:
+        return None
+    return int(digits)  # leading zeros lost in spreadsheets are fine as an int
+
+class ZipIndex:
+    """
+    Memory-mapped zip -> (lat, lon, city, state) lookup.
+
+    File layout: header, fixed-width records sorted by zip (binary searched in
+    place), then a NUL-terminated city string table. Nothing is parsed up front,
+    so opening is instant and the OS shares the pages between worker processes.
+    Build with: python -m lead_quality_system.services.geo build <source.csv|US.txt> [out.bin]
+    """
+    _default = None
+    _default_loaded = False
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self._strings = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a zip index")
+
+    @classmethod
+    def default(cls) -> Optional["ZipIndex"]:
+        """Shared index from Config.ZIP_INDEX_PATH (or the bundled file); None if unavailable."""
+        with cls._default_lock:
+            if not cls._default_loaded:
+                cls._default_loaded = True
+                path = Config.ZIP_INDEX_PATH or DEFAULT_INDEX_PATH
+                try:
+                    cls._default = cls(path)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Zip index unavailable ({e}); location bias disabled")
+            return cls._default
+
+    def _record(self, i: int):
+        return RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)
+
+    def _city(self, offset: int) -> str:
+        start = self._strings + offset
+        return self._mm[start:self._mm.find(b"\0", start)].decode("utf-8")
+
+    def lookup(self, zip_code: str) -> Optional[ZipInfo]:
+        key = normalize_zip(zip_code)
+        if key is None:
+            return None
+        lo, hi = 0, self.count - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            record = self._record(mid)
+            if record[0] < key:
+                lo = mid + 1
+            elif record[0] > key:
+                hi = mid - 1
+            else:
+                z, lat, lon, city_offset, state = record
+                return ZipInfo(f"{z:05d}", lat, lon, self._city(city_offset), state.decode("ascii"))
+        return None
+
+    def distance_km(self, zip_a: str, zip_b: str) -> Optional[float]:
+        a, b = self.lookup(zip_a), self.lookup(zip_b)
+        if not a or not b:
+            return None
+        return haversine_km(a.lat, a.lon, b.lat, b.lon)
+
+    @staticmethod
+    def build(source: str, out_path: str) -> int:
+        """
+        Build an index from either a CSV with zip,lat,lon,city,state columns
+        or a GeoNames postal code dump (tab-separated US.txt). Returns the record count.
+        """
+        rows = {}
+        with open(source, encoding="utf-8") as f:
+            if source.endswith(".txt"):
+                # GeoNames: country, postal code, place, admin1 name, admin1 code, ..., lat (9), lon (10)
+                for parts in csv.reader(f, delimiter="\t"):
+                    if len(parts) > 10 and parts[0] == "US":
+                        rows[int(parts[1])] = (float(parts[9]), float(parts[10]), parts[2], parts[4])
+            else:
+                for r in csv.DictReader(f):
+                    rows[int(r["zip"])] = (float(r["lat"]), float(r["lon"]), r["city"], r["state"])
+
+        strings = bytearray()
+        offsets = {}
+        records = bytearray()
+        for z in sorted(rows):
+            lat, lon, city, state = rows[z]
+            if city not in offsets:
+                offsets[city] = len(strings)
+                strings += city.encode("utf-8") + b"\0"
+            records += RECORD.pack(z, lat, lon, offsets[city], state.encode("ascii")[:2])
+
+        with open(out_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, len(rows), HEADER.size + len(records)))
+            out.write(records)
+            out.write(strings)
+        return len(rows)
+
+def zip_from_address(address: str) -> Optional[str]:
+    """Last 5-digit zip in a formatted address ('123 Main St, Oakland, CA 94611, USA')."""
+    matches = ZIP_PATTERN.findall(address or "")
+    return matches[-1] if matches else None
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "build":
+        print("Usage: python -m lead_quality_system.services.geo build <source.csv|US.txt> [out.bin]")
+        sys.exit(1)
+    target = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_INDEX_PATH
+    print(f"Wrote {ZipIndex.build(sys.argv[2], target)} zip codes to {target}")
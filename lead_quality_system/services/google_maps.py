@@ -1,19 +1,119 @@
 import requests
 import logging
+import threading
 from ..config import Config
+from .cache import LookupCache
+from .concurrency import ConcurrencyController
+from .phone import PhoneValidator
 
 logger = logging.getLogger(__name__)
 
+# Field masks by billing tier. The search mask stays within the Text Search Pro SKU;
+# contact/atmosphere fields (website, rating) bill at Enterprise and are fetched
+# per place only when the scorer needs them.
+SEARCH_FIELDS = ["id", "displayName", "formattedAddress", "location"]
+DETAILS_FIELDS = ["websiteUri", "rating", "userRatingCount"]
+FULL_FIELDS = SEARCH_FIELDS + ["nationalPhoneNumber"] + DETAILS_FIELDS
+
 class GooglePlacesVerifier:
     BASE_URL = "https://places.googleapis.com/v1/places:searchText"
+    DETAILS_URL = "https://places.googleapis.com/v1/places/{place_id}"
+
+    _search_cache = LookupCache(
+        "google_places_search", Config.GOOGLE_PLACES_SEARCH_CACHE_TTL, Config.GOOGLE_PLACES_CACHE_SIZE,
+        cost_per_call=lambda: GooglePlacesVerifier._price_per_call(GooglePlacesVerifier._sku("search")),
+    )
+    _details_cache = LookupCache(
+        "google_places_details", Config.GOOGLE_PLACES_DETAILS_CACHE_TTL, Config.GOOGLE_PLACES_CACHE_SIZE,
+        cost_per_call=lambda: GooglePlacesVerifier._price_per_call("place_details_enterprise"),
+    )
+    _usage = {}
+    _usage_lock = threading.Lock()
 
     @staticmethod
-    def _headers():
+    def _headers(fields: list, prefix: str = "places."):
         return {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": Config.GOOGLE_PLACES_API_KEY,
-            "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.id,places.nationalPhoneNumber,places.rating,places.userRatingCount,places.websiteUri"
+            "X-Goog-FieldMask": ",".join(prefix + f for f in fields)
+        }
+
+    @staticmethod
+    def _sku(kind: str) -> str:
+        if kind == "details":
+            return "place_details_enterprise"
+        return "text_search_pro" if Config.GOOGLE_PLACES_TIERED else "text_search_enterprise"
+
+    @staticmethod
+    def _price_per_call(sku: str) -> float:
+        return {
+            "text_search_pro": Config.GOOGLE_PLACES_COST_PER_1000,
+            "text_search_enterprise": Config.GOOGLE_PLACES_FULL_COST_PER_1000,
+            "place_details_enterprise": Config.GOOGLE_PLACES_DETAILS_COST_PER_1000,
+        }[sku] / 1000.0
+
+    @classmethod
+    def _record(cls, sku: str, nbytes: int = 0, cache_hit: bool = False):
+        with cls._usage_lock:
+            stats = cls._usage.setdefault(sku, {"calls": 0, "cache_hits": 0, "bytes": 0})
+            if cache_hit:
+                stats["cache_hits"] += 1
+            else:
+                stats["calls"] += 1
+                stats["bytes"] += nbytes
+
+    @classmethod
+    def usage(cls) -> dict:
+        """Billed calls, cache hits, response bytes and list-price cost per SKU since the last reset."""
+        with cls._usage_lock:
+            return {
+                sku: {**stats, "cost_usd": round(stats["calls"] * cls._price_per_call(sku), 4)}
+                for sku, stats in cls._usage.items()
+            }
+
+    @classmethod
+    def reset_usage(cls, clear_caches: bool = False):
+        with cls._usage_lock:
+            cls._usage = {}
+        if clear_caches:
+            cls._search_cache.clear()
+            cls._details_cache.clear()
+
+    @staticmethod
+    def _mock_place(name: str, phone: str, website: str, rating: float, reviews: int) -> dict:
+        place = {
+            "id": "mock-place-id",
+            "displayName": {"text": name},
+            "formattedAddress": "123 Mock Lane, Test City, 90210",
         }
+        if not Config.GOOGLE_PLACES_TIERED:
+            place.update({"nationalPhoneNumber": phone, "rating": rating,
+                          "userRatingCount": reviews, "websiteUri": website})
+        return place
+
+    @classmethod
+    def _search(cls, payload: dict, label: str):
+        """POST a Text Search and return the best place (search tier fields only when tiered)."""
+        sku = cls._sku("search")
+        fields = SEARCH_FIELDS if Config.GOOGLE_PLACES_TIERED else FULL_FIELDS
+        key = (sku, repr(sorted(payload.items())))
+
+        def fetch():
+            with ConcurrencyController.track("google_places"):
+                resp = requests.post(cls.BASE_URL, headers=cls._headers(fields), json=payload,
+                                     timeout=Config.HTTP_TIMEOUT)
+                resp.raise_for_status()
+            cls._record(sku, len(resp.content))
+            data = resp.json()
+            if "places" in data and data["places"]:
+                return data["places"][0]  # Return best match
+            return None
+
+        try:
+            return cls._search_cache.lookup(key, fetch, on_hit=lambda _: cls._record(sku, cache_hit=True))
+        except Exception as e:
+            logger.error(f"Google Places {label} Error: {e}")
+        return None
 
     @classmethod
     def search_by_phone(cls, phone: str):
@@ -22,27 +122,19 @@ class GooglePlacesVerifier:
         Uses a single standardized E.164 format with region biasing for efficiency.
         """
         if Config.MOCK_MODE:
-            return {
-                "displayName": {"text": "Mock Business Verification"},
-                "formattedAddress": "123 Mock Lane, Test City, 90210",
-                "nationalPhoneNumber": phone,
-                "rating": 4.8,
-                "userRatingCount": 150,
-                "websiteUri": "https://mock-business.com"
-            }
+            return cls._mock_place("Mock Business Verification", phone, "https://mock-business.com", 4.8, 150)
 
         if not Config.GOOGLE_PLACES_API_KEY:
              return None
 
         # Best Practice: Normalize to E.164 (e.g. +14155552671)
         # This is the single most accepted format for Text Search.
-        raw_digits = "".join(filter(str.isdigit, phone))
-        
-        formatted_query = phone # Default fallthrough
-        if len(raw_digits) == 10:
-             formatted_query = f"+1{raw_digits}"
-        elif len(raw_digits) == 11 and raw_digits.startswith("1"):
-             formatted_query = f"+{raw_digits}"
+        # Numbers that can't be a real US/CA business line never reach the API.
+        check = PhoneValidator.validate(phone)
+        if not check.valid:
+            logger.info(f"Skipping Google phone search: {check.reason}")
+            return None
+        formatted_query = check.e164
 
         # API Request
         # We add 'regionCode': 'US' to hint that we are looking for US businesses
@@ -51,43 +143,63 @@ class GooglePlacesVerifier:
             "textQuery": formatted_query,
             "regionCode": "US"
         }
-        
-        try:
-            resp = requests.post(cls.BASE_URL, headers=cls._headers(), json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            if "places" in data and data["places"]:
-                return data["places"][0] # Return best match
-        except Exception as e:
-            logger.error(f"Google Places Phone Search Error: {e}")
-                
-        return None
+        return cls._search(payload, "Phone Search")
 
     @classmethod
-    def search_by_text(cls, query: str):
+    def search_by_text(cls, query: str, location: tuple = None):
         """
         Fallback search by Name + City/Zip.
+        `location` is an optional (lat, lon) used as a locationBias circle.
         """
         if Config.MOCK_MODE:
-            return {
-                "displayName": {"text": "Mock Business Verification"},
-                "formattedAddress": "123 Mock Lane, Test City, 90210",
-                "nationalPhoneNumber": "(555) 123-4567",
-                "rating": 4.5,
-                "userRatingCount": 85,
-                "websiteUri": "https://mock-fallback.com"
-            }
+            return cls._mock_place("Mock Business Verification", "(555) 123-4567", "https://mock-fallback.com", 4.5, 85)
 
         if not Config.GOOGLE_PLACES_API_KEY:
              return None
 
         payload = {"textQuery": query}
+        if location:
+            payload["locationBias"] = {
+                "circle": {
+                    "center": {"latitude": round(location[0], 4), "longitude": round(location[1], 4)},
+                    "radius": min(Config.LOCATION_BIAS_RADIUS_KM * 1000, 50000.0),  # API max is 50 km
+                }
+            }
+        return cls._search(payload, "Text Search")
+
+    @classmethod
+    def place_details(cls, place_id: str):
+        """Website/rating fields for one place (Place Details, Enterprise SKU)."""
+        if Config.MOCK_MODE:
+            return {"websiteUri": "https://mock-fallback.com", "rating": 4.5, "userRatingCount": 85}
+
+        if not Config.GOOGLE_PLACES_API_KEY or not place_id:
+            return None
+
+        sku = cls._sku("details")
+
+        def fetch():
+            with ConcurrencyController.track("google_places_details"):
+                resp = requests.get(cls.DETAILS_URL.format(place_id=place_id),
+                                    headers=cls._headers(DETAILS_FIELDS, prefix=""), timeout=Config.HTTP_TIMEOUT)
+                if resp.status_code == 404:
+                    # Place removed since the search: a confirmed miss, not an error
+                    cls._record(sku, len(resp.content))
+                    return None
+                resp.raise_for_status()
+            cls._record(sku, len(resp.content))
+            return resp.json()
+
         try:
-            resp = requests.post(cls.BASE_URL, headers=cls._headers(), json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            if "places" in data and data["places"]:
-                return data["places"][0]
+            return cls._details_cache.lookup(place_id, fetch, on_hit=lambda _: cls._record(sku, cache_hit=True))
         except Exception as e:
-            logger.error(f"Google Places Text Search Error: {e}")
+            logger.error(f"Google Place Details Error: {e}")
         return None
+
+    @classmethod
+    def with_details(cls, place: dict) -> dict:
+        """The place merged with its details tier; a no-op when lookups are not tiered."""
+        if not place or not Config.GOOGLE_PLACES_TIERED or any(f in place for f in DETAILS_FIELDS):
+            return place
+        details = cls.place_details(place.get("id"))
+        return {**place, **details} if details else place
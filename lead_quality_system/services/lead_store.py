@@ -0,0 +1,188 @@
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+import pandas as pd
+
+from ..config import Config
+from ..models import EnrichmentResult, Lead
+from ..normalize import lead_key, phone_digits
+
+# Batch tiers that are not a score for the lead and must not overwrite one
+UNSCORED_TIERS = ("Deferred", "Error", "Pending")
+
+COLUMNS = ["lead_key", "business_name", "phone", "zip_code", "email", "score", "quality_tier",
+           "verified_name", "website", "match_reasons", "sources", "scored_at"]
+
+# BatchProcessor / Coordinator output columns read by put_frame
+FRAME_COLUMNS = ["business_name", "phone", "zip_code", "email", "score", "quality_tier",
+                 "verified_name", "website", "match_reasons", "sources"]
+
+class LeadStore:
+    """
+    SQLite table of scored leads, one row per lead identity (normalize.lead_key).
+
+    Every batch, single-lead and benchmark result is upserted here, so "High leads
+    in 94611" is an indexed query instead of a re-parse of old CSVs. Phone is kept
+    as normalized digits and zip as its first five characters, matching lead_key.
+    A row is only replaced by a result scored at the same time or later.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Upserts land on random lead_key pages; a bigger page cache keeps the indexes hot
+        self._conn.execute("PRAGMA cache_size=-65536")
+        self._conn.execute("PRAGMA analysis_limit=1000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS leads (
+                lead_key TEXT PRIMARY KEY,
+                business_name TEXT,
+                phone TEXT,
+                zip_code TEXT,
+                email TEXT,
+                score INTEGER,
+                quality_tier TEXT,
+                verified_name TEXT,
+                website TEXT,
+                match_reasons TEXT,
+                sources TEXT,
+                scored_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS idx_leads_phone ON leads (phone);
+            CREATE INDEX IF NOT EXISTS idx_leads_zip_tier ON leads (zip_code, quality_tier, score);
+            CREATE INDEX IF NOT EXISTS idx_leads_tier_score ON leads (quality_tier, score);
+            CREATE INDEX IF NOT EXISTS idx_leads_score ON leads (score);
+        """)
+
+    @classmethod
+    def default(cls) -> Optional["LeadStore"]:
+        """Shared store at Config.LEAD_STORE_PATH, or None when it is not configured."""
+        if not Config.LEAD_STORE_PATH:
+            return None
+        with cls._default_lock:
+            if cls._default is None or cls._default.path != Config.LEAD_STORE_PATH:
+                cls._default = cls(Config.LEAD_STORE_PATH)
+            return cls._default
+
+    @staticmethod
+    def _row(lead, score, tier, verified_name, website, reasons: str, sources: str, scored_at: float) -> tuple:
+        return (
+            lead_key(lead), lead.business_name, phone_digits(lead.phone), (lead.zip_code or "").strip()[:5],
+            lead.email or None, int(score), tier, verified_name, website, reasons, sources, scored_at,
+        )
+
+    def _upsert(self, rows: Iterable[tuple], batch_rows: int = None) -> int:
+        """INSERT ... ON CONFLICT in transactions of `batch_rows` rows; returns rows written."""
+        batch_rows = batch_rows or Config.LEAD_STORE_BATCH_ROWS
+        updates = ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[1:])
+        sql = (f"INSERT INTO leads ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))}) "
+               f"ON CONFLICT (lead_key) DO UPDATE SET {updates} WHERE excluded.scored_at >= leads.scored_at")
+        written, batch = 0, []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_rows:
+                written += self._write(sql, batch)
+                batch = []
+        if batch:
+            written += self._write(sql, batch)
+        if written:
+            # Refresh planner statistics (bounded by analysis_limit) so zip/tier filters pick the right index
+            with self._lock:
+                self._conn.execute("PRAGMA optimize")
+        return written
+
+    def _write(self, sql: str, batch: List[tuple]) -> int:
+        with self._lock:
+            self._conn.executemany(sql, batch)
+            self._conn.commit()
+        return len(batch)
+
+    def put_many(self, results: Iterable[Tuple[Lead, EnrichmentResult]], scored_at: float = None) -> int:
+        scored_at = scored_at or time.time()
+        return self._upsert(
+            self._row(lead, r.score, r.quality_tier, r.verified_business_name, r.website,
+                      "; ".join(r.match_reasons), ", ".join(r.sources), scored_at)
+            for lead, r in results
+            if r.quality_tier not in UNSCORED_TIERS
+        )
+
+    def put(self, lead: Lead, result: EnrichmentResult, scored_at: float = None) -> int:
+        return self.put_many([(lead, result)], scored_at)
+
+    def put_frame(self, df: pd.DataFrame, scored_at: float = None) -> int:
+        """
+        Upsert a BatchProcessor output frame; Deferred / Error / Pending rows are skipped.
+        Result columns missing from the frame (e.g. every row failed) are stored as NULL.
+        """
+        scored_at = scored_at or time.time()
+        if "quality_tier" not in df.columns:
+            return 0
+        scored = df[~df["quality_tier"].isin(UNSCORED_TIERS)].reindex(columns=FRAME_COLUMNS)
+        if scored.empty:
+            return 0
+        scored = scored.astype(object).where(scored.notna(), None)
+        return self._upsert(
+            self._row(row, row.score, row.quality_tier, row.verified_name, row.website,
+                      row.match_reasons, row.sources, scored_at)
+            for row in scored.itertuples(index=False)
+        )
+
+    def get(self, lead: Lead) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(f"SELECT {', '.join(COLUMNS)} FROM leads WHERE lead_key = ?",
+                                     (lead_key(lead),)).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    @staticmethod
+    def _where(tiers: Iterable[str] = None, zip_code: str = None, phone: str = None,
+               min_score: int = None, max_score: int = None):
+        clauses, params = [], []
+        tiers = list(tiers or [])
+        if tiers:
+            clauses.append(f"quality_tier IN ({', '.join('?' * len(tiers))})")
+            params.extend(tiers)
+        if zip_code:
+            clauses.append("zip_code = ?")
+            params.append(zip_code.strip()[:5])
+        if phone:
+            clauses.append("phone = ?")
+            params.append(phone_digits(phone))
+        if min_score is not None:
+            clauses.append("score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("score <= ?")
+            params.append(max_score)
+        return " AND ".join(clauses) or "1 = 1", params
+
+    def query(self, tiers: Iterable[str] = None, zip_code: str = None, phone: str = None,
+              min_score: int = None, max_score: int = None, limit: int = 1000) -> pd.DataFrame:
+        """Matching leads, highest score first. Every filter is optional; `limit=None` returns all."""
+        where, params = self._where(tiers, zip_code, phone, min_score, max_score)
+        sql = f"SELECT {', '.join(COLUMNS)} FROM leads WHERE {where} ORDER BY score DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def count(self, tiers: Iterable[str] = None, zip_code: str = None, phone: str = None,
+              min_score: int = None, max_score: int = None) -> int:
+        where, params = self._where(tiers, zip_code, phone, min_score, max_score)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM leads WHERE {where}", params).fetchone()[0]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,146 @@
+import csv
+import logging
+import os
+import threading
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from ..config import Config
+from ..normalize import phone_digits, strip_extension
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+AREA_CODES_PATH = os.path.join(DATA_DIR, "nanp_area_codes.csv")
+
+# Area code kinds that never get a provider lookup
+REJECTED_KINDS = {"toll_free", "premium", "non_geographic", "unassigned", "invalid", "fictional"}
+
+# 3-digit ZIP prefix ranges -> state (USPS). Military (AA/AE/AP) prefixes map to "".
+ZIP3_RANGES = [
+    (5, 5, "NY"), (6, 7, "PR"), (8, 8, "VI"), (9, 9, "PR"), (10, 27, "MA"), (28, 29, "RI"),
+    (30, 38, "NH"), (39, 49, "ME"), (50, 54, "VT"), (55, 55, "MA"), (56, 59, "VT"), (60, 69, "CT"),
+    (70, 89, "NJ"), (90, 99, ""), (100, 149, "NY"), (150, 196, "PA"), (197, 199, "DE"),
+    (200, 200, "DC"), (201, 201, "VA"), (202, 205, "DC"), (206, 219, "MD"), (220, 246, "VA"),
+    (247, 268, "WV"), (270, 289, "NC"), (290, 299, "SC"), (300, 319, "GA"), (320, 339, "FL"),
+    (340, 340, ""), (341, 349, "FL"), (350, 369, "AL"), (370, 385, "TN"), (386, 397, "MS"),
+    (398, 399, "GA"), (400, 427, "KY"), (430, 459, "OH"), (460, 479, "IN"), (480, 499, "MI"),
+    (500, 528, "IA"), (530, 549, "WI"), (550, 567, "MN"), (569, 569, "DC"), (570, 577, "SD"),
+    (580, 588, "ND"), (590, 599, "MT"), (600, 629, "IL"), (630, 658, "MO"), (660, 679, "KS"),
+    (680, 693, "NE"), (700, 714, "LA"), (716, 729, "AR"), (730, 732, "OK"), (733, 733, "TX"),
+    (734, 749, "OK"), (750, 799, "TX"), (800, 816, "CO"), (820, 831, "WY"), (832, 838, "ID"),
+    (840, 847, "UT"), (850, 865, "AZ"), (870, 884, "NM"), (885, 885, "TX"), (889, 898, "NV"),
+    (900, 961, "CA"), (962, 966, ""), (967, 968, "HI"), (969, 969, "GU"), (970, 979, "OR"),
+    (980, 994, "WA"), (995, 999, "AK"),
+]
+
+@dataclass
+class PhoneCheck:
+    valid: bool
+    kind: str  # geographic, canada, caribbean, or one of REJECTED_KINDS
+    digits: str = ""
+    e164: Optional[str] = None
+    region: str = ""  # state / province / country code of the area code
+    reason: str = ""
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+class PhoneValidator:
+    """
+    Local NANP phone validation, so hopeless numbers never reach a paid API.
+
+    Area codes come from data/nanp_area_codes.csv (a 1000-slot table indexed by
+    NPA). When NANP_EXCHANGE_PATH points at a list of assigned NPA-NXX pairs
+    (e.g. a NANPA central office code export), a 1,000,000-bit map of assigned
+    exchanges is loaded too and numbers on unassigned exchanges are rejected.
+    """
+    _area_codes = None
+    _exchanges = None
+    _zip3 = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def _load(cls):
+        with cls._lock:
+            if cls._area_codes is not None:
+                return
+            area_codes = [None] * 1000
+            with open(AREA_CODES_PATH, encoding="utf-8") as f:
+                for row in csv.DictReader(line for line in f if not line.startswith("#")):
+                    area_codes[int(row["npa"])] = (row["region"], row["kind"])
+
+            exchanges = None
+            if Config.NANP_EXCHANGE_PATH:
+                exchanges = bytearray(1000000 // 8)
+                try:
+                    with open(Config.NANP_EXCHANGE_PATH, encoding="utf-8") as f:
+                        for line in f:
+                            digits = "".join(filter(str.isdigit, line.split("#", 1)[0]))[:6]
+                            if len(digits) == 6:
+                                n = int(digits)
+                                exchanges[n >> 3] |= 1 << (n & 7)
+                except OSError as e:
+                    logger.error(f"Could not load NANP exchange list: {e}")
+                    exchanges = None
+
+            zip3 = [""] * 1000
+            for start, end, state in ZIP3_RANGES:
+                for prefix in range(start, end + 1):
+                    zip3[prefix] = state
+
+            cls._exchanges = exchanges
+            cls._zip3 = zip3
+            cls._area_codes = area_codes
+
+    @classmethod
+    def validate(cls, phone: str) -> PhoneCheck:
+        cls._load()
+        raw = "".join(filter(str.isdigit, strip_extension(phone)))
+        digits = phone_digits(phone)
+        if len(digits) != 10 or (len(raw) == 11 and not raw.startswith("1")):
+            return PhoneCheck(False, "invalid", digits, reason=f"Not a 10-digit NANP number ({len(raw)} digits)")
+
+        npa, nxx, line = digits[:3], digits[3:6], digits[6:]
+        if npa[0] in "01" or nxx[0] in "01":
+            return PhoneCheck(False, "invalid", digits, reason="Area code or exchange starts with 0/1")
+        if npa[1:] == "11" or nxx[1:] == "11":
+            return PhoneCheck(False, "invalid", digits, reason="N11 service code")
+        if nxx == "555" and line.startswith("01"):
+            return PhoneCheck(False, "fictional", digits, reason="555-01XX fictional number")
+
+        e164 = f"+1{digits}"
+        entry = cls._area_codes[int(npa)]
+        if entry is None:
+            return PhoneCheck(False, "unassigned", digits, e164, reason=f"Unassigned area code {npa}")
+        region, kind = entry
+        if kind == "toll_free":
+            return PhoneCheck(False, kind, digits, e164, reason=f"Toll-free number ({npa})")
+        if kind == "premium" or nxx == "976":
+            return PhoneCheck(False, "premium", digits, e164, reason="Premium-rate number")
+        if kind == "non_geographic":
+            return PhoneCheck(False, kind, digits, e164, reason=f"Non-geographic service code {npa}")
+        if cls._exchanges is not None:
+            n = int(npa + nxx)
+            if not cls._exchanges[n >> 3] & (1 << (n & 7)):
+                return PhoneCheck(False, "unassigned", digits, e164, region, reason=f"Unassigned exchange {npa}-{nxx}")
+        return PhoneCheck(True, kind, digits, e164, region)
+
+    @classmethod
+    def zip_state(cls, zip_code: str) -> str:
+        """State for a US zip code from its 3-digit prefix ('' if unknown)."""
+        cls._load()
+        digits = "".join(filter(str.isdigit, zip_code or ""))
+        if len(digits) < 5:
+            digits = digits.zfill(5) if len(digits) >= 3 else ""
+        return cls._zip3[int(digits[:3])] if digits else ""
+
+    @classmethod
+    def state_mismatch(cls, check: PhoneCheck, zip_code: str) -> Optional[bool]:
+        """True when a US area code's state differs from the zip's state; None if either is unknown."""
+        if not check.valid or check.kind != "geographic":
+            return None
+        state = cls.zip_state(zip_code)
+        if not state or not check.region:
+            return None
+        return state != check.region
@@ -0,0 +1,219 @@
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+import pandas as pd
+
+from ..config import Config
+from ..models import Lead
+from ..normalize import lead_key
+from ..rules import ScoringRules
+from .clustering import LeadClusterer
+from .concurrency import ConcurrencyController
+from .email_domains import BUSINESS, EmailDomainIndex
+from .evidence_store import EvidenceStore
+from .phone import PhoneValidator
+
+PROVIDERS = ("google_places", "google_places_details", "yelp", "google_search")
+
+# Adaptive limiter each planner provider is throttled by (Yelp's term fallback has its own
+# limiter but only runs on phone misses, so the phone endpoint sets the pace)
+LIMITERS = {"yelp": "yelp_phone"}
+
+# Used when the limiter has no latency samples yet
+DEFAULT_LATENCY_S = 0.6
+
+@dataclass
+class PlannerPriors:
+    """Hit rates that drive the fallback chain in LeadScorer.collect_evidence."""
+    google_phone_hit: float = 0.5
+    google_text_accepted: float = 0.4  # phone misses whose text match is accepted (Place Details call)
+    google_text_website: float = 0.3  # ... and that has a website
+    yelp_phone_hit: float = 0.4
+
+    @classmethod
+    def from_store(cls, store: EvidenceStore, min_rows: int = 50) -> "PlannerPriors":
+        """Learn hit rates from previously collected evidence, falling back to defaults."""
+        rules = ScoringRules()
+        counts = store.hit_counts(rules.name_similarity_threshold, rules.max_match_distance_km)
+        rows, misses = counts["rows"], counts["google_phone_misses"]
+        if rows < min_rows:
+            return cls()
+        return cls(
+            google_phone_hit=counts["google_phone_hits"] / rows,
+            google_text_accepted=counts["google_text_accepted"] / misses if misses else cls.google_text_accepted,
+            google_text_website=counts["google_text_website"] / misses if misses else cls.google_text_website,
+            yelp_phone_hit=counts["yelp_phone_hits"] / rows,
+        )
+
+    def expected_calls(self) -> Dict[str, float]:
+        """Expected calls per provider for one lead with no stored evidence."""
+        phone_miss = 1.0 - self.google_phone_hit
+        return {
+            "google_places": 1.0 + phone_miss,
+            "google_places_details": phone_miss * self.google_text_accepted if Config.GOOGLE_PLACES_TIERED else 0.0,
+            "yelp": 1.0 + (1.0 - self.yelp_phone_hit),
+            # Search is skipped only when the Google text match supplies a website
+            "google_search": 1.0 - phone_miss * self.google_text_website,
+        }
+
+@dataclass
+class BatchPlan:
+    rows: int
+    cached_rows: int
+    rejected_rows: int  # failed local phone validation
+    planned_rows: int
+    deferred_rows: int
+    calls: Dict[str, float]
+    cost_usd: Dict[str, float]
+    quota_days: Dict[str, Optional[float]]
+    est_seconds: float
+    budget_usd: Optional[float] = None
+    duplicate_rows: int = 0  # share a cluster representative's lookups
+    row_plan: pd.DataFrame = field(default=None, repr=False)
+
+    @property
+    def total_cost_usd(self) -> float:
+        return round(sum(self.cost_usd.values()), 2)
+
+    def summary(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "calls": {p: round(c) for p, c in self.calls.items()},
+            "cost_usd": self.cost_usd,
+            "quota_days": self.quota_days,
+        })
+
+class BatchPlanner:
+    """
+    Dry run for a batch: expected API calls, dollar cost, daily quota use and
+    wall-clock time, without calling any provider.
+
+    Rows whose lead already has fresh evidence in the store, or whose phone
+    fails local validation, cost nothing; neither do duplicates of another row
+    (see LeadClusterer). With a budget, rows are taken highest expected value
+    first until the budget is spent; the rest are deferred, and a cluster
+    follows its representative.
+    """
+
+    @staticmethod
+    def _configured(provider: str) -> bool:
+        if Config.MOCK_MODE:
+            return False
+        return {
+            "google_places": bool(Config.GOOGLE_PLACES_API_KEY),
+            "google_places_details": bool(Config.GOOGLE_PLACES_API_KEY),
+            "yelp": bool(Config.YELP_API_KEY),
+            "google_search": bool(Config.GOOGLE_SEARCH_API_KEY and Config.GOOGLE_SEARCH_CX),
+        }[provider]
+
+    @staticmethod
+    def _price_per_call(provider: str) -> float:
+        return {
+            "google_places": Config.GOOGLE_PLACES_COST_PER_1000 if Config.GOOGLE_PLACES_TIERED else Config.GOOGLE_PLACES_FULL_COST_PER_1000,
+            "google_places_details": Config.GOOGLE_PLACES_DETAILS_COST_PER_1000,
+            "yelp": Config.YELP_COST_PER_1000,
+            "google_search": Config.GOOGLE_SEARCH_COST_PER_1000,
+        }[provider] / 1000.0
+
+    @staticmethod
+    def _daily_quota(provider: str) -> Optional[int]:
+        return {
+            "google_places": Config.GOOGLE_PLACES_DAILY_QUOTA,
+            "google_places_details": Config.GOOGLE_PLACES_DAILY_QUOTA,
+            "yelp": Config.YELP_DAILY_QUOTA,
+            "google_search": Config.GOOGLE_SEARCH_DAILY_QUOTA,
+        }[provider]
+
+    @staticmethod
+    def _row_value(df: pd.DataFrame, valid_phone: pd.Series, priors: PlannerPriors, rules: ScoringRules) -> pd.Series:
+        """Expected score from what we know locally: a valid phone and a business email domain."""
+        domain = df["email"].fillna("").str.split("@").str[-1].str.strip().str.lower()
+        biz_email = (EmailDomainIndex.default().classify(domain) == BUSINESS) & ~domain.isin(rules.free_mail_domains)
+        phone_value = priors.google_phone_hit * rules.google_phone + priors.yelp_phone_hit * rules.yelp_phone
+        return valid_phone * phone_value + biz_email * rules.business_email
+
+    @classmethod
+    def plan(cls, df: pd.DataFrame, evidence_store: EvidenceStore = None, budget: float = None,
+             priors: PlannerPriors = None, clusters: pd.DataFrame = None) -> BatchPlan:
+        """
+        `df` must have the BatchProcessor input columns (see BatchProcessor.load_csv).
+        `clusters` is LeadClusterer.cluster(df); computed here when clustering is enabled.
+        """
+        if priors is None:
+            priors = PlannerPriors.from_store(evidence_store) if evidence_store is not None else PlannerPriors()
+
+        keys = [
+            lead_key(Lead(str(r.business_name), str(r.phone), str(r.zip_code), ""))
+            for r in df[["business_name", "phone", "zip_code"]].itertuples(index=False)
+        ]
+        reuse = evidence_store is not None and Config.EVIDENCE_MAX_AGE_DAYS > 0
+        cached_keys = evidence_store.fresh_keys(keys, Config.EVIDENCE_MAX_AGE_DAYS) if reuse else set()
+
+        per_lead = {p: (c if cls._configured(p) else 0.0) for p, c in priors.expected_calls().items()}
+        per_lead_cost = sum(per_lead[p] * cls._price_per_call(p) for p in PROVIDERS)
+
+        if clusters is None:
+            clusters = LeadClusterer.cluster(df) if Config.CLUSTER_LEADS else pd.DataFrame(
+                {"cluster_id": range(1, len(df) + 1), "cluster_representative": True}, index=df.index)
+
+        row_plan = pd.DataFrame({"lead_key": keys}, index=df.index)
+        row_plan["cluster_id"] = clusters["cluster_id"]
+        row_plan["duplicate"] = ~clusters["cluster_representative"]
+        # Any member's stored evidence serves the whole cluster
+        row_plan["cached"] = row_plan["lead_key"].isin(cached_keys).groupby(row_plan["cluster_id"]).transform("any")
+        row_plan["phone_valid"] = df["phone"].fillna("").map(lambda p: PhoneValidator.validate(p).valid)
+        # Rows rejected by local phone validation make no calls at all
+        costs_calls = ~row_plan["duplicate"] & ~row_plan["cached"] & (row_plan["phone_valid"] | (not Config.SKIP_INVALID_PHONE_LEADS))
+        row_plan["value"] = cls._row_value(df, row_plan["phone_valid"], priors, ScoringRules()).round(1)
+        row_plan["est_cost_usd"] = costs_calls * per_lead_cost
+        row_plan["planned"] = True
+
+        if budget is not None:
+            # Highest expected value first; stable so file order breaks ties. Free rows always run.
+            order = row_plan.sort_values("value", ascending=False, kind="stable")
+            row_plan.loc[order.index, "planned"] = (order["est_cost_usd"].cumsum() <= budget) | (order["est_cost_usd"] == 0)
+            representative_planned = row_plan.loc[~row_plan["duplicate"]].set_index("cluster_id")["planned"]
+            row_plan["planned"] = row_plan["cluster_id"].map(representative_planned)
+
+        to_fetch = int((row_plan["planned"] & costs_calls).sum())
+        calls = {p: per_lead[p] * to_fetch for p in PROVIDERS}
+        cost = {p: round(calls[p] * cls._price_per_call(p), 2) for p in PROVIDERS}
+        quota_days = {
+            p: round(calls[p] / cls._daily_quota(p), 2) if cls._daily_quota(p) else None
+            for p in PROVIDERS
+        }
+
+        return BatchPlan(
+            rows=len(df),
+            cached_rows=int(row_plan["cached"].sum()),
+            rejected_rows=int((~row_plan["phone_valid"]).sum()),
+            planned_rows=int(row_plan["planned"].sum()),
+            deferred_rows=int((~row_plan["planned"]).sum()),
+            calls=calls,
+            cost_usd=cost,
+            quota_days=quota_days,
+            est_seconds=cls._estimate_seconds(calls, to_fetch),
+            budget_usd=budget,
+            duplicate_rows=int(row_plan["duplicate"].sum()),
+            row_plan=row_plan,
+        )
+
+    @staticmethod
+    def _estimate_seconds(calls: Dict[str, float], leads: int) -> float:
+        """
+        Providers are drained in parallel, each at (in-flight limit / latency) calls per second,
+        using the adaptive limiter's current state when it has one. Worker threads bound it too:
+        every lead walks the whole chain sequentially.
+        """
+        snapshot = ConcurrencyController.snapshot()
+        provider_seconds = []
+        chain_latency = 0.0
+        for provider, n in calls.items():
+            if not n:
+                continue
+            stats = snapshot.get(LIMITERS.get(provider, provider), {})
+            limit = stats.get("limit") or Config.CONCURRENCY_INITIAL
+            latency = (stats.get("ewma_latency_ms") or DEFAULT_LATENCY_S * 1000) / 1000.0
+            provider_seconds.append(n * latency / limit)
+            chain_latency += (n / leads) * latency if leads else 0.0
+        worker_seconds = leads * chain_latency / Config.SCHEDULER_WORKERS
+        return round(max(provider_seconds + [worker_seconds, 0.0]), 1)
@@ -0,0 +1,268 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from contextlib import contextmanager, nullcontext
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+# Named stages used across the pipeline
+NORMALIZE = "normalize"
+PROVIDER_IO = "provider_io"
+SIMILARITY = "similarity"
+RESULT_ASSEMBLY = "result_assembly"
+CSV_WRITE = "csv_write"
+
+def _pool(thread_name: str) -> str:
+    """'lead-worker-12' -> 'lead-worker', so a pool's threads add up together."""
+    return re.sub(r"-\d+$", "", thread_name)
+
+class ProfileSession:
+    """
+    One profiling run, process-wide while active.
+
+    - CPU: a cProfile.Profile per thread, enabled around each scheduler task
+      (see `task`) and on the thread that started the session, merged at the end.
+    - Stages: wall time per named stage per thread (`stage`), exclusive of nested stages.
+    - Stacks: a sampler thread walks every thread's frames at PROFILE_SAMPLE_HZ and
+      counts collapsed stacks, prefixed with the thread and its current stage.
+    - Memory: tracemalloc snapshots at chunk boundaries (`chunk`).
+
+    `stop` writes report.txt, profile.pstats and stacks.folded (flamegraph.pl /
+    speedscope format) to a new directory under PROFILE_DIR.
+    """
+    _active = None
+    _lock = threading.Lock()
+
+    def __init__(self, name: str):
+        self.name = re.sub(r"[^A-Za-z0-9_.-]+", "_", name or "run")
+        self.started = time.time()
+        self._profiles = {}  # thread name -> cProfile.Profile
+        self._local = threading.local()
+        self._stacks = {}  # thread ident -> list of [stage, start, child_time]
+        self._stage_time = defaultdict(float)  # (thread name, stage) -> seconds
+        self._stage_calls = Counter()
+        self._samples = Counter()
+        self._snapshots = []  # (label, elapsed, current bytes, peak bytes, top diffs)
+        self._last_snapshot = None
+        self._data_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._owns_tracemalloc = False
+        self._cprofile_warned = False
+        self.output_dir = None
+
+    @classmethod
+    def active(cls):
+        return cls._active
+
+    @classmethod
+    def start(cls, name: str) -> "ProfileSession":
+        with cls._lock:
+            if cls._active is not None:
+                raise RuntimeError(f"Profiling session '{cls._active.name}' is already running")
+            session = cls(name)
+            cls._active = session
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            session._owns_tracemalloc = True
+        session._sampler = threading.Thread(target=session._sample, name="profile-sampler", daemon=True)
+        session._sampler.start()
+        session._enable_thread()
+        session.chunk("start")
+        return session
+
+    def stop(self) -> str:
+        """End the session and write its files; returns the output directory."""
+        self._disable_thread()
+        self.chunk("end")
+        self._stop.set()
+        self._sampler.join()
+        with ProfileSession._lock:
+            ProfileSession._active = None
+        if self._owns_tracemalloc:
+            tracemalloc.stop()
+
+        out_dir = os.path.join(Config.PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(self.started))}-{self.name}")
+        os.makedirs(out_dir, exist_ok=True)
+        stats = self._merged_stats()
+        if stats is not None:
+            stats.dump_stats(os.path.join(out_dir, "profile.pstats"))
+        with open(os.path.join(out_dir, "stacks.folded"), "w", encoding="utf-8") as f:
+            for stack, count in self._samples.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(os.path.join(out_dir, "report.txt"), "w", encoding="utf-8") as f:
+            f.write(self.report(stats))
+        logger.info(f"Profile written to {out_dir}")
+        self.output_dir = out_dir
+        return out_dir
+
+    # CPU profiles
+
+    def _enable_thread(self):
+        profile = getattr(self._local, "profile", None)
+        if profile is None:
+            profile = cProfile.Profile()
+            self._local.profile = profile
+            with self._data_lock:
+                self._profiles[threading.current_thread().name] = profile
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Python 3.12+ allows one active cProfile per process; stages and samples still cover this thread
+            if not self._cprofile_warned:
+                self._cprofile_warned = True
+                logger.warning(f"Per-thread cProfile unavailable ({e}); relying on stack samples")
+
+    def _disable_thread(self):
+        profile = getattr(self._local, "profile", None)
+        if profile is not None:
+            profile.disable()
+
+    def _merged_stats(self):
+        profiles = [p for p in self._profiles.values() if p.getstats()]
+        if not profiles:
+            return None
+        stats = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profile in profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    # Stages
+
+    @contextmanager
+    def stage(self, name: str):
+        stack = self._stacks.setdefault(threading.get_ident(), [])
+        frame = [name, time.perf_counter(), 0.0]
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            elapsed = time.perf_counter() - frame[1]
+            if stack:
+                stack[-1][2] += elapsed
+            with self._data_lock:
+                self._stage_time[(threading.current_thread().name, name)] += elapsed - frame[2]
+                self._stage_calls[name] += 1
+
+    # Stack samples
+
+    def _sample(self):
+        interval = 1.0 / max(Config.PROFILE_SAMPLE_HZ, 1)
+        me = threading.get_ident()
+        while not self._stop.wait(interval):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == me:
+                    continue
+                stages = self._stacks.get(ident)
+                # Idle workers only show the scheduler's wait; skip them
+                if not stages and frame.f_code.co_name == "wait":
+                    continue
+                funcs = []
+                while frame is not None:
+                    code = frame.f_code
+                    funcs.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                thread = _pool(names.get(ident, str(ident)))
+                stage = stages[-1][0] if stages else "-"
+                self._samples[";".join([thread, stage] + funcs[::-1])] += 1
+
+    # Memory
+
+    def chunk(self, label: str):
+        """Record a tracemalloc snapshot; the report lists the top allocation growth since the previous one."""
+        if not tracemalloc.is_tracing():
+            return
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        top = []
+        if self._last_snapshot is not None:
+            top = [d for d in snapshot.compare_to(self._last_snapshot, "lineno")[:5] if d.size_diff > 0]
+        with self._data_lock:
+            self._last_snapshot = snapshot
+            self._snapshots.append((label, time.time() - self.started, current, peak, top))
+
+    # Report
+
+    def report(self, stats: pstats.Stats = None) -> str:
+        out = io.StringIO()
+        elapsed = time.time() - self.started
+        out.write(f"Profile '{self.name}': {elapsed:.2f}s wall, {len(self._profiles)} profiled threads, "
+                  f"{sum(self._samples.values())} stack samples\n\n")
+
+        out.write("Stages (exclusive wall time, summed over threads)\n")
+        by_stage = defaultdict(float)
+        for (_, stage), seconds in self._stage_time.items():
+            by_stage[stage] += seconds
+        for stage, seconds in sorted(by_stage.items(), key=lambda kv: -kv[1]):
+            out.write(f"  {stage:<18} {seconds:10.3f}s  {self._stage_calls[stage]:>8} calls\n")
+
+        out.write("\nStages by thread pool\n")
+        by_pool = defaultdict(float)
+        pool_threads = defaultdict(set)
+        for (thread, stage), seconds in self._stage_time.items():
+            by_pool[(_pool(thread), stage)] += seconds
+            pool_threads[_pool(thread)].add(thread)
+        for (pool, stage), seconds in sorted(by_pool.items()):
+            out.write(f"  {pool:<16} x{len(pool_threads[pool]):<4} {stage:<18} {seconds:10.3f}s\n")
+
+        out.write("\nMemory (tracemalloc)\n")
+        for label, at, current, peak, top in self._snapshots:
+            out.write(f"  [{at:8.2f}s] {label:<20} current {current / 2**20:8.1f} MiB  peak {peak / 2**20:8.1f} MiB\n")
+            for diff in top:
+                frame = diff.traceback[0]
+                out.write(f"      +{diff.size_diff / 1024:9.1f} KiB  {frame.filename}:{frame.lineno}\n")
+
+        if stats is not None:
+            out.write("\nTop functions by cumulative time (all threads)\n")
+            stats.stream = out
+            stats.sort_stats("cumulative").print_stats(40)
+        return out.getvalue()
+
+def stage(name: str):
+    """Attribute the enclosed time to a named stage; a no-op unless a session is active."""
+    session = ProfileSession._active
+    return session.stage(name) if session is not None else nullcontext()
+
+@contextmanager
+def task():
+    """Per-thread CPU profiling around one scheduler task."""
+    session = ProfileSession._active
+    if session is None:
+        yield
+        return
+    session._enable_thread()
+    try:
+        yield
+    finally:
+        session._disable_thread()
+
+def chunk(label: str):
+    session = ProfileSession._active
+    if session is not None:
+        session.chunk(label)
+
+@contextmanager
+def profiled(name: str, enabled: bool = None):
+    """
+    Profile the enclosed run when `enabled` (default Config.PROFILE).
+    Nested calls inside an active session join it instead of starting another.
+    """
+    if not (Config.PROFILE if enabled is None else enabled) or ProfileSession._active is not None:
+        yield ProfileSession._active
+        return
+    session = ProfileSession.start(name)
+    try:
+        yield session
+    finally:
+        session.stop()
@@ -0,0 +1,190 @@
+import gzip
+import glob
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pandas as pd
+
+from ..config import Config
+from .profiling import CSV_WRITE, stage
+
+@dataclass(frozen=True)
+class ResultFilter:
+    tiers: tuple = ()  # empty = all tiers
+    min_score: int = 0
+    max_score: int = 100
+    source: Optional[str] = None  # substring of the comma-separated `sources` column
+
+    def where(self):
+        clauses, params = ["score BETWEEN ? AND ?"], [self.min_score, self.max_score]
+        if self.tiers:
+            clauses.append(f"quality_tier IN ({', '.join('?' * len(self.tiers))})")
+            params.extend(self.tiers)
+        if self.source:
+            clauses.append("sources LIKE ?")
+            params.append(f"%{self.source}%")
+        return " AND ".join(clauses), params
+
+class ResultStore:
+    """
+    A batch job's output on disk: one SQLite file per job under RESULTS_DIR.
+
+    The UI reads it a page at a time (filtered and ordered in SQL), and exports
+    stream it out in chunks to gzip CSV or Parquet, so neither needs the full
+    result in memory. Rows may be written in any order; each frame's index is
+    kept as the input row number, and reads come back in input order.
+    """
+    TABLE = "results"
+    ROW = "input_row"
+    INTEGER_COLUMNS = ("score", "cluster_id")
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+    @classmethod
+    def create(cls, name: str = None) -> "ResultStore":
+        """New empty store in its own job directory."""
+        label = re.sub(r"[^A-Za-z0-9_.-]+", "_", name or "batch")
+        job_dir = os.path.join(Config.RESULTS_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}")
+        os.makedirs(job_dir, exist_ok=True)
+        return cls(os.path.join(job_dir, "results.db"))
+
+    @property
+    def directory(self) -> str:
+        return os.path.dirname(self.path)
+
+    @classmethod
+    def _sql_type(cls, name: str, values: pd.Series) -> str:
+        if name in cls.INTEGER_COLUMNS or pd.api.types.is_integer_dtype(values) or pd.api.types.is_bool_dtype(values):
+            return "INTEGER"
+        # An all-NaN column is float to pandas, but it is a text column with no values yet
+        if pd.api.types.is_float_dtype(values) and values.notna().any():
+            return "REAL"
+        return "TEXT"
+
+    def _create_table(self, df: pd.DataFrame):
+        """Declare the schema from the first frame, so a first chunk of Error rows doesn't make text columns REAL."""
+        columns = [f'"{self.ROW}" INTEGER'] + [f'"{name}" {self._sql_type(name, df[name])}' for name in df.columns]
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {self.TABLE} ({', '.join(columns)})")
+
+    def write(self, df: pd.DataFrame, chunksize: int = 10000):
+        """Append result rows (index = input row number), `chunksize` rows per INSERT batch."""
+        with stage(CSV_WRITE), self._lock:
+            self._create_table(df)
+            df.to_sql(self.TABLE, self._conn, if_exists="append", index=True, index_label=self.ROW,
+                      chunksize=chunksize)
+            for column in (self.ROW, "quality_tier", "score"):
+                if column in df.columns:
+                    self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{column} ON {self.TABLE} ({column})")
+            self._conn.commit()
+
+    def _columns(self, conn: sqlite3.Connection) -> list:
+        """(name, declared type) of the result columns, without the input row number."""
+        return [(row[1], row[2].upper()) for row in conn.execute(f"PRAGMA table_info({self.TABLE})")
+                if row[1] != self.ROW]
+
+    def _select(self, columns: list) -> str:
+        return ", ".join(f'"{name}"' for name, _ in columns)
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def count(self, filters: ResultFilter = ResultFilter()) -> int:
+        where, params = filters.where()
+        return self._query(f"SELECT COUNT(*) FROM {self.TABLE} WHERE {where}", params)[0][0]
+
+    def page(self, filters: ResultFilter = ResultFilter(), page: int = 0, page_size: int = 100) -> pd.DataFrame:
+        """One page of filtered rows, highest score first, then file order."""
+        where, params = filters.where()
+        with self._lock:
+            select = self._select(self._columns(self._conn))
+            sql = f"SELECT {select} FROM {self.TABLE} WHERE {where} ORDER BY score DESC, {self.ROW} LIMIT ? OFFSET ?"
+            return pd.read_sql_query(sql, self._conn, params=params + [page_size, page * page_size])
+
+    def tiers(self) -> List[str]:
+        return [r[0] for r in self._query(f"SELECT DISTINCT quality_tier FROM {self.TABLE} ORDER BY 1") if r[0]]
+
+    def sources(self) -> List[str]:
+        combos = self._query(f"SELECT DISTINCT sources FROM {self.TABLE} WHERE sources IS NOT NULL")
+        return sorted({s.strip() for (combo,) in combos for s in combo.split(",") if s.strip()})
+
+    @staticmethod
+    def parquet_available() -> bool:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    def export(self, fmt: str = "csv.gz", filters: ResultFilter = ResultFilter(), chunksize: int = 50000) -> str:
+        """
+        Write the filtered rows in input order next to the store as results.csv.gz or
+        results.parquet, reading `chunksize` rows at a time. Parquet needs pyarrow.
+        An earlier export is replaced (see discard_exports).
+        """
+        where, params = filters.where()
+        self.discard_exports(self.path)
+        out_path = os.path.join(self.directory, f"results.{fmt}")
+        # Separate connection: the export can run while the page view keeps querying
+        conn = sqlite3.connect(self.path)
+        try:
+            columns = self._columns(conn)
+            sql = f"SELECT {self._select(columns)} FROM {self.TABLE} WHERE {where} ORDER BY {self.ROW}"
+            chunks = pd.read_sql_query(sql, conn, params=params, chunksize=chunksize)
+            with stage(CSV_WRITE):
+                if fmt == "csv.gz":
+                    self._export_csv(chunks, columns, out_path)
+                elif fmt == "parquet":
+                    self._export_parquet(chunks, columns, out_path)
+                else:
+                    raise ValueError(f"Unsupported export format: {fmt}")
+        finally:
+            conn.close()
+        return out_path
+
+    @staticmethod
+    def _export_csv(chunks, columns: list, out_path: str):
+        with gzip.open(out_path, "wt", compresslevel=6, encoding="utf-8", newline="") as f:
+            wrote = False
+            for chunk in chunks:
+                chunk.to_csv(f, index=False, header=not wrote)
+                wrote = True
+            if not wrote:
+                pd.DataFrame(columns=[name for name, _ in columns]).to_csv(f, index=False)
+
+    @staticmethod
+    def _export_parquet(chunks, columns: list, out_path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        # Schema from the table's declared types, so every chunk (NaN-only or not) matches
+        types = {"INTEGER": pa.int64(), "REAL": pa.float64()}
+        schema = pa.schema([(name, types.get(sql_type, pa.string())) for name, sql_type in columns])
+        with pq.ParquetWriter(out_path, schema, compression="zstd") as writer:
+            for chunk in chunks:
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+    @staticmethod
+    def discard_exports(path: str):
+        """Delete the export files written by export() next to the store at `path`."""
+        for export in glob.glob(os.path.join(glob.escape(os.path.dirname(path)), "results.*")):
+            if export != path and not export.startswith(path + "-"):
+                os.remove(export)
+
+    @staticmethod
+    def remove(path: str):
+        """Delete the job directory of the store at `path`, exports included. Close the store first."""
+        shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,185 @@
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Callable, Iterable
+
+from ..config import Config
+from . import profiling
+
+logger = logging.getLogger(__name__)
+
+class JobPriority(IntEnum):
+    INTERACTIVE = 0
+    NORMAL = 1
+    BULK = 2
+
+# Share multiplier per priority class: an interactive job gets 100x the slots of
+# a normal job of the same weight, but bulk work is never starved outright.
+PRIORITY_SHARE = {
+    JobPriority.INTERACTIVE: 100.0,
+    JobPriority.NORMAL: 10.0,
+    JobPriority.BULK: 1.0,
+}
+
+class Job:
+    """A group of tasks submitted together, with its own progress and results."""
+    _ids = itertools.count(1)
+
+    def __init__(self, fn: Callable, items: list, priority: JobPriority, weight: float, name: str):
+        self.id = next(self._ids)
+        self.name = name or f"job-{self.id}"
+        self.fn = fn
+        self.priority = JobPriority(priority)
+        self.weight = max(weight, 0.01)
+        self.total = len(items)
+        self.pending = deque(enumerate(items))
+        self.results = {}
+        self.errors = {}
+        self.running = 0
+        self.created_at = time.time()
+        self.finished_at = None
+        self.cancelled = False
+        self.pass_value = 0.0  # stride-scheduling virtual time
+        self._done = threading.Event()
+        if not items:
+            self._finish()
+
+    @property
+    def stride(self) -> float:
+        return 1.0 / (self.weight * PRIORITY_SHARE[self.priority])
+
+    @property
+    def completed(self) -> int:
+        return len(self.results) + len(self.errors)
+
+    def _finish(self):
+        self.finished_at = time.time()
+        self._done.set()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._done.wait(timeout)
+
+    def progress(self) -> dict:
+        elapsed = (self.finished_at or time.time()) - self.created_at
+        rate = self.completed / elapsed if elapsed > 0 else 0.0
+        remaining = self.total - self.completed
+        return {
+            "job_id": self.id,
+            "name": self.name,
+            "priority": self.priority.name,
+            "weight": self.weight,
+            "total": self.total,
+            "completed": self.completed,
+            "failed": len(self.errors),
+            "running": self.running,
+            "elapsed_s": round(elapsed, 2),
+            "rows_per_s": round(rate, 2),
+            "eta_s": round(remaining / rate, 1) if rate > 0 and remaining else None,
+            "done": self.done(),
+        }
+
+class JobScheduler:
+    """
+    Process-wide worker pool shared by every batch and single-lead request.
+
+    Jobs are served by stride scheduling: each dispatched task advances the
+    job's virtual time by 1 / (weight * priority share) and the job with the
+    lowest virtual time runs next. Workers, and therefore provider calls (still
+    capped per provider by ConcurrencyController), are split between concurrent
+    jobs in proportion to their shares, so a small interactive job finishes
+    quickly even while a large batch is running.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._jobs = []
+        self._cond = threading.Condition()
+        self._virtual_time = 0.0
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"lead-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+        for t in self._threads:
+            t.start()
+
+    @classmethod
+    def default(cls) -> "JobScheduler":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(Config.SCHEDULER_WORKERS)
+            return cls._default
+
+    def submit(self, fn: Callable, items: Iterable, priority: JobPriority = JobPriority.NORMAL,
+               weight: float = 1.0, name: str = None) -> Job:
+        """Queue fn(*item) for every item (a tuple of arguments) as one job."""
+        job = Job(fn, list(items), priority, weight, name)
+        if job.total:
+            with self._cond:
+                # Start at the current virtual time so a new job gets no credit for time it was absent
+                job.pass_value = self._virtual_time
+                self._jobs.append(job)
+                self._cond.notify_all()
+        return job
+
+    def run(self, fn: Callable, *args, priority: JobPriority = JobPriority.INTERACTIVE):
+        """Run a single call through the shared pool and wait for it."""
+        job = self.submit(fn, [args], priority=priority, name=getattr(fn, "__name__", None))
+        job.wait()
+        if 0 in job.errors:
+            raise job.errors[0]
+        return job.results[0]
+
+    def cancel(self, job: Job):
+        """Drop the job's tasks that have not started yet."""
+        with self._cond:
+            job.cancelled = True
+            self._retire(job)
+
+    def jobs(self) -> list:
+        with self._cond:
+            return [job.progress() for job in self._jobs]
+
+    def _next_task(self):
+        """Pick the runnable job with the lowest virtual time. Caller holds the lock."""
+        runnable = [job for job in self._jobs if job.pending and not job.cancelled]
+        if not runnable:
+            return None
+        job = min(runnable, key=lambda j: (j.pass_value, j.priority, j.id))
+        self._virtual_time = job.pass_value
+        job.pass_value += job.stride
+        job.running += 1
+        return job, job.pending.popleft()
+
+    def _retire(self, job: Job):
+        """Caller holds the lock."""
+        if job.running == 0 and (not job.pending or job.cancelled):
+            if job in self._jobs:
+                self._jobs.remove(job)
+            if not job.done():
+                job._finish()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                task = self._next_task()
+                while task is None:
+                    self._cond.wait()
+                    task = self._next_task()
+            job, (index, args) = task
+            try:
+                with profiling.task():
+                    job.results[index] = job.fn(*args)
+            except Exception as e:
+                logger.error(f"Task {index} of {job.name} failed: {e}")
+                job.errors[index] = e
+            with self._cond:
+                job.running -= 1
+                self._retire(job)
@@ -1,19 +1,20 @@
 import requests
 import logging
-from urllib.parse import urlparse
 from ..config import Config
+from .cache import LookupCache
+from .concurrency import ConcurrencyController
+from .domains import DomainClassifier
 
 logger = logging.getLogger(__name__)
 
 class WebsiteFinder:
     BASE_URL = "https://www.googleapis.com/customsearch/v1"
-    
-    # Blocklist of directory sites to ignore when looking for "Official" websites
-    DIRECTORY_DOMAINS = {
-        "yelp.com", "facebook.com", "instagram.com", "linkedin.com", "angi.com", 
-        "homeadvisor.com", "thumbtack.com", "bbb.org", "yellowpages.com", 
-        "porch.com", "houzz.com", "mapquest.com", "superpages.com"
-    }
+
+    _cache = LookupCache("google_search", Config.LOOKUP_CACHE_TTL, Config.LOOKUP_CACHE_SIZE,
+                         cost_per_call=lambda: Config.GOOGLE_SEARCH_COST_PER_1000 / 1000.0)
+
+    # Directory sites to ignore when looking for "Official" websites live in
+    # data/directory_domains.txt (plus DIRECTORY_BLOCKLIST_PATH); see DomainClassifier.
 
     @classmethod
     def find_website(cls, business_name: str, city: str, zip_code: str) -> str:
@@ -33,19 +34,24 @@ class WebsiteFinder:
             "num": 3  # Check top 3 results
         }
 
-        try:
-            resp = requests.get(cls.BASE_URL, params=params)
-            resp.raise_for_status()
+        def fetch():
+            with ConcurrencyController.track("google_search"):
+                resp = requests.get(cls.BASE_URL, params=params, timeout=Config.HTTP_TIMEOUT)
+                resp.raise_for_status()
             data = resp.json()
-            
+
             if "items" not in data:
                 return None
 
-            for item in data["items"]:
-                link = item.get("link")
-                if cls._is_valid_candidate(link, business_name):
-                    return link
-                    
+            links = [item.get("link") for item in data["items"] if item.get("link")]
+            for verdict in DomainClassifier.default().classify(links, business_name):
+                if not verdict.blocked and verdict.affinity >= Config.MIN_DOMAIN_AFFINITY:
+                    return verdict.url
+            # Only directories came back: as good as no result
+            return None
+
+        try:
+            return cls._cache.lookup(query, fetch)
         except Exception as e:
             logger.error(f"Website Search Error: {e}")
         
@@ -57,16 +63,7 @@ class WebsiteFinder:
         Check if URL is likely the business website (not a directory).
         """
         try:
-            domain = urlparse(url).netloc.lower()
-            # 1. Remove 'www.'
-            if domain.startswith("www."):
-                domain = domain[4:]
-            
-            # 2. Check blocklist
-            for blocked in cls.DIRECTORY_DOMAINS:
-                if blocked in domain:
-                    return False
-            
-            return True
-        except:
+            verdict = DomainClassifier.default().classify([url], business_name)[0]
+            return not verdict.blocked and verdict.affinity >= Config.MIN_DOMAIN_AFFINITY
+        except Exception:
             return False
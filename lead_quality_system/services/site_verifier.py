@@ -0,0 +1,273 @@
+import asyncio
+import concurrent.futures
+import html
+import logging
+import re
+import ssl
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from ..config import Config
+from ..normalize import compact_name, phone_digits
+
+logger = logging.getLogger(__name__)
+
+PHONE_PATTERN = re.compile(r"(?:\+?1[\s.\-]?)?\(?\d{3}\)?[\s.\-]?\d{3}[\s.\-]?\d{4}")
+TAG_PATTERN = re.compile(r"<script.*?</script>|<style.*?</style>|<[^>]+>", re.S | re.I)
+
+@dataclass
+class SiteCheck:
+    url: str
+    live: Optional[bool]  # None = not checked (the verifier had no free slot in time)
+    status: Optional[int] = None
+    final_url: Optional[str] = None
+    phone_found: bool = False
+    name_found: bool = False
+    error: Optional[str] = None
+
+    @property
+    def owned(self) -> Optional[bool]:
+        return self.live and (self.phone_found or self.name_found)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+@dataclass
+class _Page:
+    status: Optional[int]
+    final_url: Optional[str]
+    text: str  # visible text, lowercased
+    phones: frozenset
+    error: Optional[str]
+    fetched_at: float
+
+class SiteVerifier:
+    """
+    Bounded asyncio fetcher that checks a candidate website resolves and
+    mentions the lead's phone number or name.
+
+    All fetching happens on one background event loop, so scoring threads only
+    wait on their own future. Concurrency is capped globally, concurrent checks
+    of one host share a single request, each request reads at most `max_bytes`,
+    and fetched pages are cached per host: for `cache_ttl` when the site answered,
+    for `error_cache_ttl` when the fetch failed, so a blip doesn't mark a host dead
+    for a day.
+
+    `timeout` starts once a fetch has a slot. A check still queued after
+    `queue_timeout` is reported unchecked (live=None), not dead, and not cached.
+    """
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_concurrency: int = 200, timeout: float = 4.0, queue_timeout: float = 30.0,
+                 max_bytes: int = 64 * 1024, cache_ttl: float = 24 * 3600, error_cache_ttl: float = 60.0,
+                 cache_size: int = 50000, max_redirects: int = 3):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.queue_timeout = queue_timeout
+        self.max_bytes = max_bytes
+        self.cache_ttl = cache_ttl
+        self.error_cache_ttl = error_cache_ttl
+        self.cache_size = cache_size
+        self.max_redirects = max_redirects
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending = {}  # host -> in-flight fetch task, so concurrent checks share one request
+        self._global_limit = None
+        self._ssl = ssl.create_default_context()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="site-verifier", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def default(cls) -> "SiteVerifier":
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(
+                    max_concurrency=Config.VERIFY_MAX_CONCURRENCY,
+                    timeout=Config.VERIFY_TIMEOUT,
+                    queue_timeout=Config.VERIFY_QUEUE_TIMEOUT,
+                    error_cache_ttl=Config.ERROR_CACHE_TTL,
+                    max_bytes=Config.VERIFY_MAX_KB * 1024,
+                )
+            return cls._default
+
+    # --- Public, thread-safe API ---
+
+    def submit(self, url: str, phone: str = "", business_name: str = "") -> concurrent.futures.Future:
+        """Schedule a check without waiting; the returned future resolves to a SiteCheck."""
+        return asyncio.run_coroutine_threadsafe(self._check(url, phone, business_name), self._loop)
+
+    def verify(self, url: str, phone: str = "", business_name: str = "") -> SiteCheck:
+        return self.submit(url, phone, business_name).result()
+
+    def verify_many(self, items: Iterable[Tuple[str, str, str]]) -> List[SiteCheck]:
+        """Check many (url, phone, business_name) tuples concurrently."""
+        futures = [self.submit(*item) for item in items]
+        return [f.result() for f in futures]
+
+    def close(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    # --- Evaluation ---
+
+    async def _check(self, url: str, phone: str, business_name: str) -> SiteCheck:
+        page = await self._get_page(url)
+        if page is None:
+            return SiteCheck(url, live=None, error=f"Not checked: no free slot within {self.queue_timeout:g}s")
+        if page.error or page.status is None or page.status >= 400:
+            return SiteCheck(url, live=False, status=page.status, final_url=page.final_url,
+                             error=page.error or f"HTTP {page.status}")
+
+        digits = phone_digits(phone)
+        name = compact_name(business_name)
+        return SiteCheck(
+            url,
+            live=True,
+            status=page.status,
+            final_url=page.final_url,
+            phone_found=len(digits) == 10 and digits in page.phones,
+            name_found=bool(name) and name in compact_name(page.text),
+        )
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url if "//" in url else "//" + url)
+        host = (parts.hostname or "").lower()
+        host = host[4:] if host.startswith("www.") else host
+        return f"{host}:{parts.port}" if parts.port else host
+
+    def _ttl(self, page: _Page) -> float:
+        failed = page.error is not None or page.status is None or page.status >= 500
+        return self.error_cache_ttl if failed else self.cache_ttl
+
+    async def _get_page(self, url: str) -> Optional[_Page]:
+        """The host's page, or None when no fetch slot freed up within `queue_timeout`."""
+        key = self._host_key(url)
+        with self._cache_lock:
+            page = self._cache.get(key)
+            if page and time.time() - page.fetched_at < self._ttl(page):
+                self._cache.move_to_end(key)
+                return page
+
+        task = self._pending.get(key)
+        if task is None:
+            task = self._pending[key] = asyncio.ensure_future(self._fetch_page(url, key))
+            task.add_done_callback(lambda _: self._pending.pop(key, None))
+        page = await asyncio.shield(task)
+        if page is None or self._ttl(page) <= 0:
+            return page
+        with self._cache_lock:
+            self._cache[key] = page
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return page
+
+    async def _fetch_page(self, url: str, host_key: str) -> Optional[_Page]:
+        if self._global_limit is None:
+            self._global_limit = asyncio.Semaphore(self.max_concurrency)
+        try:
+            await asyncio.wait_for(self._global_limit.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Site check of {host_key} not started: no free slot within {self.queue_timeout:g}s")
+            return None
+        # The site's own timeout only starts once it has a slot
+        try:
+            status, final_url, body = await asyncio.wait_for(self._follow(url), self.timeout)
+        except Exception as e:
+            return _Page(None, None, "", frozenset(), f"{type(e).__name__}: {e}", time.time())
+        finally:
+            self._global_limit.release()
+
+        markup = body.decode("utf-8", errors="replace")
+        text = html.unescape(TAG_PATTERN.sub(" ", markup)).lower()
+        # Scan the raw markup too so tel: links count
+        phones = frozenset(phone_digits(m) for m in PHONE_PATTERN.findall(markup))
+        return _Page(status, final_url, text, phones, None, time.time())
+
+    # --- Minimal HTTP/1.1 client ---
+
+    async def _follow(self, url: str):
+        if "//" not in url:
+            url = "http://" + url
+        for _ in range(self.max_redirects + 1):
+            status, headers, body = await self._request(url)
+            location = headers.get("location")
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            return status, url, body
+        return status, url, body
+
+    async def _request(self, url: str):
+        parts = urlsplit(url)
+        https = parts.scheme == "https"
+        port = parts.port or (443 if https else 80)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, port, ssl=self._ssl if https else None,
+            server_hostname=parts.hostname if https else None,
+        )
+        try:
+            writer.write((
+                f"GET {path} HTTP/1.1\r\n"
+                f"Host: {parts.netloc}\r\n"
+                f"User-Agent: LeadQualitySystem/1.0 (site verification)\r\n"
+                f"Accept: text/html,*/*;q=0.5\r\n"
+                f"Range: bytes=0-{self.max_bytes - 1}\r\n"
+                f"Connection: close\r\n\r\n"
+            ).encode("latin-1"))
+            await writer.drain()
+
+            head = await reader.readuntil(b"\r\n\r\n")
+            lines = head.decode("latin-1").split("\r\n")
+            status = int(lines[0].split()[1])
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    name, value = line.split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+
+            body = b""
+            while len(body) < self.max_bytes:
+                chunk = await reader.read(self.max_bytes - len(body))
+                if not chunk:
+                    break
+                body += chunk
+            if headers.get("transfer-encoding", "").lower() == "chunked":
+                body = self._dechunk(body)
+            # 206 Partial Content is the expected reply to our Range header
+            return (200 if status == 206 else status), headers, body
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    @staticmethod
+    def _dechunk(data: bytes) -> bytes:
+        """Decode as much of a chunked body as we managed to read."""
+        out = b""
+        while data:
+            size_line, sep, rest = data.partition(b"\r\n")
+            if not sep:
+                break
+            try:
+                size = int(size_line.split(b";")[0], 16)
+            except ValueError:
+                break
+            if size == 0:
+                break
+            out += rest[:size]
+            data = rest[size + 2:]
+        return out
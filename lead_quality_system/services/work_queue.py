@@ -0,0 +1,378 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+@dataclass
+class Lease:
+    """A claimed chunk. Only the holder of `token` may extend it; anyone may complete it."""
+    job_id: str
+    chunk_id: int
+    token: str
+    attempts: int
+    payload: dict
+
+class WorkQueue(ABC):
+    """
+    Chunks of a batch job shared between a coordinator and any number of workers.
+
+    Delivery is at-least-once: a claimed chunk is leased for `lease_s` seconds and
+    handed to another worker if the lease runs out before it is completed. Results
+    are keyed by input row, so a chunk completed twice merges to the same rows.
+    After Config.QUEUE_MAX_ATTEMPTS claims a chunk is marked failed.
+    """
+
+    @staticmethod
+    def from_url(url: str = None) -> "WorkQueue":
+        """sqlite:///path/to/queue.db (or a bare path) or redis://host:port/db."""
+        url = url or Config.WORK_QUEUE_URL
+        if url.startswith(("redis://", "rediss://", "unix://")):
+            return RedisWorkQueue(url)
+        return SQLiteWorkQueue(url[len("sqlite:///"):] if url.startswith("sqlite:///") else url)
+
+    @abstractmethod
+    def submit(self, name: str, payloads: List[dict], total_rows: int) -> str:
+        """Enqueue one job's chunks; returns the job id."""
+
+    @abstractmethod
+    def claim(self, worker: str, lease_s: float) -> Optional[Lease]:
+        """The oldest pending (or lease-expired) chunk across all jobs, or None."""
+
+    @abstractmethod
+    def extend(self, lease: Lease, lease_s: float) -> bool:
+        """Push the lease deadline out; False when the chunk was reclaimed or finished meanwhile."""
+
+    @abstractmethod
+    def complete(self, lease: Lease, results: Dict[int, dict]):
+        """Store the chunk's results by row and mark it done. Repeat completions are no-ops."""
+
+    @abstractmethod
+    def fail(self, lease: Lease, error: str):
+        """Give the chunk back for a retry (or mark it failed once out of attempts)."""
+
+    @abstractmethod
+    def status(self, job_id: str) -> dict:
+        """
+        Job name, row/chunk totals and chunk counts by state. A lease that has run out
+        counts as pending (it will be re-claimed), or as failed once out of attempts.
+        """
+
+    @abstractmethod
+    def jobs(self) -> List[str]:
+        """Ids of all jobs, oldest first."""
+
+    @abstractmethod
+    def chunks(self, job_id: str) -> Iterator[Tuple[int, dict, Optional[str]]]:
+        """(chunk_id, payload, error) for every chunk of the job."""
+
+    @abstractmethod
+    def results(self, job_id: str) -> Dict[int, dict]:
+        """Merged results so far, by input row."""
+
+    def close(self):
+        pass
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Local backend: one SQLite file (WAL) shared by every process on the machine.
+    Claims run in BEGIN IMMEDIATE transactions, so two workers never lease the same chunk.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY, name TEXT, created REAL, total_chunks INTEGER, total_rows INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS chunks (
+                job_id TEXT, chunk_id INTEGER, payload TEXT, state TEXT, worker TEXT, token TEXT,
+                lease_expires REAL, attempts INTEGER DEFAULT 0, error TEXT,
+                PRIMARY KEY (job_id, chunk_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_chunks_state ON chunks (state, lease_expires);
+            CREATE TABLE IF NOT EXISTS results (
+                job_id TEXT, row INTEGER, result TEXT, PRIMARY KEY (job_id, row)
+            );
+        """)
+
+    def _transaction(self, fn):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                value = fn(self._conn)
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return value
+
+    def submit(self, name: str, payloads: List[dict], total_rows: int) -> str:
+        job_id = uuid.uuid4().hex[:12]
+
+        def insert(conn):
+            conn.execute("INSERT INTO jobs VALUES (?, ?, ?, ?, ?)", (job_id, name, time.time(), len(payloads), total_rows))
+            conn.executemany(
+                "INSERT INTO chunks (job_id, chunk_id, payload, state) VALUES (?, ?, ?, ?)",
+                [(job_id, i, json.dumps(p, separators=(",", ":")), PENDING) for i, p in enumerate(payloads)],
+            )
+        self._transaction(insert)
+        return job_id
+
+    def claim(self, worker: str, lease_s: float) -> Optional[Lease]:
+        def pick(conn):
+            while True:
+                now = time.time()
+                row = conn.execute(
+                    "SELECT job_id, chunk_id, attempts, payload FROM chunks "
+                    "WHERE state = ? OR (state = ? AND lease_expires < ?) ORDER BY rowid LIMIT 1",
+                    (PENDING, LEASED, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, chunk_id, attempts, payload = row
+                if attempts >= Config.QUEUE_MAX_ATTEMPTS:
+                    conn.execute(
+                        "UPDATE chunks SET state = ?, error = COALESCE(error, ?) WHERE job_id = ? AND chunk_id = ?",
+                        (FAILED, f"Lease expired {attempts} times", job_id, chunk_id),
+                    )
+                    continue
+                token = uuid.uuid4().hex
+                conn.execute(
+                    "UPDATE chunks SET state = ?, worker = ?, token = ?, lease_expires = ?, attempts = ? "
+                    "WHERE job_id = ? AND chunk_id = ?",
+                    (LEASED, worker, token, now + lease_s, attempts + 1, job_id, chunk_id),
+                )
+                return Lease(job_id, chunk_id, token, attempts + 1, json.loads(payload))
+        return self._transaction(pick)
+
+    def extend(self, lease: Lease, lease_s: float) -> bool:
+        def update(conn):
+            return conn.execute(
+                "UPDATE chunks SET lease_expires = ? WHERE job_id = ? AND chunk_id = ? AND token = ? AND state = ?",
+                (time.time() + lease_s, lease.job_id, lease.chunk_id, lease.token, LEASED),
+            ).rowcount == 1
+        return self._transaction(update)
+
+    def complete(self, lease: Lease, results: Dict[int, dict]):
+        def merge(conn):
+            state = conn.execute("SELECT state FROM chunks WHERE job_id = ? AND chunk_id = ?",
+                                 (lease.job_id, lease.chunk_id)).fetchone()
+            if state is None or state[0] == DONE:
+                return
+            conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                [(lease.job_id, int(row), json.dumps(result)) for row, result in results.items()],
+            )
+            conn.execute("UPDATE chunks SET state = ?, error = NULL WHERE job_id = ? AND chunk_id = ?",
+                         (DONE, lease.job_id, lease.chunk_id))
+        self._transaction(merge)
+
+    def fail(self, lease: Lease, error: str):
+        def release(conn):
+            conn.execute(
+                "UPDATE chunks SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, token = NULL "
+                "WHERE job_id = ? AND chunk_id = ? AND token = ?",
+                (Config.QUEUE_MAX_ATTEMPTS, FAILED, PENDING, error, lease.job_id, lease.chunk_id, lease.token),
+            )
+        self._transaction(release)
+
+    def _query(self, sql: str, params=()) -> list:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def status(self, job_id: str) -> dict:
+        job = self._query("SELECT name, total_chunks, total_rows FROM jobs WHERE job_id = ?", (job_id,))
+        if not job:
+            raise KeyError(f"Unknown job: {job_id}")
+        name, total_chunks, total_rows = job[0]
+        counts = {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 0}
+        # Expired leases as claim() will treat them
+        sql = ("SELECT CASE WHEN state != ? OR lease_expires >= ? THEN state WHEN attempts >= ? THEN ? ELSE ? END AS s, "
+               "COUNT(*) FROM chunks WHERE job_id = ? GROUP BY s")
+        for state, count in self._query(sql, (LEASED, time.time(), Config.QUEUE_MAX_ATTEMPTS, FAILED, PENDING, job_id)):
+            counts[state] += count
+        return {"job_id": job_id, "name": name, "rows": total_rows, "chunks": total_chunks, **counts}
+
+    def jobs(self) -> List[str]:
+        return [r[0] for r in self._query("SELECT job_id FROM jobs ORDER BY created")]
+
+    def chunks(self, job_id: str) -> Iterator[Tuple[int, dict, Optional[str]]]:
+        for chunk_id, payload, error in self._query(
+            "SELECT chunk_id, payload, error FROM chunks WHERE job_id = ? ORDER BY chunk_id", (job_id,)
+        ):
+            yield chunk_id, json.loads(payload), error
+
+    def results(self, job_id: str) -> Dict[int, dict]:
+        return {row: json.loads(result) for row, result in
+                self._query("SELECT row, result FROM results WHERE job_id = ?", (job_id,))}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+# Atomic claim: requeue expired leases, then pop the oldest chunk and lease it.
+# KEYS: pending list, leases zset, attempts hash; ARGV: now, lease deadline
+_CLAIM_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, member in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], member)
+    redis.call('RPUSH', KEYS[1], member)
+end
+local member = redis.call('RPOP', KEYS[1])
+if not member then return nil end
+redis.call('ZADD', KEYS[2], ARGV[2], member)
+local attempts = redis.call('HINCRBY', KEYS[3], member, 1)
+return {member, attempts}
+"""
+
+class RedisWorkQueue(WorkQueue):
+    """
+    Redis backend for workers on several machines (needs the `redis` package).
+
+    Pending chunks are a list, leases a sorted set scored by deadline; the claim
+    is one Lua script so a chunk is never lost between pop and lease. The lease
+    token is the chunk's attempt number, so a worker whose lease expired and was
+    re-claimed can no longer extend it.
+    """
+    PREFIX = "leadq"
+
+    def __init__(self, url: str):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("RedisWorkQueue needs the 'redis' package (pip install redis)") from e
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+        self._claim = self._redis.register_script(_CLAIM_SCRIPT)
+
+    def _key(self, *parts) -> str:
+        return ":".join((self.PREFIX,) + tuple(str(p) for p in parts))
+
+    def submit(self, name: str, payloads: List[dict], total_rows: int) -> str:
+        job_id = uuid.uuid4().hex[:12]
+        pipe = self._redis.pipeline()
+        pipe.hset(self._key("job", job_id), mapping={
+            "name": name, "created": time.time(), "chunks": len(payloads), "rows": total_rows,
+        })
+        if payloads:
+            pipe.hset(self._key("payloads", job_id), mapping={
+                i: json.dumps(p, separators=(",", ":")) for i, p in enumerate(payloads)
+            })
+            # LPUSH + RPOP: oldest chunk first
+            pipe.lpush(self._key("pending"), *(f"{job_id}:{i}" for i in range(len(payloads))))
+        pipe.rpush(self._key("jobs"), job_id)
+        pipe.execute()
+        return job_id
+
+    def claim(self, worker: str, lease_s: float) -> Optional[Lease]:
+        while True:
+            now = time.time()
+            claimed = self._claim(keys=[self._key("pending"), self._key("leases"), self._key("attempts")],
+                                  args=[now, now + lease_s])
+            if not claimed:
+                return None
+            member, attempts = claimed[0], int(claimed[1])
+            job_id, chunk_id = member.rsplit(":", 1)
+            chunk_id = int(chunk_id)
+            if self._redis.sismember(self._key("done", job_id), chunk_id):
+                # Completed after its lease had already expired and been requeued
+                self._redis.zrem(self._key("leases"), member)
+                continue
+            if attempts > Config.QUEUE_MAX_ATTEMPTS:
+                self._finish_failed(job_id, chunk_id, f"Lease expired {attempts - 1} times")
+                continue
+            payload = self._redis.hget(self._key("payloads", job_id), chunk_id)
+            if payload is None:
+                self._redis.zrem(self._key("leases"), member)
+                continue
+            return Lease(job_id, chunk_id, str(attempts), attempts, json.loads(payload))
+
+    def _finish_failed(self, job_id: str, chunk_id: int, error: str):
+        pipe = self._redis.pipeline()
+        pipe.zrem(self._key("leases"), f"{job_id}:{chunk_id}")
+        pipe.hset(self._key("failed", job_id), chunk_id, error)
+        pipe.execute()
+
+    def _holds(self, lease: Lease) -> bool:
+        member = f"{lease.job_id}:{lease.chunk_id}"
+        return (self._redis.zscore(self._key("leases"), member) is not None
+                and self._redis.hget(self._key("attempts"), member) == lease.token)
+
+    def extend(self, lease: Lease, lease_s: float) -> bool:
+        if not self._holds(lease):
+            return False
+        self._redis.zadd(self._key("leases"), {f"{lease.job_id}:{lease.chunk_id}": time.time() + lease_s}, xx=True)
+        return True
+
+    def complete(self, lease: Lease, results: Dict[int, dict]):
+        # SADD decides the winner; a repeat completion writes nothing
+        if not self._redis.sadd(self._key("done", lease.job_id), lease.chunk_id):
+            return
+        pipe = self._redis.pipeline()
+        if results:
+            pipe.hset(self._key("results", lease.job_id), mapping={int(r): json.dumps(v) for r, v in results.items()})
+        pipe.zrem(self._key("leases"), f"{lease.job_id}:{lease.chunk_id}")
+        pipe.hdel(self._key("failed", lease.job_id), lease.chunk_id)
+        pipe.execute()
+
+    def fail(self, lease: Lease, error: str):
+        if not self._holds(lease):
+            return
+        member = f"{lease.job_id}:{lease.chunk_id}"
+        if lease.attempts >= Config.QUEUE_MAX_ATTEMPTS:
+            self._finish_failed(lease.job_id, lease.chunk_id, error)
+            return
+        pipe = self._redis.pipeline()
+        pipe.zrem(self._key("leases"), member)
+        pipe.rpush(self._key("pending"), member)
+        pipe.execute()
+
+    def status(self, job_id: str) -> dict:
+        job = self._redis.hgetall(self._key("job", job_id))
+        if not job:
+            raise KeyError(f"Unknown job: {job_id}")
+        total = int(job["chunks"])
+        done = self._redis.scard(self._key("done", job_id))
+        failed = len(set(self._redis.hkeys(self._key("failed", job_id))) - set(self._redis.smembers(self._key("done", job_id))))
+        now = time.time()
+        leases = [(m, deadline) for m, deadline in self._redis.zrange(self._key("leases"), 0, -1, withscores=True)
+                  if m.startswith(f"{job_id}:")]
+        leased = sum(1 for _, deadline in leases if deadline >= now)
+        # Expired leases as claim() will treat them: requeued, or failed once out of attempts
+        expired = [m for m, deadline in leases if deadline < now]
+        if expired:
+            attempts = self._redis.hmget(self._key("attempts"), expired)
+            failed += sum(1 for a in attempts if int(a or 0) >= Config.QUEUE_MAX_ATTEMPTS)
+        return {"job_id": job_id, "name": job["name"], "rows": int(job["rows"]), "chunks": total,
+                PENDING: max(total - done - failed - leased, 0), LEASED: leased, DONE: done, FAILED: failed}
+
+    def jobs(self) -> List[str]:
+        return self._redis.lrange(self._key("jobs"), 0, -1)
+
+    def chunks(self, job_id: str) -> Iterator[Tuple[int, dict, Optional[str]]]:
+        errors = self._redis.hgetall(self._key("failed", job_id))
+        payloads = self._redis.hgetall(self._key("payloads", job_id))
+        for chunk_id in sorted(payloads, key=int):
+            yield int(chunk_id), json.loads(payloads[chunk_id]), errors.get(chunk_id)
+
+    def results(self, job_id: str) -> Dict[int, dict]:
+        return {int(row): json.loads(v) for row, v in self._redis.hgetall(self._key("results", job_id)).items()}
+
+    def close(self):
+        self._redis.close()
@@ -1,6 +1,9 @@
 import requests
 import logging
 from ..config import Config
+from .cache import LookupCache
+from .concurrency import ConcurrencyController
+from .phone import PhoneValidator
 
 logger = logging.getLogger(__name__)
 
@@ -8,12 +11,30 @@ class YelpMatcher:
     BASE_URL = "https://api.yelp.com/v3/businesses/search"
     PHONE_SEARCH_URL = "https://api.yelp.com/v3/businesses/search/phone"
 
+    _phone_cache = LookupCache("yelp_phone", Config.LOOKUP_CACHE_TTL, Config.LOOKUP_CACHE_SIZE,
+                               cost_per_call=lambda: Config.YELP_COST_PER_1000 / 1000.0)
+    _term_cache = LookupCache("yelp_term", Config.LOOKUP_CACHE_TTL, Config.LOOKUP_CACHE_SIZE,
+                              cost_per_call=lambda: Config.YELP_COST_PER_1000 / 1000.0)
+
     @staticmethod
     def _headers():
         return {
             "Authorization": f"Bearer {Config.YELP_API_KEY}"
         }
 
+    @classmethod
+    def _search(cls, cache: LookupCache, url: str, params: dict):
+        """GET a business search; the first business, or None when Yelp has no match."""
+        def fetch():
+            with ConcurrencyController.track(cache.name):
+                resp = requests.get(url, headers=cls._headers(), params=params, timeout=Config.HTTP_TIMEOUT)
+                resp.raise_for_status()
+            data = resp.json()
+            if "businesses" in data and data["businesses"]:
+                return data["businesses"][0]
+            return None
+        return cache.lookup(repr(sorted(params.items())), fetch)
+
     @classmethod
     def search_by_phone(cls, phone: str):
         if Config.MOCK_MODE:
@@ -23,28 +44,25 @@ class YelpMatcher:
             return None
         
         # Yelp expects +15555555555 format
-        # Clean input
-        raw_digits = "".join(filter(str.isdigit, phone))
-        formatted_phone = phone # Fallback
-        
-        if len(raw_digits) == 10:
-            formatted_phone = f"+1{raw_digits}"
-        elif len(raw_digits) == 11 and raw_digits.startswith("1"):
-            formatted_phone = f"+{raw_digits}"
+        check = PhoneValidator.validate(phone)
+        if not check.valid:
+            logger.info(f"Skipping Yelp phone search: {check.reason}")
+            return None
+        formatted_phone = check.e164
             
         params = {"phone": formatted_phone}
         try:
-            resp = requests.get(cls.PHONE_SEARCH_URL, headers=cls._headers(), params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            if "businesses" in data and data["businesses"]:
-                return data["businesses"][0]
+            return cls._search(cls._phone_cache, cls.PHONE_SEARCH_URL, params)
         except Exception as e:
             logger.error(f"Yelp Phone Search Error: {e}")
         return None
 
     @classmethod
-    def search_by_term(cls, business_name: str, location: str):
+    def search_by_term(cls, business_name: str, location: str, coordinates: tuple = None):
+        """
+        Search by name near a location string (zip).
+        With `coordinates` (lat, lon), searches a radius around that point instead.
+        """
         if Config.MOCK_MODE:
             return {"name": business_name, "rating": 3.5, "review_count": 20}
 
@@ -56,12 +74,12 @@ class YelpMatcher:
             "location": location,
             "limit": 1
         }
+        if coordinates:
+            del params["location"]
+            params["latitude"], params["longitude"] = coordinates
+            params["radius"] = int(min(Config.LOCATION_BIAS_RADIUS_KM * 1000, 40000))  # API max is 40 km
         try:
-            resp = requests.get(cls.BASE_URL, headers=cls._headers(), params=params)
-            resp.raise_for_status()
-            data = resp.json()
-            if "businesses" in data and data["businesses"]:
-                return data["businesses"][0]
+            return cls._search(cls._term_cache, cls.BASE_URL, params)
         except Exception as e:
             logger.error(f"Yelp Term Search Error: {e}")
         return None
@@ -0,0 +1,131 @@
+import types
+
+import pytest
+
+from lead_quality_system.services import cache as cache_module
+from lead_quality_system.services.cache import ERROR, FOUND, NOT_FOUND, LookupCache, failures
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module, "time", types.SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+@pytest.fixture
+def make_cache():
+    made = []
+
+    def make(**kwargs):
+        options = dict(ttl=100, not_found_ttl=50, error_ttl=10, breaker_errors=0, cost_per_call=lambda: 0.02)
+        cache = LookupCache("test", **{**options, **kwargs})
+        made.append(cache)
+        return cache
+    yield make
+    for cache in made:
+        LookupCache._instances.remove(cache)
+
+class Provider:
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+def test_found_is_cached_for_its_ttl(clock, make_cache):
+    cache, fetch = make_cache(), Provider({"id": 1}, {"id": 2})
+    assert cache.lookup("k", fetch) == {"id": 1}
+    clock.now += 99
+    assert cache.lookup("k", fetch) == {"id": 1}
+    clock.now += 1
+    assert cache.lookup("k", fetch) == {"id": 2}
+    assert fetch.calls == 2
+
+def test_not_found_is_cached_for_its_own_ttl(clock, make_cache):
+    cache, fetch = make_cache(), Provider(None, {"id": 1})
+    hits = []
+    assert cache.lookup("k", fetch) is None
+    assert cache.lookup("k", fetch, on_hit=hits.append) is None
+    assert hits == [NOT_FOUND] and fetch.calls == 1
+    clock.now += 50
+    assert cache.lookup("k", fetch) == {"id": 1}
+
+def test_error_is_raised_then_cached_briefly_and_reported(clock, make_cache):
+    cache, fetch = make_cache(), Provider(RuntimeError("503"), {"id": 1})
+    with failures() as failed:
+        with pytest.raises(RuntimeError):
+            cache.lookup("k", fetch)
+        assert cache.lookup("k", fetch) is None
+    assert failed == ["test", "test"] and fetch.calls == 1
+    clock.now += 10
+    with failures() as failed:
+        assert cache.lookup("k", fetch) == {"id": 1}
+    assert failed == []
+
+def test_zero_ttl_disables_that_outcome(clock, make_cache):
+    cache, fetch = make_cache(not_found_ttl=0), Provider(None, None)
+    cache.lookup("k", fetch)
+    cache.lookup("k", fetch)
+    assert fetch.calls == 2 and len(cache) == 0
+
+def test_stats_per_outcome(clock, make_cache):
+    cache = make_cache()
+    cache.lookup("found", Provider({"id": 1}))
+    cache.lookup("missing", Provider(None))
+    with pytest.raises(RuntimeError):
+        cache.lookup("broken", Provider(RuntimeError("503")))
+    for key in ("found", "found", "missing", "broken"):
+        cache.lookup(key, Provider())
+
+    stats = cache.stats()
+    assert (stats["lookups"], stats["misses"], stats["hit_rate"]) == (7, 3, 0.571)
+    assert {o: stats[o]["hits"] for o in (FOUND, NOT_FOUND, ERROR)} == {FOUND: 2, NOT_FOUND: 1, ERROR: 1}
+    assert {o: stats[o]["entries"] for o in (FOUND, NOT_FOUND, ERROR)} == {FOUND: 1, NOT_FOUND: 1, ERROR: 1}
+    assert stats[FOUND]["saved_usd"] == 0.04
+
+def test_circuit_breaker_stops_calls_for_new_keys(clock, make_cache):
+    cache = make_cache(breaker_errors=3)
+    for i in range(3):
+        with pytest.raises(RuntimeError):
+            cache.lookup(f"lead {i}", Provider(RuntimeError("outage")))
+    assert cache.circuit_open
+
+    fetch = Provider({"id": 1}, RuntimeError("still down"), {"id": 2})
+    with failures() as failed:
+        assert cache.lookup("new lead", fetch) is None
+    assert fetch.calls == 0 and failed == ["test"]
+    assert cache.stats()["short_circuited"] == 1 and cache.stats()[ERROR]["hits"] == 1
+
+    # After the error TTL one call goes through and decides
+    clock.now += 10
+    assert cache.lookup("new lead", fetch) == {"id": 1}
+    assert not cache.circuit_open
+
+def test_circuit_reopens_on_failed_probe(clock, make_cache):
+    cache = make_cache(breaker_errors=2)
+    for i in range(2):
+        with pytest.raises(RuntimeError):
+            cache.lookup(f"lead {i}", Provider(RuntimeError("outage")))
+    clock.now += 10
+    with pytest.raises(RuntimeError):
+        cache.lookup("probe", Provider(RuntimeError("outage")))
+    assert cache.circuit_open
+
+def test_successes_reset_the_breaker(clock, make_cache):
+    cache = make_cache(breaker_errors=2)
+    for i in range(4):
+        with pytest.raises(RuntimeError):
+            cache.lookup(f"bad {i}", Provider(RuntimeError("flaky")))
+        cache.lookup(f"good {i}", Provider({"id": i}))
+    assert not cache.circuit_open
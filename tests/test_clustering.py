@@ -0,0 +1,40 @@
+import pandas as pd
+
+from lead_quality_system.services.clustering import LeadClusterer, _Row
+
+def _frame(*rows):
+    return pd.DataFrame(rows, columns=["business_name", "phone", "zip_code", "email"])
+
+def _clusters(*rows):
+    return list(LeadClusterer.cluster(_frame(*rows))["cluster_id"])
+
+def test_min_hashes_are_independent():
+    keys = LeadClusterer._blocking_keys(_Row(0, "joesplumbingllc", "", "", "94110", ()))
+    assert len({key.split(":")[-1] for key in keys}) > 1
+
+def test_near_duplicate_names_in_one_zip_merge():
+    assert _clusters(
+        ("Joe's Plumbing", "", "94110", ""),
+        ("Joes Plumbing LLC", "", "94110", ""),
+    ) == [1, 1]
+
+def test_same_name_in_another_zip_stays_apart():
+    assert _clusters(
+        ("Joe's Plumbing", "", "94110", ""),
+        ("Joe's Plumbing", "", "94611", ""),
+    ) == [1, 2]
+
+def test_names_differing_only_in_numbers_stay_apart():
+    assert _clusters(
+        ("Shop 123456 Plumbing", "", "94110", ""),
+        ("Shop 123457 Plumbing", "", "94110", ""),
+        ("Jiffy Lube #12", "", "94110", "service@jiffylube.com"),
+        ("Jiffy Lube #13", "", "94110", "service@jiffylube.com"),
+        ("Jiffy Lube", "", "94110", ""),
+    ) == [1, 2, 3, 4, 5]
+
+def test_shared_phone_merges_despite_numbers():
+    assert _clusters(
+        ("Jiffy Lube #12", "(510) 482-7731", "94110", ""),
+        ("Jiffy Lube", "510-482-7731", "94110", ""),
+    ) == [1, 1]
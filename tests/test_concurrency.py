@@ -0,0 +1,70 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from lead_quality_system.config import Config
+from lead_quality_system.services.cache import LookupCache
+from lead_quality_system.services.concurrency import AdaptiveLimiter, ConcurrencyController
+from lead_quality_system.services.yelp import YelpMatcher
+
+def _limiter():
+    return AdaptiveLimiter("test", initial=4, min_limit=1, max_limit=64)
+
+def test_one_fast_response_does_not_pin_the_limit():
+    limiter = _limiter()
+    limiter.acquire()
+    limiter.release(0.001, ok=True)
+    for _ in range(AdaptiveLimiter.LATENCY_WINDOW * 4):
+        limiter.acquire()
+        limiter.release(0.2, ok=True)
+    snapshot = limiter.snapshot()
+    assert snapshot["min_latency_ms"] == 200
+    assert snapshot["limit"] > 4
+
+def test_latency_above_recent_baseline_shrinks_the_limit():
+    limiter = _limiter()
+    for _ in range(AdaptiveLimiter.LATENCY_WINDOW):
+        limiter.acquire()
+        limiter.release(0.01, ok=True)
+    grown = limiter.snapshot()["limit"]
+    for _ in range(20):
+        limiter.acquire()
+        limiter.release(1.0, ok=True)
+    assert limiter.snapshot()["limit"] < grown
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(1.0)
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class _Server(ThreadingHTTPServer):
+    block_on_close = False
+
+    def handle_error(self, request, client_address):
+        pass  # the client has given up by the time the reply is sent
+
+def test_provider_call_timeout_shrinks_the_limit(monkeypatch):
+    httpd = _Server(("127.0.0.1", 0), _SlowHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    monkeypatch.setattr(Config, "HTTP_TIMEOUT", 0.2)
+    monkeypatch.setattr(ConcurrencyController, "_limiters", {})
+    cache = LookupCache("test_timeout", ttl=0, not_found_ttl=0, error_ttl=0, breaker_errors=0)
+    try:
+        initial = ConcurrencyController.limiter(cache.name).limit
+        started = time.monotonic()
+        with pytest.raises(requests.Timeout):
+            YelpMatcher._search(cache, f"http://127.0.0.1:{httpd.server_address[1]}/", {"phone": "+15104827731"})
+        assert time.monotonic() - started < 0.9
+        snapshot = ConcurrencyController.limiter(cache.name).snapshot()
+        assert snapshot["limit"] < initial
+    finally:
+        LookupCache._instances.remove(cache)
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,75 @@
+import io
+import time
+
+import pandas as pd
+
+from lead_quality_system.config import Config
+from lead_quality_system.models import Lead, LeadEvidence
+from lead_quality_system.scorer import LeadScorer
+from lead_quality_system.services.csv_processor import BatchProcessor
+from lead_quality_system.services.evidence_store import EvidenceStore
+from lead_quality_system.services.result_store import ResultStore
+
+REPRESENTATIVE = Lead("Calafia Home Design", "(510) 482-7731", "94611", "owner@calafiahome.com")
+SAME_PHONE = Lead("Calafia Home Design Inc", "510-482-7731", "94611", "info@calafiahome.com")
+OTHER_PHONE = Lead("Calafia Home Design", "(510) 482-7790", "94611", "")
+
+def _collect(lead, rules=None):
+    return LeadEvidence(lead, phone_check=LeadScorer.check_phone(lead),
+                        google_phone={"displayName": {"text": "Calafia Home Design"}},
+                        yelp_phone={"name": "Calafia Home Design"},
+                        attempted=["google_phone", "yelp_phone", "search"], fetched_at=time.time())
+
+def test_members_only_share_phone_matches_for_the_same_number(monkeypatch, tmp_path):
+    monkeypatch.setattr(LeadScorer, "collect_evidence", _collect)
+    store = EvidenceStore(str(tmp_path / "evidence.db"))
+
+    rep, same, other = BatchProcessor._enrich([REPRESENTATIVE, SAME_PHONE, OTHER_PHONE], store)
+
+    assert "Phone number matched Google Business Profile" in rep.match_reasons
+    assert same.score == rep.score
+    assert "Phone number matched Google Business Profile" in same.match_reasons
+    assert not any("Phone number matched" in reason for reason in other.match_reasons)
+    assert other.score < rep.score
+
+    stored = store.get(OTHER_PHONE)
+    assert stored.phone_check["digits"] == "5104827790"
+    assert stored.google_phone is None and stored.yelp_phone is None
+    assert stored.attempted == ["search"]
+    assert store.get(SAME_PHONE).google_phone is not None
+
+def test_reuse_never_takes_a_member_with_another_number(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "EVIDENCE_MAX_AGE_DAYS", 30)
+    calls = []
+    monkeypatch.setattr(LeadScorer, "collect_evidence", lambda lead, rules=None: (calls.append(lead), _collect(lead))[1])
+    store = EvidenceStore(str(tmp_path / "evidence.db"))
+    BatchProcessor._enrich([OTHER_PHONE], store)
+
+    fresh = BatchProcessor._enrich([REPRESENTATIVE, SAME_PHONE, OTHER_PHONE], store)
+    rerun = BatchProcessor._enrich([REPRESENTATIVE, SAME_PHONE, OTHER_PHONE], store)
+
+    assert calls == [OTHER_PHONE, REPRESENTATIVE]
+    assert [r.score for r in rerun] == [r.score for r in fresh]
+    assert "Phone number matched Google Business Profile" in rerun[0].match_reasons
+
+def test_process_csv_streams_results_into_the_output_store(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "MOCK_MODE", True)
+    monkeypatch.setattr(Config, "EVIDENCE_STORE_PATH", None)
+    monkeypatch.setattr(Config, "LEAD_STORE_PATH", None)
+    leads = pd.DataFrame({
+        "business_name": [f"Shop {i}" for i in range(40)],
+        "phone": [f"(510) 482-{7700 + i}" for i in range(40)],
+        "zip_code": "94611",
+        "email": "",
+    })
+    output = ResultStore(str(tmp_path / "results.db"))
+    streamed = []
+    monkeypatch.setattr(output, "write", lambda chunk, write=output.write: (streamed.append(len(chunk)), write(chunk)))
+
+    result = BatchProcessor.process_csv(io.StringIO(leads.to_csv(index=False)), output=output)
+
+    assert result.empty and result.attrs["batch_metrics"]["output"] == output.path
+    assert sum(streamed) == output.count() == 40
+    page = output.page(page_size=100).sort_values("business_name", key=lambda s: s.str[5:].astype(int))
+    assert list(page["business_name"]) == list(leads["business_name"])
+    assert {"verified_name", "website", "sources", "cluster_id"} <= set(page.columns)
@@ -0,0 +1,46 @@
+import pytest
+
+from lead_quality_system.services.domains import DomainClassifier
+
+@pytest.fixture
+def classifier():
+    return DomainClassifier(blocklist={"yelp.com": "directory", "facebook.com": "social"})
+
+@pytest.mark.parametrize("url, category", [
+    ("https://www.yelp.com/biz/joes-plumbing", "directory"),
+    ("https://m.yelp.com/biz/joes-plumbing", "directory"),
+    ("yelp.com", "directory"),
+    ("https://business.facebook.com/joesplumbing", "social"),
+    ("https://notyelp.com/", None),
+    ("https://yelp.com.joesplumbing.com/", None),
+    ("https://joesplumbing.com/", None),
+])
+def test_blocklist_matches_whole_label_suffixes(classifier, url, category):
+    [verdict] = classifier.classify([url])
+    assert verdict.category == category
+    assert verdict.blocked == (category is not None)
+
+@pytest.mark.parametrize("host, domain", [
+    ("joesplumbing.com", "joesplumbing.com"),
+    ("shop.joesplumbing.com", "joesplumbing.com"),
+    ("a.b.joesplumbing.co.uk", "joesplumbing.co.uk"),
+    ("joesplumbing.com.au", "joesplumbing.com.au"),
+    ("co.uk", "co.uk"),
+    ("localhost", "localhost"),
+])
+def test_registrable_domain(classifier, host, domain):
+    assert classifier.registrable_domain(host) == domain
+
+def test_public_suffix_wildcard_and_exception_rules(tmp_path):
+    rules = tmp_path / "public_suffix_list.dat"
+    rules.write_text("// comment\n*.ck\n!www.ck\n")
+    classifier = DomainClassifier()
+    classifier.load_public_suffixes(str(rules))
+    assert classifier.registrable_domain("shop.joes.plumbing.ck") == "joes.plumbing.ck"
+    assert classifier.registrable_domain("a.www.ck") == "www.ck"
+
+def test_repeated_hosts_and_invalid_urls(classifier):
+    verdicts = classifier.classify(["https://joesplumbing.com/a", "https://joesplumbing.com/b", ""], "Joe's Plumbing")
+    assert [v.domain for v in verdicts[:2]] == ["joesplumbing.com"] * 2
+    assert verdicts[0].affinity == verdicts[1].affinity > 0.8
+    assert verdicts[2].blocked and verdicts[2].category == "invalid"
@@ -0,0 +1,54 @@
+import pytest
+
+from lead_quality_system.rules import ScoringRules, match_distance_km
+from lead_quality_system.services.geo import ZipIndex, zip_from_address
+
+CENTROIDS = """zip,lat,lon,city,state
+94611,37.8310,-122.2160,Oakland,CA
+94110,37.7500,-122.4150,San Francisco,CA
+02139,42.3640,-71.1030,Cambridge,MA
+94612,37.8090,-122.2700,Oakland,CA
+"""
+
+@pytest.fixture
+def index(tmp_path):
+    source = tmp_path / "centroids.csv"
+    source.write_text(CENTROIDS)
+    path = str(tmp_path / "zip_centroids.bin")
+    assert ZipIndex.build(str(source), path) == 4
+    return ZipIndex(path)
+
+def test_lookup_round_trips_through_the_mapped_file(index):
+    info = index.lookup("94611")
+    assert (info.zip_code, info.city, info.state) == ("94611", "Oakland", "CA")
+    assert info.lat == pytest.approx(37.831, abs=1e-4) and info.lon == pytest.approx(-122.216, abs=1e-4)
+    assert index.lookup("94612").city == "Oakland"
+
+@pytest.mark.parametrize("zip_code", ["02139", "02139-4307", "2139"])
+def test_lookup_normalizes_zip_formats(index, zip_code):
+    assert index.lookup(zip_code).zip_code == "02139"
+
+@pytest.mark.parametrize("zip_code", ["94613", "00000", "99999", "12", "", None])
+def test_lookup_misses(index, zip_code):
+    assert index.lookup(zip_code) is None
+
+def test_not_an_index(tmp_path):
+    path = tmp_path / "bogus.bin"
+    path.write_bytes(b"\0" * 64)
+    with pytest.raises(ValueError):
+        ZipIndex(str(path))
+
+def test_distance_rejects_far_name_matches(index, monkeypatch):
+    monkeypatch.setattr(ZipIndex, "default", classmethod(lambda cls: index))
+    rules = ScoringRules()
+    assert index.distance_km("94611", "94110") == pytest.approx(21, abs=2)
+    assert index.distance_km("94611", "94613") is None
+
+    nearby = {"formattedAddress": "1 Market St, San Francisco, CA 94110, USA"}
+    far = {"coordinates": {"latitude": 42.364, "longitude": -71.103}}
+    unknown = {"formattedAddress": "Somewhere"}
+    assert zip_from_address(nearby["formattedAddress"]) == "94110"
+    assert rules.accepts_match(0.9, match_distance_km("94611", nearby))
+    assert match_distance_km("94611", far) > 4000
+    assert not rules.accepts_match(0.9, match_distance_km("94611", far))
+    assert rules.accepts_match(0.9, match_distance_km("94611", unknown))
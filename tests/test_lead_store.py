@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from lead_quality_system.models import EnrichmentResult, Lead
+from lead_quality_system.services.csv_processor import BatchProcessor
+from lead_quality_system.services.lead_store import LeadStore
+
+LEAD = Lead("Calafia Home Design", "(510) 482-7731", "94611-1234", "owner@calafiahome.com")
+
+@pytest.fixture
+def store(tmp_path):
+    store = LeadStore(str(tmp_path / "leads.db"))
+    yield store
+    store.close()
+
+def _frame(results):
+    inputs = pd.DataFrame([{"business_name": f"Shop {i}", "phone": f"(510) 482-{7700 + i}",
+                            "zip_code": "94611", "email": ""} for i in range(len(results))])
+    return inputs.join(pd.DataFrame(results))
+
+def test_put_frame_without_scored_rows(store):
+    """Every row errored or was deferred: the result-only columns are absent."""
+    errored = _frame([BatchProcessor._error_row("Yelp down"),
+                      {"score": 0, "quality_tier": "Deferred", "match_reasons": "Deferred: over batch budget"}])
+    assert store.put_frame(errored) == 0
+    assert store.put_frame(errored.iloc[0:0]) == 0
+    assert len(store) == 0
+
+def test_put_frame_with_missing_result_columns(store):
+    mixed = _frame([BatchProcessor._error_row("Yelp down"),
+                    {"score": 70, "quality_tier": "High", "match_reasons": "Phone number matched Google Business Profile"}])
+    assert store.put_frame(mixed) == 1
+    row = store.query(phone="510-482-7701").iloc[0]
+    assert (row["score"], row["quality_tier"], row["website"]) == (70, "High", None)
+
+def test_put_keeps_newest_result(store):
+    high = EnrichmentResult(75, "High", "Calafia Home Design", "https://calafiahome.com", ["a"], ["Yelp (Phone)"])
+    low = EnrichmentResult(20, "Low", None, None, [], [])
+    store.put(LEAD, high, scored_at=200)
+    store.put(LEAD, low, scored_at=100)
+    assert store.get(LEAD)["score"] == 75
+    assert store.get(LEAD)["zip_code"] == "94611"
+    store.put(LEAD, EnrichmentResult(0, "Error", None, None, ["boom"], []), scored_at=300)
+    assert store.count(tiers=["High"], zip_code="94611") == 1
@@ -0,0 +1,36 @@
+import pytest
+
+from lead_quality_system.normalize import phone_digits
+from lead_quality_system.services.phone import PhoneValidator
+
+@pytest.mark.parametrize("phone", [
+    "(510) 482-7731",
+    "510-482-7731 x12",
+    "510.482.7731 ext. 12",
+    "510 482 7731 Ext 1234",
+    "(510) 482-7731 extension 9",
+    "510-482-7731 #3",
+    "+1 510 482 7731",
+    "+1 (510) 482-7731 x12",
+    "15104827731",
+    "1-510-482-7731",
+])
+def test_valid_formats(phone):
+    check = PhoneValidator.validate(phone)
+    assert check.valid, check.reason
+    assert check.digits == phone_digits(phone) == "5104827731"
+    assert check.e164 == "+15104827731"
+
+@pytest.mark.parametrize("phone, reason", [
+    ("25104827731", "Not a 10-digit NANP number (11 digits)"),
+    ("510-482-773", "Not a 10-digit NANP number (9 digits)"),
+    ("510482773112", "Not a 10-digit NANP number (12 digits)"),
+    ("", "Not a 10-digit NANP number (0 digits)"),
+])
+def test_wrong_length(phone, reason):
+    check = PhoneValidator.validate(phone)
+    assert not check.valid and check.reason == reason
+
+def test_extension_digits_are_not_part_of_the_number():
+    # Counted as digits, the "1" would make this 51048277311 and reject it
+    assert PhoneValidator.validate("510-482-7731 x1").digits == "5104827731"
@@ -0,0 +1,34 @@
+from lead_quality_system.models import Lead, LeadEvidence
+from lead_quality_system.rules import ScoringRules
+from lead_quality_system.services.evidence_store import EvidenceStore
+from lead_quality_system.services.planner import PlannerPriors
+
+from .test_rules import _evidence
+
+def _store(tmp_path) -> EvidenceStore:
+    store = EvidenceStore(str(tmp_path / "evidence.db"))
+    evidence = list(_evidence().values()) * 3
+    store.put_many(
+        LeadEvidence(**{**e.__dict__, "lead": Lead(e.lead.business_name, f"(510) 482-{7700 + i}", "94611", "")})
+        for i, e in enumerate(evidence)
+    )
+    return store
+
+def test_priors_from_sql_aggregates_match_feature_frame(tmp_path):
+    store = _store(tmp_path)
+    features = store.features()
+    rules = ScoringRules()
+    gp = features["google_phone_hit"].astype(bool)
+    misses = features[~gp]
+    accepted = (misses["google_text_sim"].fillna(0.0) >= rules.name_similarity_threshold) & \
+        ~(misses["google_text_distance_km"].astype(float) > rules.max_match_distance_km)
+
+    priors = PlannerPriors.from_store(store, min_rows=1)
+    assert priors.google_phone_hit == gp.mean()
+    assert priors.google_text_accepted == accepted.mean()
+    assert priors.google_text_website == (accepted & misses["google_text_website"].notna()).mean()
+    assert priors.yelp_phone_hit == features["yelp_phone_hit"].astype(bool).mean()
+
+def test_priors_fall_back_to_defaults_on_small_store(tmp_path):
+    assert PlannerPriors.from_store(_store(tmp_path), min_rows=1000) == PlannerPriors()
+    assert PlannerPriors.from_store(EvidenceStore(str(tmp_path / "empty.db"))) == PlannerPriors()
@@ -0,0 +1,82 @@
+import gzip
+import os
+
+import pandas as pd
+
+from lead_quality_system.services.result_store import ResultFilter, ResultStore
+
+def _rows(indexes):
+    return pd.DataFrame({
+        "business_name": [f"Shop {i}" for i in indexes],
+        "score": [50] * len(indexes),
+        "quality_tier": ["Medium"] * len(indexes),
+        "sources": ["Yelp (Phone)"] * len(indexes),
+    }, index=indexes)
+
+def test_rows_written_out_of_order_read_back_in_input_order(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    store.write(_rows([3, 4]))
+    store.write(_rows([0, 2]))
+    store.write(_rows([1]))
+
+    page = store.page(ResultFilter(), page_size=10)
+    assert list(page.columns) == ["business_name", "score", "quality_tier", "sources"]
+    assert list(page["business_name"]) == [f"Shop {i}" for i in range(5)]
+
+    with gzip.open(store.export("csv.gz"), "rt") as f:
+        exported = pd.read_csv(f)
+    assert list(exported.columns) == list(page.columns)
+    assert list(exported["business_name"]) == [f"Shop {i}" for i in range(5)]
+    store.close()
+
+def test_exports_are_replaced_discarded_and_removed_with_the_job(tmp_path):
+    job_dir = tmp_path / "job"
+    job_dir.mkdir()
+    store = ResultStore(str(job_dir / "results.db"))
+    store.write(_rows([0, 1]))
+    first = store.export("csv.gz")
+    second = store.export("csv.gz", ResultFilter(tiers=("High",)))
+    assert first == second and os.path.exists(second)
+
+    ResultStore.discard_exports(store.path)
+    assert sorted(os.listdir(job_dir)) == ["results.db"]
+    assert store.count() == 2
+
+    store.export("csv.gz")
+    store.close()
+    ResultStore.remove(store.path)
+    assert not job_dir.exists()
+
+def test_schema_is_not_taken_from_an_all_nan_first_chunk(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    errors = pd.DataFrame({
+        "business_name": ["Shop 0", "Shop 1"],
+        "score": [0.0, float("nan")],
+        "quality_tier": ["Error", "Deferred"],
+        "verified_name": [float("nan")] * 2,
+        "website": [float("nan")] * 2,
+        "sources": [float("nan")] * 2,
+        "cluster_id": [1, 2],
+    })
+    scored = pd.DataFrame({
+        "business_name": ["Shop 2"],
+        "score": [80],
+        "quality_tier": ["High"],
+        "verified_name": ["Shop Two"],
+        "website": ["https://shoptwo.com"],
+        "sources": ["Google (Phone)"],
+        "cluster_id": [3],
+    }, index=[2])
+    store.write(errors)
+    store.write(scored)
+
+    with store._lock:
+        types = dict(store._columns(store._conn))
+    assert types == {"business_name": "TEXT", "score": "INTEGER", "quality_tier": "TEXT", "verified_name": "TEXT",
+                     "website": "TEXT", "sources": "TEXT", "cluster_id": "INTEGER"}
+    assert store.sources() == ["Google (Phone)"]
+    if ResultStore.parquet_available():
+        exported = pd.read_parquet(store.export("parquet"))
+        assert list(exported["website"].fillna("")) == ["", "https://shoptwo.com"]
+        assert list(exported["score"]) == [0, 80]
+    store.close()
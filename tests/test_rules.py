@@ -0,0 +1,93 @@
+import pytest
+
+from lead_quality_system.models import Lead, LeadEvidence
+from lead_quality_system.normalize import lead_key
+from lead_quality_system.rules import ScoringRules, features_frame, score_frame
+from lead_quality_system.scorer import LeadScorer
+from lead_quality_system.services.evidence_store import EvidenceStore
+
+VALID_PHONE = {"valid": True, "reason": None, "region": "CA", "zip_state": "CA", "state_mismatch": False}
+
+def _site(live, phone_found=False, name_found=False):
+    return {"live": live, "phone_found": phone_found, "name_found": name_found}
+
+def _evidence():
+    lead = Lead("Calafia Home Design", "(510) 482-7731", "94611", "owner@calafiahome.com")
+    gmail_lead = Lead("Calafia Home Design", "(510) 482-7731", "94611", "calafia@gmail.com")
+    return {
+        "google_phone": LeadEvidence(lead, phone_check=VALID_PHONE,
+                                     google_phone={"displayName": {"text": "Calafia Home Design"}},
+                                     attempted=["google_phone", "yelp_phone", "search"],
+                                     search_website="https://calafiahome.com"),
+        "google_text_site": LeadEvidence(
+            gmail_lead, phone_check=VALID_PHONE,
+            google_text={"displayName": {"text": "Calafia Home Design Inc"}, "websiteUri": "https://calafiahome.com"},
+            yelp_phone={"name": "Calafia Home Design"},
+            website_checks={"https://calafiahome.com": _site(True, phone_found=True)},
+            attempted=["google_phone", "google_text", "yelp_phone"]),
+        "low_similarity": LeadEvidence(lead, phone_check=VALID_PHONE,
+                                       google_text={"displayName": {"text": "Bob's Tacos"}},
+                                       yelp_term={"name": "Joe's Garage"},
+                                       attempted=["google_phone", "google_text", "yelp_phone", "yelp_term"]),
+        "search_site_unreachable": LeadEvidence(
+            gmail_lead, phone_check=VALID_PHONE, yelp_term={"name": "Calafia Home"},
+            search_website="https://calafia-home.net",
+            website_checks={"https://calafia-home.net": _site(False)},
+            attempted=["google_phone", "google_text", "yelp_phone", "yelp_term", "search"]),
+        "search_site_unowned": LeadEvidence(
+            lead, phone_check=VALID_PHONE, search_website="https://calafiahome.com",
+            website_checks={"https://calafiahome.com": _site(True)},
+            attempted=["google_phone", "google_text", "yelp_phone", "yelp_term", "search"]),
+        "email_site": LeadEvidence(
+            lead, phone_check=VALID_PHONE, email_website="https://calafiahome.com",
+            website_checks={"https://calafiahome.com": _site(True, name_found=True)},
+            attempted=["google_phone", "google_text", "yelp_phone", "yelp_term"]),
+        "invalid_phone": LeadEvidence(lead, phone_check={"valid": False, "reason": "555-01XX fictional number"}),
+        "state_mismatch": LeadEvidence(lead, phone_check={**VALID_PHONE, "region": "NY", "state_mismatch": True},
+                                       yelp_phone={"name": "Calafia Home Design"},
+                                       attempted=["google_phone", "yelp_phone"]),
+    }
+
+RULE_SETS = [
+    ScoringRules(),
+    ScoringRules(name_similarity_threshold=0.8, high_cutoff=60, medium_cutoff=30),
+    ScoringRules(phone_state_mismatch=15, website_unowned=0, email_website_match=0),
+]
+
+@pytest.mark.parametrize("rules", RULE_SETS)
+def test_score_frame_matches_score_evidence(rules):
+    evidence = _evidence()
+    frame = score_frame(features_frame(evidence.values()), rules)
+    for position, (case, e) in enumerate(evidence.items()):
+        result = LeadScorer.score_evidence(e, rules)
+        assert frame["score"].iloc[position] == result.score, case
+        assert frame["quality_tier"].iloc[position] == result.quality_tier, case
+
+def test_score_frame_matches_after_evidence_store_round_trip(tmp_path):
+    """rescore reads the typed SQLite columns back, not the in-memory features."""
+    store = EvidenceStore(str(tmp_path / "evidence.db"))
+    evidence = list(_evidence().values())
+    # One row per lead identity: give each case its own phone
+    evidence = [
+        LeadEvidence(**{**e.__dict__, "lead": Lead(e.lead.business_name, f"(510) 482-77{i:02d}", e.lead.zip_code, e.lead.email)})
+        for i, e in enumerate(evidence)
+    ]
+    store.put_many(evidence)
+    scored = score_frame(store.features())
+    for e in store.iter_evidence():
+        result = LeadScorer.score_evidence(e)
+        assert scored.loc[lead_key(e.lead), "score"] == result.score
+        assert scored.loc[lead_key(e.lead), "quality_tier"] == result.quality_tier
+    store.close()
+
+def test_email_derived_site_gets_no_email_match_credit():
+    evidence = _evidence()
+    rules = ScoringRules()
+    email_site = LeadScorer.score_evidence(evidence["email_site"], rules)
+    assert email_site.website == "https://calafiahome.com"
+    assert email_site.score == rules.website + rules.business_email
+    assert "Email Domain Matches Website" not in email_site.match_reasons
+    # A provider-found site on the email's domain still earns it
+    profile_site = LeadScorer.score_evidence(
+        LeadEvidence(**{**evidence["google_text_site"].__dict__, "lead": evidence["email_site"].lead}), rules)
+    assert "Email Domain Matches Website" in profile_site.match_reasons
@@ -0,0 +1,69 @@
+import threading
+import time
+
+import pytest
+
+from lead_quality_system.services.scheduler import JobPriority, JobScheduler
+
+@pytest.fixture
+def scheduler():
+    """One worker, held busy until `release` is set, so queued jobs contend for it in stride order."""
+    scheduler = JobScheduler(workers=1)
+    started, scheduler.release = threading.Event(), threading.Event()
+    scheduler.submit(lambda: (started.set(), scheduler.release.wait()), [()], name="blocker")
+    assert started.wait(5)
+    return scheduler
+
+def _record(order):
+    return lambda name, i: order.append((name, i))
+
+def test_interactive_job_overtakes_a_queued_bulk_job(scheduler):
+    order = []
+    bulk = scheduler.submit(_record(order), [("bulk", i) for i in range(50)], priority=JobPriority.BULK)
+    urgent = scheduler.submit(_record(order), [("urgent", i) for i in range(5)], priority=JobPriority.INTERACTIVE)
+    scheduler.release.set()
+    assert urgent.wait(5) and bulk.wait(5)
+
+    # Both start at the same virtual time: the urgent job wins the tie, the bulk job then runs
+    # once and waits 1 / 0.01 = 100 urgent dispatches for its next turn
+    assert [name for name, _ in order[:6]] == ["urgent", "bulk", "urgent", "urgent", "urgent", "urgent"]
+    assert [i for name, i in order if name == "urgent"] == list(range(5))
+    assert len(order) == 55
+
+def test_weights_split_the_worker_in_proportion(scheduler):
+    order = []
+    light = scheduler.submit(_record(order), [("light", i) for i in range(40)], weight=1)
+    heavy = scheduler.submit(_record(order), [("heavy", i) for i in range(40)], weight=3)
+    scheduler.release.set()
+    assert light.wait(5) and heavy.wait(5)
+
+    first = [name for name, _ in order[:40]]
+    assert first.count("heavy") == 30 and first.count("light") == 10
+
+def test_late_job_gets_no_credit_for_time_it_was_absent(scheduler):
+    order = []
+    gate = threading.Event()
+
+    def early_task(i):
+        order.append(("early", i))
+        if i == 9:
+            gate.wait(5)
+
+    early = scheduler.submit(early_task, [(i,) for i in range(20)])
+    scheduler.release.set()
+    # Joins while the early job's tenth task runs: they share the worker from here on
+    while len(order) < 10:
+        time.sleep(0.01)
+    late = scheduler.submit(_record(order), [("late", i) for i in range(10)])
+    gate.set()
+    assert early.wait(5) and late.wait(5)
+
+    after_join = [name for name, _ in order[10:20]]
+    assert after_join.count("late") == 5
+
+def test_run_returns_the_result_or_raises(scheduler):
+    scheduler.release.set()
+    assert scheduler.run(lambda a, b: a + b, 2, 3) == 5
+    with pytest.raises(ZeroDivisionError):
+        scheduler.run(lambda: 1 / 0)
+    assert scheduler.jobs() == []
@@ -0,0 +1,127 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from lead_quality_system.services.site_verifier import SiteVerifier
+
+PAGE = b"""<html><head><title>Joe's Plumbing</title><style>.x { color: red }</style></head>
+<body><h1>Joe&#39;s Plumbing</h1><a href="tel:+15104827731">Call (510) 482-7731</a></body></html>"""
+
+class _Handler(BaseHTTPRequestHandler):
+    ranges = []
+
+    def do_GET(self):
+        self.ranges.append(self.headers.get("Range"))
+        if self.path == "/slow":
+            time.sleep(1.0)
+        if self.path == "/moved":
+            self.send_response(301)
+            self.send_header("Location", "/")
+            self.end_headers()
+            return
+        if self.path == "/missing":
+            self.send_error(404)
+            return
+        # Honour the Range header the way real servers do
+        end = int(self.headers["Range"].split("-")[1]) if self.headers.get("Range") else len(PAGE) - 1
+        body = PAGE[:end + 1]
+        self.send_response(206 if self.headers.get("Range") else 200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class _Server(ThreadingHTTPServer):
+    block_on_close = False
+
+    def handle_error(self, request, client_address):
+        pass  # the verifier hangs up on slow responses
+
+@pytest.fixture
+def server():
+    _Handler.ranges = []
+    httpd = _Server(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+@pytest.fixture
+def verifier():
+    verifier = SiteVerifier(timeout=0.5, max_bytes=4096)
+    yield verifier
+    verifier.close()
+
+def test_live_owned_page(server, verifier):
+    check = verifier.verify(server + "/", phone="510-482-7731", business_name="Joe's Plumbing")
+    assert check.live and check.status == 200
+    assert check.phone_found and check.name_found and check.owned
+    assert _Handler.ranges == ["bytes=0-4095"]
+
+def test_live_but_not_owned(server, verifier):
+    check = verifier.verify(server + "/", phone="415-555-2671", business_name="Acme Roofing")
+    assert check.live and not check.owned
+
+def test_redirect_is_followed(server, verifier):
+    check = verifier.verify(server + "/moved", business_name="Joe's Plumbing")
+    assert check.owned and check.final_url == server + "/"
+
+def test_range_caps_bytes_read(server):
+    verifier = SiteVerifier(timeout=0.5, max_bytes=64)
+    try:
+        check = verifier.verify(server + "/", phone="510-482-7731")
+    finally:
+        verifier.close()
+    assert _Handler.ranges == ["bytes=0-63"]
+    assert check.live and not check.phone_found
+
+def test_http_error_is_not_live(server, verifier):
+    check = verifier.verify(server + "/missing")
+    assert not check.live and check.status == 404
+
+def test_timeout(server, verifier):
+    started = time.monotonic()
+    check = verifier.verify(server + "/slow", business_name="Joe's Plumbing")
+    assert time.monotonic() - started < 1.0
+    assert check.live is False and check.error.startswith("TimeoutError")
+
+def test_failed_fetch_is_only_cached_briefly(server):
+    verifier = SiteVerifier(timeout=0.5, error_cache_ttl=0)
+    try:
+        assert verifier.verify(server + "/slow").live is False
+        # Same host once it answers again: not stuck as dead for cache_ttl
+        assert verifier.verify(server + "/", business_name="Joe's Plumbing").owned
+        assert verifier.verify(server + "/slow").live  # a live page is cached for the host
+    finally:
+        verifier.close()
+
+def test_timeout_starts_once_a_slot_is_free(server):
+    verifier = SiteVerifier(max_concurrency=1, timeout=0.8, queue_timeout=5)
+    try:
+        # Different host keys for the same server, so they queue on the global cap
+        slow = verifier.submit(server + "/slow")
+        time.sleep(0.1)
+        queued = verifier.submit(server.replace("127.0.0.1", "localhost") + "/", business_name="Joe's Plumbing")
+        assert slow.result().live is False
+        assert queued.result().owned
+    finally:
+        verifier.close()
+
+def test_queue_timeout_is_unchecked_not_dead(server):
+    verifier = SiteVerifier(max_concurrency=1, timeout=2, queue_timeout=0.2)
+    try:
+        slow = verifier.submit(server + "/slow")
+        time.sleep(0.1)
+        queued = verifier.verify(server.replace("127.0.0.1", "localhost") + "/")
+        assert queued.live is None and queued.owned is None and queued.error.startswith("Not checked")
+        assert slow.result().live
+        # Not cached: the next check of that host fetches it
+        assert verifier.verify(server.replace("127.0.0.1", "localhost") + "/").live
+    finally:
+        verifier.close()
@@ -0,0 +1,69 @@
+import pytest
+
+from lead_quality_system.config import Config
+from lead_quality_system.services.work_queue import DONE, FAILED, LEASED, PENDING, SQLiteWorkQueue, WorkQueue
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "QUEUE_MAX_ATTEMPTS", 3)
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    yield queue
+    queue.close()
+
+def _counts(queue, job_id):
+    status = queue.status(job_id)
+    return {state: status[state] for state in (PENDING, LEASED, DONE, FAILED)}
+
+def test_work_queue_is_abstract():
+    with pytest.raises(TypeError):
+        WorkQueue()
+
+def test_claims_are_exclusive_and_in_order(queue):
+    job_id = queue.submit("job", [{"n": 0}, {"n": 1}], total_rows=2)
+    first, second = queue.claim("a", 60), queue.claim("b", 60)
+    assert (first.chunk_id, first.payload, first.attempts) == (0, {"n": 0}, 1)
+    assert second.chunk_id == 1
+    assert queue.claim("c", 60) is None
+    assert _counts(queue, job_id) == {PENDING: 0, LEASED: 2, DONE: 0, FAILED: 0}
+
+def test_expired_lease_is_pending_and_redelivered(queue):
+    job_id = queue.submit("job", [{"n": 0}], total_rows=1)
+    lost = queue.claim("a", -1)  # worker died: the lease has already run out
+    assert _counts(queue, job_id)[PENDING] == 1
+
+    redelivered = queue.claim("b", 60)
+    assert redelivered.chunk_id == lost.chunk_id and redelivered.attempts == 2
+    assert not queue.extend(lost, 60)
+    assert queue.extend(redelivered, 60)
+    assert _counts(queue, job_id)[LEASED] == 1
+
+def test_complete_is_idempotent(queue):
+    job_id = queue.submit("job", [{"n": 0}], total_rows=2)
+    lost = queue.claim("a", -1)
+    redelivered = queue.claim("b", 60)
+    queue.complete(redelivered, {0: {"score": 70}, 1: {"score": 40}})
+    queue.complete(lost, {0: {"score": 0}, 1: {"score": 0}})
+    queue.fail(lost, "late failure")
+
+    assert queue.results(job_id) == {0: {"score": 70}, 1: {"score": 40}}
+    assert _counts(queue, job_id) == {PENDING: 0, LEASED: 0, DONE: 1, FAILED: 0}
+    assert queue.claim("c", 60) is None
+
+def test_chunk_fails_after_max_attempts(queue):
+    job_id = queue.submit("job", [{"n": 0}], total_rows=1)
+    for _ in range(Config.QUEUE_MAX_ATTEMPTS):
+        queue.claim("a", -1)
+    assert _counts(queue, job_id)[FAILED] == 1
+
+    assert queue.claim("b", 60) is None
+    assert _counts(queue, job_id) == {PENDING: 0, LEASED: 0, DONE: 0, FAILED: 1}
+    assert [error for _, _, error in queue.chunks(job_id)] == ["Lease expired 3 times"]
+
+def test_fail_requeues_until_out_of_attempts(queue):
+    job_id = queue.submit("job", [{"n": 0}], total_rows=1)
+    queue.fail(queue.claim("a", 60), "boom")
+    assert _counts(queue, job_id)[PENDING] == 1
+    queue.fail(queue.claim("a", 60), "boom")
+    queue.fail(queue.claim("a", 60), "boom")
+    assert _counts(queue, job_id)[FAILED] == 1
+    assert queue.claim("a", 60) is None